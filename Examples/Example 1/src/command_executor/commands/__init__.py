@@ -1,24 +1,76 @@
-from typing import Dict
+from typing import Mapping, Optional, Union
 
+import sys
 from multiprocessing import RLock
-from plugin_engine.plugin_importer import PluginImporter
+from pathlib import Path
+from plugin_engine.plugin_importer import PluginImporter, UnloadResult
+from plugin_engine.plugin_policy import DisabledPluginFilter
 from .command import Command
 from . import plugins
 from .plugins import _commands
 
 _lock: RLock = RLock()
 _plugin_importer: PluginImporter = None
+_registry_snapshot_path: Optional[ Union[ str, Path ] ] = None
 
-def get_registered_commands() -> Dict[ str, Command ]:
+def enable_warm_start( snapshot_path: Optional[ Union[ str, Path ] ] ):
+    """
+    Makes `get_registered_commands` start from a registry snapshot file, which records the registered commands so later processes register them without
+    importing the command modules while none of them changed.
+
+    Keyword Arguments:
+        `snapshot_path`: path of the snapshot file, which is written if it is missing or stale; None disables warm starts.
+    """
+
+    global _registry_snapshot_path
+
+    _registry_snapshot_path = snapshot_path
+
+def get_registered_commands() -> Mapping[ str, Command ]:
     """
     Gets the registered commands.
+
+    The lock is only taken until the commands are imported; afterwards, the commands are read without locking.
     """
 
     global _lock, _plugin_importer
 
+    if _plugin_importer is None:
+        with _lock:
+            if _plugin_importer is None:
+                plugin_importer = PluginImporter( plugins )
+                # commands registered with `enabled = False` are recognized without importing their modules.
+                plugin_importer.import_modules( recursive = True, disabled_filter = DisabledPluginFilter( registration_decorators = [ "register_command" ] ),
+                                                registration_target = _commands, registry_snapshot = _registry_snapshot_path )
+                _plugin_importer = plugin_importer
+
+    return _commands.snapshot()
+
+def prepare_commands_for_fork():
+    """
+    Imports the commands and prepares the process for forking worker processes, which then share the registered commands without importing them again.
+    """
+
+    get_registered_commands()
+
+    # a worker forked while another thread holds the lock gets a released lock.
+    _plugin_importer.prepare_for_fork( registration_target = _commands, fork_locks = [ ( sys.modules[ __name__ ], "_lock" ) ] )
+
+def unload_commands() -> Optional[ UnloadResult ]:
+    """
+    Unloads the commands, e.g. before updated plugins are rotated in; the next `get_registered_commands` call imports them again.
+
+    Returns:
+    The outcome of unloading, listing any command still referenced, e.g. by a snapshot a caller kept; None if the commands were not imported.
+    """
+
+    global _plugin_importer
+
     with _lock:
         if _plugin_importer is None:
-            _plugin_importer = PluginImporter( plugins )
-            _plugin_importer.import_modules( recursive = True )
+            return None
+
+        result = _plugin_importer.unload_modules( registration_targets = [ _commands ] )
+        _plugin_importer = None
 
-        return _commands
+    return result
@@ -1,21 +1,27 @@
 from typing import Any, Dict, Type
 
-from multiprocessing import RLock
 from plugin_engine.class_registration import register_class
+from plugin_engine.plugin_registry import PluginRegistry
+from plugin_engine.result_cache import CACHEABLE_TAG
 from ..command import Command
 
-_lock: RLock = RLock()
-_commands: Dict[ str, Type ] = {}
+# copy-on-write, so the commands can be looked up from any thread without taking a lock.
+_commands: PluginRegistry = PluginRegistry( copy_on_write = True )
 
 def register_command( **kwargs: Dict[ str, Any ] ):
     """
     Decorator which registers a class as a Command.
+
+    Keyword Arguments:
+        `enabled`: indicates if the command is registered; defaults to `True`.
+        `cacheable`: indicates if the command's results only depend on its arguments, so they may be served from a `ResultCache`; defaults to `False`.
     """
 
     enabled = bool( kwargs.get( "enabled", True ) )
+    tags = ( CACHEABLE_TAG, ) if bool( kwargs.get( "cacheable", False ) ) else ()
 
     def class_decorator( cls: Type ):
-        register_class( cls, _commands, Command, enabled = enabled, lock = _lock )
+        register_class( cls, _commands, Command, enabled = enabled, tags = tags )
         return cls
 
     return class_decorator
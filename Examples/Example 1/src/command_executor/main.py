@@ -1,25 +1,116 @@
-from .commands import get_registered_commands
+import asyncio
+from plugin_engine import async_runner, thread_runner
+from plugin_engine.process_pool import PluginProcessPool
+from plugin_engine.result_cache import ResultCache
+from .commands import get_registered_commands, prepare_commands_for_fork
 
-def main( args = None ) -> int:
+def main( args = None, **kwargs ) -> int:
     """
     Executes the given arguments through all of the registered commands.
 
     There are three registered commands and one disabled command in different directories.
+
+    Keyword Arguments:
+        `result_cache`: `ResultCache` the results of cacheable commands are served from; defaults to None, indicating every command is executed.
     """
 
     if args is None:
         args = [ 0, 1, 1, 2, 3, 5, 8, 13, 21, 34, 55, ]
 
     registered_commands = get_registered_commands()
+    result_cache: ResultCache = kwargs.get( "result_cache", None )
 
     output_to_stdout = True
     output_to_stderr = False
 
     try:
         for name in registered_commands:
-            command_type = registered_commands[ name ]
-            command = command_type( stdout = output_to_stdout, stderr = output_to_stderr )
-            command.execute( *args )
+            if result_cache is not None:
+                result_cache.execute( registered_commands, name, *args, instance_kwargs = { "stdout": output_to_stdout, "stderr": output_to_stderr } )
+            else:
+                command_type = registered_commands[ name ]
+                command = command_type( stdout = output_to_stdout, stderr = output_to_stderr )
+                command.execute( *args )
+    except Exception as e:
+        print( f"Error executing commands: { e }" )
+        error_code = 1
+    else:
+        error_code = 0
+
+    return error_code
+
+def main_in_process_pool( args = None, **kwargs ) -> int:
+    """
+    Executes the given arguments through all of the registered commands in a pool of worker processes, printing the output of the commands in registration
+    order.
+
+    Keyword Arguments:
+        `worker_count`: number of worker processes; defaults to the number of processors.
+    """
+
+    if args is None:
+        args = [ 0, 1, 1, 2, 3, 5, 8, 13, 21, 34, 55, ]
+
+    # forked workers inherit the imported commands.
+    prepare_commands_for_fork()
+    registered_commands = get_registered_commands()
+
+    try:
+        with PluginProcessPool( get_registered_commands, worker_count = kwargs.get( "worker_count", None ), instance_kwargs = { "stdout": True, "stderr": False } ) as pool:
+            # each command is sent to a worker on its own, so a long-running command does not delay the others.
+            for result in pool.execute_many( ( ( name, args ) for name in registered_commands ), batch_size = 1 ):
+                print( result.output, end = "" )
+
+                if not result.succeeded:
+                    raise Exception( result.error )
+    except Exception as e:
+        print( f"Error executing commands: { e }" )
+        error_code = 1
+    else:
+        error_code = 0
+
+    return error_code
+
+async def main_async( args = None, **kwargs ) -> int:
+    """
+    Executes the given arguments through all of the registered commands concurrently on the event loop. The commands are imported without blocking the
+    event loop.
+
+    Keyword Arguments:
+        `timeout`: number of seconds after which the commands still running are cancelled; defaults to None, indicating no timeout.
+    """
+
+    if args is None:
+        args = [ 0, 1, 1, 2, 3, 5, 8, 13, 21, 34, 55, ]
+
+    registered_commands = await asyncio.get_event_loop().run_in_executor( None, get_registered_commands )
+
+    try:
+        await async_runner.execute_concurrently( registered_commands, [ args ], timeout = kwargs.get( "timeout", None ), instance_kwargs = { "stdout": True, "stderr": False } )
+    except Exception as e:
+        print( f"Error executing commands: { e }" )
+        error_code = 1
+    else:
+        error_code = 0
+
+    return error_code
+
+def main_concurrent( args = None, **kwargs ) -> int:
+    """
+    Executes the given arguments through all of the registered commands concurrently on a thread pool, writing their output in registration order. A command
+    returning `False` stops the execution of the commands after it.
+
+    Keyword Arguments:
+        `worker_count`: number of threads; defaults to the `ThreadPoolExecutor` default.
+    """
+
+    if args is None:
+        args = [ 0, 1, 1, 2, 3, 5, 8, 13, 21, 34, 55, ]
+
+    registered_commands = get_registered_commands()
+
+    try:
+        thread_runner.execute_concurrently( registered_commands, args, worker_count = kwargs.get( "worker_count", None ), instance_kwargs = { "stdout": True, "stderr": False } )
     except Exception as e:
         print( f"Error executing commands: { e }" )
         error_code = 1
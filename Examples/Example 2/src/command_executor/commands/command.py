@@ -1,5 +1,8 @@
 from typing import Any, Dict, Iterable
 
+import asyncio
+import functools
+
 class Command( object ):
     """
     Represents a parent executable command.
@@ -24,3 +27,14 @@ class Command( object ):
         """
 
         raise NotImplementedError( "Child must implement." )
+
+    async def execute_async( self, *args: Iterable[ Any ], **kwargs: Dict[ str, Any ] ) -> bool:
+        """
+        Executes the command using the given positional and keyword arguments without blocking the event loop. Children may override this with a native
+        coroutine; by default, `execute` is run in the event loop's default executor.
+
+        Returns:
+        `True` if further command execution should continue, `False` otherwise.
+        """
+
+        return await asyncio.get_event_loop().run_in_executor( None, functools.partial( self.execute, *args, **kwargs ) )
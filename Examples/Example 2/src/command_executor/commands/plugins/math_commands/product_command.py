@@ -5,7 +5,7 @@ import sys
 from .. import register_command
 from ...command import Command
 
-@register_command()
+@register_command( cacheable = True )
 class ProductCommand( Command ):
     """
     Represents a executable command to print the product of the arguments.
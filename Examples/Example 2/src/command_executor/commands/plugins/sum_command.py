@@ -4,7 +4,7 @@ import sys
 from . import register_command
 from ..command import Command
 
-@register_command()
+@register_command( cacheable = True )
 class SumCommand( Command ):
     """
     Represents a executable command to print the sum of the arguments.
@@ -0,0 +1,4 @@
+"""
+Benchmarks of the plugin engine. The benchmarks require the `plugin_engine` package to be importable, e.g. by installing the package or by adding the `src`
+directory to `PYTHONPATH`, and are run from the repository root as modules, e.g. `python -m benchmarks.discovery_benchmark`.
+"""
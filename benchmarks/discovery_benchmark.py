@@ -0,0 +1,93 @@
+"""
+Compares serial and parallel recursive module discovery on a synthetic plugin tree.
+
+Usage:
+    python -m benchmarks.discovery_benchmark [--files 10000] [--files-per-directory 50] [--fan-out 4] [--workers 8] [--repeat 5] [--directory PATH]
+"""
+
+from typing import List
+
+import argparse
+import os
+import os.path
+import shutil
+import statistics
+import tempfile
+import time
+from plugin_engine.dynamic_import import ModuleCandidate, discover_modules
+
+def generate_flat_tree( root: str, file_count: int, files_per_directory: int, fan_out: int ) -> int:
+    """
+    Generates a tree of empty module files, filling directories breadth-first with the given number of files and subdirectories each.
+
+    Returns:
+    The number of directories created.
+    """
+
+    pending_directories: List[ str ] = [ root ]
+    directory_count = 0
+    files_created = 0
+
+    while files_created < file_count:
+        directory = pending_directories.pop( 0 )
+        os.makedirs( directory, exist_ok = True )
+        directory_count += 1
+
+        for index in range( min( files_per_directory, file_count - files_created ) ):
+            with open( os.path.join( directory, f"plugin_{ files_created + index }.py" ), "w" ):
+                pass
+        files_created += min( files_per_directory, file_count - files_created )
+
+        for index in range( fan_out ):
+            pending_directories.append( os.path.join( directory, f"package_{ index }" ) )
+
+    return directory_count
+
+def time_discovery( root: str, repeat: int, **kwargs ) -> List[ float ]:
+    timings: List[ float ] = []
+
+    for _ in range( repeat ):
+        start = time.perf_counter()
+        discover_modules( root, ".py", recursive = True, **kwargs )
+        timings.append( time.perf_counter() - start )
+
+    return timings
+
+def main( args = None ) -> int:
+    parser = argparse.ArgumentParser( description = "Compares serial and parallel recursive module discovery." )
+    parser.add_argument( "--files", type = int, default = 10000, help = "number of module files to generate" )
+    parser.add_argument( "--files-per-directory", type = int, default = 50, help = "number of module files per directory" )
+    parser.add_argument( "--fan-out", type = int, default = 4, help = "number of subdirectories per directory" )
+    parser.add_argument( "--workers", type = int, nargs = "+", default = [ 2, 4, 8, 16 ], help = "parallel discovery worker counts to measure" )
+    parser.add_argument( "--repeat", type = int, default = 5, help = "number of timed runs per configuration" )
+    parser.add_argument( "--directory", default = None, help = "directory to generate the tree in, e.g. on a network volume; defaults to a temporary directory" )
+    arguments = parser.parse_args( args )
+
+    base_directory = tempfile.mkdtemp( prefix = "plugin-discovery-", dir = arguments.directory )
+    try:
+        root = os.path.join( base_directory, "plugins" )
+        directory_count = generate_flat_tree( root, arguments.files, arguments.files_per_directory, arguments.fan_out )
+        print( f"Generated { arguments.files } files in { directory_count } directories under '{ root }'." )
+
+        expected: List[ ModuleCandidate ] = discover_modules( root, ".py", recursive = True )
+
+        print( f"{ 'configuration':<16}{ 'median (ms)':>14}{ 'min (ms)':>12}" )
+        serial_timings = time_discovery( root, arguments.repeat )
+        print( f"{ 'serial':<16}{ statistics.median( serial_timings ) * 1000:>14.2f}{ min( serial_timings ) * 1000:>12.2f}" )
+
+        for worker_count in arguments.workers:
+            if discover_modules( root, ".py", recursive = True, discovery_workers = worker_count ) != expected:
+                print( f"Parallel discovery with { worker_count } workers did not produce the serial order." )
+                return 1
+
+            timings = time_discovery( root, arguments.repeat, discovery_workers = worker_count )
+            print( f"{ f'{ worker_count } workers':<16}{ statistics.median( timings ) * 1000:>14.2f}{ min( timings ) * 1000:>12.2f}" )
+    finally:
+        shutil.rmtree( base_directory, ignore_errors = True )
+
+    return 0
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit( main() )
@@ -0,0 +1,124 @@
+"""
+Generates synthetic, importable plugin packages for benchmarks.
+
+The generated package's `__init__.py` defines a `Plugin` base class, a `registry` dictionary and a `register` decorator which registers classes into it with
+`register_class`. Each plugin module imports some earlier plugin modules, runs a loop to simulate the cost of its module body, and defines one registered
+`Plugin` subclass, which is disabled for a given fraction of the modules.
+"""
+
+from typing import Any, Dict, List, NamedTuple
+
+import os
+import os.path
+import random
+
+_PACKAGE_INIT_SOURCE: str = '''
+from plugin_engine.class_registration import register_class
+
+registry = {}
+
+class Plugin( object ):
+    pass
+
+def register( enabled = True ):
+    def decorator( cls ):
+        register_class( cls, registry, Plugin, enabled = enabled )
+        return cls
+
+    return decorator
+'''
+
+class PluginTree( NamedTuple ):
+    """
+    A generated plugin package.
+
+    Fields:
+    `root`: directory the package directory was generated in; must be on `sys.path` to import the package.
+    `package_name`: name of the package.
+    `module_names`: absolute names of the plugin modules, in generation order.
+    `directory_count`: number of directories containing plugin modules.
+    `enabled_count`: number of plugin modules whose class is registered.
+    """
+
+    root: str
+    package_name: str
+    module_names: List[ str ]
+    directory_count: int
+    enabled_count: int
+
+    @property
+    def package_directory( self ) -> str:
+        """
+        The directory of the package.
+        """
+
+        return os.path.join( self.root, self.package_name )
+
+def generate_plugin_tree( root: str, package_name: str, file_count: int, **kwargs: Dict[ str, Any ] ) -> PluginTree:
+    """
+    Generates a plugin package in the given directory.
+
+    Parameters:
+    `root`: directory to generate the package directory in.
+    `package_name`: name of the package; must be a valid identifier which is not already imported.
+    `file_count`: number of plugin modules.
+
+    Keywords:
+    `depth`: number of directory levels below the package directory the modules are spread over; defaults to 0, indicating every module is in the package
+        directory. Subdirectories are namespace packages.
+    `directory_fan_out`: number of subdirectories per directory; defaults to 2.
+    `import_fan_out`: number of earlier plugin modules each module imports; defaults to 0.
+    `body_cost`: number of loop iterations each module body runs; defaults to 0.
+    `disabled_fraction`: fraction of the modules whose class is not registered; defaults to 0.
+    `seed`: seed of the choice of imported and disabled modules; defaults to 0.
+    """
+
+    depth: int = int( kwargs.get( "depth", 0 ) )
+    directory_fan_out: int = max( 1, int( kwargs.get( "directory_fan_out", 2 ) ) )
+    import_fan_out: int = int( kwargs.get( "import_fan_out", 0 ) )
+    body_cost: int = int( kwargs.get( "body_cost", 0 ) )
+    disabled_fraction: float = float( kwargs.get( "disabled_fraction", 0.0 ) )
+    randomizer = random.Random( kwargs.get( "seed", 0 ) )
+
+    if not package_name.isidentifier():
+        raise ValueError( f"Invalid package name: { package_name }" )
+
+    package_directory = os.path.join( root, package_name )
+    os.makedirs( package_directory )
+    with open( os.path.join( package_directory, "__init__.py" ), "w" ) as file:
+        file.write( _PACKAGE_INIT_SOURCE )
+
+    # relative directory parts of every directory of the tree, breadth-first.
+    directories: List[ List[ str ] ] = [ [] ]
+    level: List[ List[ str ] ] = [ [] ]
+    for _ in range( depth ):
+        level = [ parts + [ f"group_{ index }" ] for parts in level for index in range( directory_fan_out ) ]
+        directories.extend( level )
+
+    disabled_indexes = set( randomizer.sample( range( file_count ), int( file_count * disabled_fraction ) ) )
+    module_names: List[ str ] = []
+    used_directories = set()
+
+    for index in range( file_count ):
+        parts = directories[ index % len( directories ) ]
+        directory = os.path.join( package_directory, *parts )
+        os.makedirs( directory, exist_ok = True )
+        used_directories.add( directory )
+
+        imports = randomizer.sample( module_names, min( import_fan_out, len( module_names ) ) )
+        lines = [ f"from { package_name } import Plugin, register" ]
+        lines.extend( f"import { name }" for name in imports )
+        lines.append( "" )
+        lines.append( f"for _ in range( { body_cost } ):" )
+        lines.append( "    pass" )
+        lines.append( "" )
+        lines.append( f"@register( enabled = { index not in disabled_indexes } )" )
+        lines.append( f"class Plugin{ index }( Plugin ):" )
+        lines.append( "    pass" )
+
+        with open( os.path.join( directory, f"plugin_{ index }.py" ), "w" ) as file:
+            file.write( "\n".join( lines ) + "\n" )
+
+        module_names.append( ".".join( [ package_name ] + parts + [ f"plugin_{ index }" ] ) )
+
+    return PluginTree( root, package_name, module_names, len( used_directories ), file_count - len( disabled_indexes ) )
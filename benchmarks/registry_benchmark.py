@@ -0,0 +1,127 @@
+"""
+Compares multi-threaded read and write throughput of a registry dictionary guarded by a lock, as in the examples' `get_registered_commands`, with a
+copy-on-write `PluginRegistry` whose reads take no lock.
+
+Usage:
+    python -m benchmarks.registry_benchmark [--readers 32] [--classes 400] [--duration 2] [--write-interval 0.001]
+"""
+
+from typing import Any, Callable, Dict, List, Tuple
+
+import argparse
+import multiprocessing
+import sys
+import threading
+import time
+from plugin_engine.class_registration import register_class
+from plugin_engine.plugin_registry import PluginRegistry
+
+class _Plugin( object ):
+    pass
+
+def _create_classes( count: int, prefix: str ) -> List[ type ]:
+    return [ type( f"{ prefix }{ index }", ( _Plugin, ), {} ) for index in range( count ) ]
+
+def _run( reader: Callable[ [ str ], Any ], writer: Callable[ [ type ], Any ], registration_ids: List[ str ], new_classes: List[ type ], reader_count: int, duration: float, write_interval: float ) -> Tuple[ int, int, float ]:
+    """
+    Runs the readers and the writer for the given duration.
+
+    Returns:
+    The number of reads and writes, and the measured number of seconds they took.
+    """
+
+    start_event = threading.Event()
+    stop_event = threading.Event()
+    read_counts: List[ int ] = [ 0 ] * reader_count
+    write_count: List[ int ] = [ 0 ]
+    # each thread checks the deadline itself, so stopping does not depend on the main thread winning the GIL from the busy readers.
+    deadline: List[ float ] = [ 0.0 ]
+
+    def read_loop( reader_index: int ):
+        count = 0
+        id_count = len( registration_ids )
+        start_event.wait()
+        while not stop_event.is_set() and time.perf_counter() < deadline[ 0 ]:
+            for index in range( 0, id_count, 7 ):
+                reader( registration_ids[ index ] )
+            count += len( range( 0, id_count, 7 ) )
+        read_counts[ reader_index ] = count
+
+    def write_loop():
+        start_event.wait()
+        for class_ in new_classes:
+            if stop_event.wait( write_interval ) or time.perf_counter() >= deadline[ 0 ]:
+                break
+
+            writer( class_ )
+            write_count[ 0 ] += 1
+
+    threads = [ threading.Thread( target = read_loop, args = ( index, ) ) for index in range( reader_count ) ]
+    threads.append( threading.Thread( target = write_loop ) )
+
+    # every thread is started before the clock starts, as starting a thread waits for it to run.
+    for thread in threads:
+        thread.start()
+
+    # a short switch interval hands the GIL around often enough for the writer and the main thread to run promptly.
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval( 0.0005 )
+    try:
+        start_time = time.perf_counter()
+        deadline[ 0 ] = start_time + duration
+        start_event.set()
+
+        time.sleep( duration )
+        stop_event.set()
+
+        for thread in threads:
+            thread.join()
+
+        elapsed_time = time.perf_counter() - start_time
+    finally:
+        sys.setswitchinterval( switch_interval )
+
+    return sum( read_counts ), write_count[ 0 ], elapsed_time
+
+def main( args = None ) -> int:
+    parser = argparse.ArgumentParser( description = "Compares locked-dictionary and copy-on-write registry throughput." )
+    parser.add_argument( "--readers", type = int, default = 32, help = "number of reader threads" )
+    parser.add_argument( "--classes", type = int, default = 400, help = "number of initially registered classes" )
+    parser.add_argument( "--duration", type = float, default = 2.0, help = "number of seconds each configuration runs" )
+    parser.add_argument( "--write-interval", type = float, default = 0.001, help = "number of seconds between registrations by the writer thread" )
+    arguments = parser.parse_args( args )
+
+    initial_classes = _create_classes( arguments.classes, "Initial" )
+    registration_ids: List[ str ] = [ class_.__qualname__ for class_ in initial_classes ]
+    results: List[ Tuple[ str, int, int, float ] ] = []
+
+    # the pattern used by the examples: every read and write holds a multiprocessing lock.
+    lock = multiprocessing.RLock()
+    locked_dictionary: Dict[ str, type ] = {}
+    for class_ in initial_classes:
+        register_class( class_, locked_dictionary, _Plugin, registration_target_lock = lock )
+
+    def locked_read( registration_id: str ):
+        with lock:
+            return locked_dictionary[ registration_id ]
+
+    reads, writes, elapsed_time = _run( locked_read, lambda class_: register_class( class_, locked_dictionary, _Plugin, registration_target_lock = lock ), registration_ids,
+                          _create_classes( 100000, "Locked" ), arguments.readers, arguments.duration, arguments.write_interval )
+    results.append( ( "locked dict", reads, writes, elapsed_time ) )
+
+    copy_on_write_registry = PluginRegistry( copy_on_write = True )
+    for class_ in initial_classes:
+        register_class( class_, copy_on_write_registry, _Plugin )
+
+    reads, writes, elapsed_time = _run( lambda registration_id: copy_on_write_registry[ registration_id ], lambda class_: register_class( class_, copy_on_write_registry, _Plugin ),
+                          registration_ids, _create_classes( 100000, "CopyOnWrite" ), arguments.readers, arguments.duration, arguments.write_interval )
+    results.append( ( "copy-on-write", reads, writes, elapsed_time ) )
+
+    print( f"{ 'configuration':<16}{ 'reads/s':>14}{ 'writes/s':>12}{ 'seconds':>10}" )
+    for name, reads, writes, elapsed_time in results:
+        print( f"{ name:<16}{ reads / elapsed_time:>14.0f}{ writes / elapsed_time:>12.0f}{ elapsed_time:>10.2f}" )
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit( main() )
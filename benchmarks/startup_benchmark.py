@@ -0,0 +1,216 @@
+"""
+Measures plugin startup on a synthetic plugin package: discovery, `import_modules`, `PluginImporter.import_modules`, `PluginImporter.reload_modules` and
+`register_class` throughput. Results can be written to a JSON baseline and later runs compared against it to detect regressions.
+
+Usage:
+    python -m benchmarks.startup_benchmark [--files 500] [--depth 2] [--directory-fan-out 2] [--import-fan-out 2] [--body-cost 1000]
+        [--disabled-fraction 0.1] [--classes 2000] [--repeat 5] [--output PATH] [--baseline PATH] [--tolerance 0.2]
+
+Notes:
+    - Each import is measured after the plugin modules are removed from `sys.modules`; the `.pyc` files written by the first import are reused, so the
+      measurements reflect warm-disk, cold-interpreter imports.
+"""
+
+from typing import Any, Callable, Dict, List, Optional
+
+import argparse
+import importlib
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from plugin_engine.class_registration import register_class
+from plugin_engine.dynamic_import import discover_modules, import_modules
+from plugin_engine.plugin_importer import PluginImporter
+from plugin_engine.plugin_registry import PluginRegistry
+from .plugin_tree import PluginTree, generate_plugin_tree
+
+BASELINE_FORMAT_VERSION: int = 1
+
+class _Plugin( object ):
+    pass
+
+def _forget_plugins( tree: PluginTree ):
+    """
+    Removes the plugin modules of the given tree from `sys.modules` and empties its registry, so they are imported again.
+    """
+
+    prefix = f"{ tree.package_name }."
+    for name in [ name for name in sys.modules if name.startswith( prefix ) ]:
+        del sys.modules[ name ]
+
+    package = sys.modules[ tree.package_name ]
+    package.registry.clear()
+    for name in [ name for name in vars( package ) if name.startswith( "plugin_" ) or name.startswith( "group_" ) ]:
+        delattr( package, name )
+
+    importlib.invalidate_caches()
+
+def _time( callback: Callable[ [], Any ], repeat: int, setup: Optional[ Callable[ [], Any ] ] = None ) -> Dict[ str, float ]:
+    timings: List[ float ] = []
+
+    for _ in range( repeat ):
+        if setup is not None:
+            setup()
+
+        start = time.perf_counter()
+        callback()
+        timings.append( time.perf_counter() - start )
+
+    return { "median": statistics.median( timings ), "min": min( timings ) }
+
+def run_benchmarks( tree: PluginTree, repeat: int, class_count: int ) -> Dict[ str, Dict[ str, float ] ]:
+    """
+    Runs the benchmarks on the given generated package.
+
+    Returns:
+    Dictionary of benchmark names to the median and minimum of their timings, in seconds.
+    """
+
+    package = importlib.import_module( tree.package_name )
+    results: Dict[ str, Dict[ str, float ] ] = {}
+
+    results[ "discover_modules" ] = _time( lambda: discover_modules( tree.package_directory, ".py", recursive = True ), repeat )
+
+    def verify_registry():
+        if len( package.registry ) != tree.enabled_count:
+            raise Exception( f"{ len( package.registry ) } plugins were registered; { tree.enabled_count } were expected." )
+
+    results[ "import_modules" ] = _time( lambda: import_modules( tree.package_directory, ".py", recursive = True, relative_import_package = package ), repeat,
+                                         lambda: _forget_plugins( tree ) )
+    verify_registry()
+
+    importers: List[ PluginImporter ] = []
+    def import_with_importer():
+        importers.append( PluginImporter( package ) )
+        importers[ -1 ].import_modules( recursive = True )
+
+    results[ "PluginImporter.import_modules" ] = _time( import_with_importer, repeat, lambda: _forget_plugins( tree ) )
+    verify_registry()
+
+    results[ "PluginImporter.reload_modules" ] = _time( importers[ -1 ].reload_modules, repeat )
+    verify_registry()
+
+    classes: List[ type ] = []
+    def create_classes():
+        classes[:] = [ type( f"Registered{ index }", ( _Plugin, ), {} ) for index in range( class_count ) ]
+
+    for name, target_type in ( ( "register_class (dict)", dict ), ( "register_class (PluginRegistry)", PluginRegistry ) ):
+        def register_all():
+            registration_target = target_type()
+            for class_ in classes:
+                register_class( class_, registration_target, _Plugin, registration_id_extractor_callback = lambda c: c.__name__ )
+
+        timing = _time( register_all, repeat, create_classes )
+        timing[ "per_second" ] = class_count / timing[ "median" ]
+        results[ name ] = timing
+
+    return results
+
+def compare_results( results: Dict[ str, Dict[ str, float ] ], baseline: Dict[ str, Dict[ str, float ] ], tolerance: float ) -> List[ str ]:
+    """
+    Compares the median timings of the given results with a baseline.
+
+    Returns:
+    The names of the benchmarks whose median is slower than the baseline's by more than the given fraction.
+    """
+
+    regressions: List[ str ] = []
+
+    print( f"{ 'benchmark':<34}{ 'baseline (ms)':>15}{ 'current (ms)':>15}{ 'change':>10}" )
+    for name, timing in results.items():
+        if name not in baseline:
+            continue
+
+        ratio = timing[ "median" ] / baseline[ name ][ "median" ]
+        is_regression = ratio > 1 + tolerance
+        if is_regression:
+            regressions.append( name )
+
+        print( f"{ name:<34}{ baseline[ name ][ 'median' ] * 1000:>15.2f}{ timing[ 'median' ] * 1000:>15.2f}{ ( ratio - 1 ) * 100:>+9.1f}%{ ' !' if is_regression else '' }" )
+
+    return regressions
+
+def main( args = None ) -> int:
+    parser = argparse.ArgumentParser( description = "Measures plugin discovery, import, reload and registration on a synthetic plugin package." )
+    parser.add_argument( "--files", type = int, default = 500, help = "number of plugin modules to generate" )
+    parser.add_argument( "--depth", type = int, default = 2, help = "number of directory levels the plugin modules are spread over" )
+    parser.add_argument( "--directory-fan-out", type = int, default = 2, help = "number of subdirectories per directory" )
+    parser.add_argument( "--import-fan-out", type = int, default = 2, help = "number of other plugin modules each plugin module imports" )
+    parser.add_argument( "--body-cost", type = int, default = 1000, help = "number of loop iterations each plugin module body runs" )
+    parser.add_argument( "--disabled-fraction", type = float, default = 0.1, help = "fraction of plugin classes which are registered as disabled" )
+    parser.add_argument( "--classes", type = int, default = 2000, help = "number of classes registered by the register_class benchmarks" )
+    parser.add_argument( "--repeat", type = int, default = 5, help = "number of timed runs per benchmark" )
+    parser.add_argument( "--seed", type = int, default = 0, help = "seed of the generated plugin package" )
+    parser.add_argument( "--directory", default = None, help = "directory to generate the package in, which is created if it does not exist; defaults to a temporary directory" )
+    parser.add_argument( "--output", default = None, help = "path of a JSON file to write the results to, for use as a baseline" )
+    parser.add_argument( "--baseline", default = None, help = "path of a JSON file written by a previous run to compare the results with" )
+    parser.add_argument( "--tolerance", type = float, default = 0.2, help = "fraction by which a median may exceed the baseline's before it is a regression" )
+    arguments = parser.parse_args( args )
+
+    parameters: Dict[ str, Any ] = {
+        "files": arguments.files,
+        "depth": arguments.depth,
+        "directory_fan_out": arguments.directory_fan_out,
+        "import_fan_out": arguments.import_fan_out,
+        "body_cost": arguments.body_cost,
+        "disabled_fraction": arguments.disabled_fraction,
+        "classes": arguments.classes,
+        "repeat": arguments.repeat,
+        "seed": arguments.seed,
+    }
+
+    if arguments.directory is not None:
+        Path( arguments.directory ).mkdir( parents = True, exist_ok = True )
+
+    base_directory = tempfile.mkdtemp( prefix = "plugin-startup-", dir = arguments.directory )
+    sys.path.insert( 0, base_directory )
+    try:
+        tree = generate_plugin_tree( base_directory, f"synthetic_plugins_{ os.getpid() }", arguments.files, depth = arguments.depth,
+                                     directory_fan_out = arguments.directory_fan_out, import_fan_out = arguments.import_fan_out, body_cost = arguments.body_cost,
+                                     disabled_fraction = arguments.disabled_fraction, seed = arguments.seed )
+        print( f"Generated { arguments.files } plugin modules in { tree.directory_count } directories under '{ tree.package_directory }'." )
+
+        results = run_benchmarks( tree, arguments.repeat, arguments.classes )
+    finally:
+        sys.path.remove( base_directory )
+        shutil.rmtree( base_directory, ignore_errors = True )
+
+    print( f"{ 'benchmark':<34}{ 'median (ms)':>14}{ 'min (ms)':>12}" )
+    for name, timing in results.items():
+        print( f"{ name:<34}{ timing[ 'median' ] * 1000:>14.2f}{ timing[ 'min' ] * 1000:>12.2f}" )
+
+    if arguments.output is not None:
+        with open( arguments.output, "w" ) as file:
+            json.dump( {
+                "version": BASELINE_FORMAT_VERSION,
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "parameters": parameters,
+                "results": results,
+            }, file, indent = 2 )
+
+    if arguments.baseline is not None:
+        with open( arguments.baseline, "r" ) as file:
+            baseline = json.load( file )
+
+        if baseline.get( "version", None ) != BASELINE_FORMAT_VERSION:
+            print( f"'{ arguments.baseline }' is not a baseline of this benchmark." )
+            return 2
+        elif baseline.get( "parameters", None ) != parameters:
+            print( "Warning: the baseline was measured with different parameters." )
+
+        regressions = compare_results( results, baseline[ "results" ], arguments.tolerance )
+        if len( regressions ) > 0:
+            print( f"Regressions: { ', '.join( regressions ) }" )
+            return 1
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit( main() )
@@ -0,0 +1,55 @@
+__version__ = r"1.0.0"
+
+from typing import Any, Dict, Iterable, List, Mapping, Sequence, Tuple, Type
+
+import asyncio
+
+async def execute_concurrently( registered_classes: Mapping[ Any, Type ], argument_sets: Iterable[ Sequence[ Any ] ], **kwargs: Dict[ str, Any ] ) -> List[ Tuple[ Any, Sequence[ Any ], Any ] ]:
+    """
+    Executes every registered class concurrently with each of the given argument sets, by awaiting a coroutine method of each instance.
+
+    Parameters:
+    `registered_classes`: mapping of registration IDs to the classes to execute, such as a registry snapshot.
+    `argument_sets`: positional arguments of the executions of each class.
+
+    Keywords:
+    `max_concurrency_per_class`: maximum number of executions of the same class running at once; defaults to 1.
+    `timeout`: number of seconds after which the executions still running are cancelled and `asyncio.TimeoutError` is raised; defaults to None, indicating
+        no timeout.
+    `instance_kwargs`: keywords each class is instantiated with; defaults to none.
+    `method_name`: name of the coroutine method called on each instance; defaults to `execute_async`.
+
+    Returns:
+    List of the registration ID, argument set and result of each execution, in registration order, then argument set order.
+
+    Notes:
+        - Cancelling the awaiting task cancels every execution which has not completed; executions running in an executor finish in the background, but
+          their results are discarded.
+        - If an execution raises an exception, the other executions are cancelled and the exception is raised.
+    """
+
+    max_concurrency_per_class = int( kwargs.get( "max_concurrency_per_class", 1 ) )
+    if max_concurrency_per_class < 1:
+        raise ValueError( f"Invalid maximum concurrency per class: { max_concurrency_per_class }" )
+
+    instance_kwargs: Dict[ str, Any ] = dict( kwargs.get( "instance_kwargs", None ) or {} )
+    method_name: str = kwargs.get( "method_name", "execute_async" )
+    argument_sets = [ tuple( argument_set ) for argument_set in argument_sets ]
+    executions: List[ Tuple[ Any, Sequence[ Any ] ] ] = [ ( registration_id, argument_set ) for registration_id in registered_classes for argument_set in argument_sets ]
+    semaphores: Dict[ Any, asyncio.Semaphore ] = { registration_id: asyncio.Semaphore( max_concurrency_per_class ) for registration_id in registered_classes }
+
+    async def execute( registration_id: Any, argument_set: Sequence[ Any ] ) -> Any:
+        async with semaphores[ registration_id ]:
+            return await getattr( registered_classes[ registration_id ]( **instance_kwargs ), method_name )( *argument_set )
+
+    tasks = [ asyncio.ensure_future( execute( registration_id, argument_set ) ) for registration_id, argument_set in executions ]
+
+    try:
+        results = await asyncio.wait_for( asyncio.gather( *tasks ), kwargs.get( "timeout", None ) )
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+
+        raise
+
+    return [ ( registration_id, argument_set, result ) for ( registration_id, argument_set ), result in zip( executions, results ) ]
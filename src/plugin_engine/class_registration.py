@@ -1,57 +1,271 @@
-__version__ = r"1.0.0"
-
-from typing import Any, Callable, Dict, Iterable, Type
-
-def register_class( class_ : Type, registration_target : Dict[ Any, Type ], *acceptable_parent_classes : Iterable[ Type ], **kwargs : Dict[ str, Any ] ) -> bool:
-    """
-    Registers into the given registration target if the given class is a subclass of at least one of the given acceptable parent classes.
-
-    Optional Keyword Arguments:
-        `enabled`: boolean which controls if the class should be registered; defaults to `True`.
-        `registration_id_extractor_callback`: callable used to extract a registration target-unique ID from the given class. If no callback is provided, the qualified class name is used.
-        `quiet_ancestory_mismatch`: boolean which controls if a failed subclass check should result in a raised `Exception`; `True` results in no raised `Exception`, `False` results in a raised `Exception`; defaults to raising an `Exception`.
-        `registration_target_lock`: lock controlling access to the registration target; defaults to None, indicating there is lock.
-
-    Returns:
-        `True` if the given class was registered, `False` otherwise.
-
-    Notes:
-        - If no acceptable parent classes are provided, registration is attempted.
-    """
-
-    enabled : bool = bool( kwargs.get( "enabled", True ) )
-    result : bool = enabled
-
-    if enabled:
-        registration_id_extractor_callback : Callable = kwargs.get( "registration_id_extractor_callback", None )
-        if registration_id_extractor_callback is None:
-            registration_id_extractor_callback = lambda cls: cls.__qualname__
-
-        if class_ is None:
-            raise ValueError( "Class to register cannot be None." )
-        elif registration_target is None:
-            raise ValueError( "Registration target dictionary cannot be None." )
-        else:
-            quiet_ancestory_mismatch : bool = bool( kwargs.get( "quiet_ancestory_mismatch", None ) )
-
-            result = len( acceptable_parent_classes ) == 0 or issubclass( class_, acceptable_parent_classes )
-            if result:
-                lock = kwargs.get( "registration_target_lock", None )
-                
-                class_id = registration_id_extractor_callback( class_ )
-
-                if lock is not None:
-                    lock.acquire( blocking = True )
-
-                try:
-                    if class_id not in registration_target:
-                        registration_target[ class_id ] = class_
-                    else:
-                        raise ValueError( f"A class with ID ('{ class_id }') already exists in the registration target." )
-                finally:
-                    if lock is not None:
-                        lock.release()
-            elif not quiet_ancestory_mismatch:
-                raise ValueError( f"'{ class_.__qualname__ }' class does not have an acceptable parent class." )
-
-    return result
+__version__ = r"1.0.0"
+
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Type, Union
+
+import threading
+from contextlib import contextmanager
+from .instrumentation import REGISTRATION, measure
+from .lazy_registration import LazyClass
+from .plugin_registry import PluginRegistry
+
+class RegistrationError( ValueError ):
+    """
+    Raised when classes of a batch cannot be registered; none of the batch's classes are registered.
+    """
+
+    def __init__( self, errors: List[ str ] ):
+        super().__init__( f"Unable to register the batch of classes: { ' '.join( errors ) }" )
+        self.errors = errors
+
+class _PendingRegistration( NamedTuple ):
+    class_: Type
+    registration_target: Dict[ Any, Type ]
+    acceptable_parent_classes: Tuple[ Type, ... ]
+    kwargs: Dict[ str, Any ]
+
+# stack of the registration buffers active on each thread.
+_registration_buffers: threading.local = threading.local()
+
+def _get_qualified_name( class_: Type ) -> str:
+    return class_.__qualname__
+
+def _get_registration_buffer_stack() -> List[ List[ _PendingRegistration ] ]:
+    stack = getattr( _registration_buffers, "stack", None )
+    if stack is None:
+        stack = _registration_buffers.stack = []
+
+    return stack
+
+def _is_previous_registration( registered_class: Any, class_: Type ) -> bool:
+    """
+    Indicates if the registered class is a stand-in for, or a previous version of, the given class.
+    """
+
+    if isinstance( registered_class, LazyClass ):
+        return registered_class.is_stand_in_for( class_ )
+    else:
+        return registered_class is not class_ and getattr( registered_class, "__module__", None ) == class_.__module__ and getattr( registered_class, "__qualname__", None ) == class_.__qualname__
+
+def _store_class( registration_target: Dict[ Any, Type ], class_id: Any, class_: Type, tags: Optional[ Iterable[ Any ] ] ):
+    if tags is not None:
+        registration_target.register( class_id, class_, tags )
+    else:
+        registration_target[ class_id ] = class_
+
+def register_class( class_ : Type, registration_target : Dict[ Any, Type ], *acceptable_parent_classes : Iterable[ Type ], **kwargs : Dict[ str, Any ] ) -> bool:
+    """
+    Registers into the given registration target if the given class is a subclass of at least one of the given acceptable parent classes.
+
+    Optional Keyword Arguments:
+        `enabled`: boolean which controls if the class should be registered; defaults to `True`.
+        `registration_id_extractor_callback`: callable used to extract a registration target-unique ID from the given class. If no callback is provided, the qualified class name is used.
+        `quiet_ancestory_mismatch`: boolean which controls if a failed subclass check should result in a raised `Exception`; `True` results in no raised `Exception`, `False` results in a raised `Exception`; defaults to raising an `Exception`.
+        `registration_target_lock`: lock controlling access to the registration target; defaults to None, indicating there is lock.
+        `tags`: iterable of tags or capabilities the class is indexed by; requires the registration target to be a `PluginRegistry`; defaults to no tags.
+
+    Returns:
+        `True` if the given class was registered, or was buffered for registration, `False` otherwise.
+
+    Notes:
+        - If no acceptable parent classes are provided, registration is attempted.
+        - Within `buffered_registrations`, enabled classes are buffered and registered in bulk when the buffer is flushed.
+        - A class registered with the same ID from the same module and qualified name, such as the previous version of a reloaded class, or a `LazyClass`
+          stand-in for the given class, is replaced by the given class.
+    """
+
+    enabled : bool = bool( kwargs.get( "enabled", True ) )
+    result : bool = enabled
+
+    if enabled:
+        registration_id_extractor_callback : Callable = kwargs.get( "registration_id_extractor_callback", None )
+        if registration_id_extractor_callback is None:
+            registration_id_extractor_callback = _get_qualified_name
+
+        registration_buffer_stack = _get_registration_buffer_stack()
+
+        if class_ is None:
+            raise ValueError( "Class to register cannot be None." )
+        elif registration_target is None:
+            raise ValueError( "Registration target dictionary cannot be None." )
+        elif len( registration_buffer_stack ) > 0:
+            # validated and committed in bulk when the buffer is flushed.
+            registration_buffer_stack[ -1 ].append( _PendingRegistration( class_, registration_target, tuple( acceptable_parent_classes ), kwargs ) )
+        else:
+            quiet_ancestory_mismatch : bool = bool( kwargs.get( "quiet_ancestory_mismatch", None ) )
+
+            tags = kwargs.get( "tags", None )
+            if tags is not None and not isinstance( registration_target, PluginRegistry ):
+                raise ValueError( "Tags can only be registered into a PluginRegistry registration target." )
+
+            result = len( acceptable_parent_classes ) == 0 or issubclass( class_, acceptable_parent_classes )
+            if result:
+                lock = kwargs.get( "registration_target_lock", None )
+                
+                class_id = registration_id_extractor_callback( class_ )
+
+                with measure( REGISTRATION, str( class_id ) ):
+                    if lock is not None:
+                        lock.acquire()
+
+                    try:
+                        if class_id not in registration_target:
+                            _store_class( registration_target, class_id, class_, tags )
+                        elif _is_previous_registration( registration_target[ class_id ], class_ ):
+                            if isinstance( registration_target[ class_id ], LazyClass ):
+                                registration_target[ class_id ].bind( class_ )
+
+                            _store_class( registration_target, class_id, class_, tags )
+                        else:
+                            raise ValueError( f"A class with ID ('{ class_id }') already exists in the registration target." )
+                    finally:
+                        if lock is not None:
+                            lock.release()
+            elif not quiet_ancestory_mismatch:
+                raise ValueError( f"'{ class_.__qualname__ }' class does not have an acceptable parent class." )
+
+    return result
+
+def _commit_registrations( pending_registrations: Iterable[ _PendingRegistration ] ) -> List[ Type ]:
+    """
+    Validates all of the given registrations, then registers them with one lock acquisition per lock. Either every registration is committed or none are.
+
+    Raises:
+    `RegistrationError`: listing every registration which failed validation.
+    """
+
+    errors: List[ str ] = []
+    # keyed by the registration target's identity; values are the target, its lock and its registrations in order.
+    registrations_by_target: Dict[ int, Tuple[ Dict[ Any, Type ], Any, Dict[ Any, Tuple[ Type, Optional[ Iterable[ Any ] ] ] ] ] ] = {}
+
+    for class_, registration_target, acceptable_parent_classes, kwargs in pending_registrations:
+        if not bool( kwargs.get( "enabled", True ) ):
+            continue
+
+        tags = kwargs.get( "tags", None )
+        if tags is not None and not isinstance( registration_target, PluginRegistry ):
+            errors.append( f"'{ class_.__qualname__ }' class has tags, which can only be registered into a PluginRegistry registration target." )
+            continue
+
+        if len( acceptable_parent_classes ) > 0 and not issubclass( class_, acceptable_parent_classes ):
+            if not bool( kwargs.get( "quiet_ancestory_mismatch", None ) ):
+                errors.append( f"'{ class_.__qualname__ }' class does not have an acceptable parent class." )
+            continue
+
+        registration_id_extractor_callback: Callable = kwargs.get( "registration_id_extractor_callback", None ) or _get_qualified_name
+        class_id = registration_id_extractor_callback( class_ )
+
+        _, _, target_registrations = registrations_by_target.setdefault( id( registration_target ), ( registration_target, kwargs.get( "registration_target_lock", None ), {} ) )
+
+        if class_id in target_registrations and not _is_previous_registration( target_registrations[ class_id ][ 0 ], class_ ):
+            errors.append( f"A class with ID ('{ class_id }') is registered more than once in the batch." )
+        else:
+            target_registrations[ class_id ] = ( class_, tags )
+
+    registration_count: int = sum( len( target_registrations ) for _, _, target_registrations in registrations_by_target.values() )
+
+    with measure( REGISTRATION, f"{ registration_count } buffered classes" ):
+        # each distinct lock is acquired once for the whole batch.
+        locks: List[ Any ] = []
+        for _, lock, _ in registrations_by_target.values():
+            if lock is not None and not any( lock is acquired_lock for acquired_lock in locks ):
+                locks.append( lock )
+
+        for lock in locks:
+            lock.acquire()
+
+        try:
+            for registration_target, _, target_registrations in registrations_by_target.values():
+                for class_id, ( class_, _ ) in target_registrations.items():
+                    if class_id in registration_target and not _is_previous_registration( registration_target[ class_id ], class_ ):
+                        errors.append( f"A class with ID ('{ class_id }') already exists in the registration target." )
+
+            if len( errors ) > 0:
+                raise RegistrationError( errors )
+
+            registered_classes: List[ Type ] = []
+
+            for registration_target, _, target_registrations in registrations_by_target.values():
+                for class_id, ( class_, _ ) in target_registrations.items():
+                    if isinstance( registration_target.get( class_id, None ), LazyClass ):
+                        registration_target[ class_id ].bind( class_ )
+
+                if isinstance( registration_target, PluginRegistry ):
+                    registration_target.register_many( ( class_id, class_, tags ) for class_id, ( class_, tags ) in target_registrations.items() )
+                else:
+                    for class_id, ( class_, _ ) in target_registrations.items():
+                        registration_target[ class_id ] = class_
+
+                registered_classes.extend( class_ for class_, _ in target_registrations.values() )
+        finally:
+            for lock in reversed( locks ):
+                lock.release()
+
+    return registered_classes
+
+def register_classes( classes: Iterable[ Union[ Type, Tuple[ Type, Dict[ str, Any ] ] ] ], registration_target: Dict[ Any, Type ], *acceptable_parent_classes: Iterable[ Type ], **kwargs: Dict[ str, Any ] ) -> List[ Type ]:
+    """
+    Registers a batch of classes into the given registration target. Every class is validated first and all of the duplicate-ID and ancestry errors are
+    reported together; the classes are then registered under a single acquisition of the registration target lock. Either all of the classes are registered
+    or none are.
+
+    Parameters:
+    `classes`: iterable of classes, or of tuples of a class and the keyword arguments specific to that class, which override the common keyword arguments.
+    `registration_target`: registration target to register into.
+    `acceptable_parent_classes`: classes at least one of which each class must be a subclass of.
+
+    Keywords:
+    Common keyword arguments of each class' registration; see `register_class`.
+
+    Returns:
+    List of the classes which were registered; disabled classes and classes with a quietly ignored ancestry mismatch are not registered.
+
+    Raises:
+    `RegistrationError`: listing every class which failed validation.
+    """
+
+    if registration_target is None:
+        raise ValueError( "Registration target dictionary cannot be None." )
+
+    pending_registrations: List[ _PendingRegistration ] = []
+
+    for entry in classes:
+        if isinstance( entry, tuple ):
+            class_, class_kwargs = entry
+            entry_kwargs = kwargs.copy()
+            entry_kwargs.update( class_kwargs )
+        else:
+            class_, entry_kwargs = entry, kwargs
+
+        if class_ is None:
+            raise ValueError( "Class to register cannot be None." )
+
+        pending_registrations.append( _PendingRegistration( class_, registration_target, tuple( acceptable_parent_classes ), entry_kwargs ) )
+
+    return _commit_registrations( pending_registrations )
+
+@contextmanager
+def buffered_registrations() -> Iterator[ List[ _PendingRegistration ] ]:
+    """
+    Context manager which buffers the registrations made by `register_class` on the current thread, such as by registration decorators while plugin modules
+    are imported, and registers them in bulk with `register_classes` semantics when the context exits.
+
+    Raises:
+    `RegistrationError`: when the context exits, listing every buffered registration which failed validation; none of the buffered classes are registered.
+
+    Notes:
+        - Buffered classes are not in their registration target until the context exits.
+        - If the context exits with an exception, such as an `ImportError` raised by a plugin module, the buffered registrations are discarded and the
+          exception propagates unchanged.
+    """
+
+    stack = _get_registration_buffer_stack()
+    registration_buffer: List[ _PendingRegistration ] = []
+    stack.append( registration_buffer )
+
+    try:
+        yield registration_buffer
+    finally:
+        stack.pop()
+
+    if len( registration_buffer ) > 0:
+        _commit_registrations( registration_buffer )
@@ -0,0 +1,215 @@
+__version__ = r"1.0.0"
+
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import json
+import os
+import os.path
+import threading
+import time
+from pathlib import Path
+
+# Directory modification times within this many nanoseconds of the scan are not trusted; a change made in the same timestamp granule as the scan would otherwise go unnoticed.
+_RACY_SIGNATURE_INTERVAL_NS: int = 2 * 1000 * 1000 * 1000
+
+DirectoryListing = Tuple[ List[ str ], List[ str ] ]
+
+class DiscoveryManifest( object ):
+    """
+    Persistent record of the module files discovered in a directory tree. Each directory is recorded with its modification time and inode signature, so
+    unchanged directories can be reused on a warm start without being listed again; only directories whose signature changed are rescanned.
+    """
+
+    FORMAT_VERSION: int = 1
+
+    def __init__( self, manifest_path: Union[ str, Path ] ):
+        if isinstance( manifest_path, str ):
+            manifest_path = Path( manifest_path )
+        elif not isinstance( manifest_path, Path ):
+            raise ValueError( "Manifest path must be a Path instance." )
+
+        self._manifest_path: Path = manifest_path
+        self._root: Optional[ str ] = None
+        self._parameters: Optional[ Dict[ str, Any ] ] = None
+        self._directories: Dict[ str, Dict[ str, Any ] ] = {}
+        self._visited_directories: set = set()
+        self._is_loaded: bool = False
+        self._is_dirty: bool = False
+        self._reused_directory_count: int = 0
+        self._scanned_directory_count: int = 0
+        # listings may be requested concurrently by parallel discovery.
+        self._lock: threading.Lock = threading.Lock()
+
+    @property
+    def manifest_path( self ) -> Path:
+        """
+        The path of the manifest file.
+        """
+
+        return self._manifest_path
+
+    @property
+    def reused_directory_count( self ) -> int:
+        """
+        The number of directories whose recorded listing was reused since the manifest was bound.
+        """
+
+        return self._reused_directory_count
+
+    @property
+    def scanned_directory_count( self ) -> int:
+        """
+        The number of directories which had to be listed since the manifest was bound.
+        """
+
+        return self._scanned_directory_count
+
+    @property
+    def is_dirty( self ) -> bool:
+        """
+        Indicates if the manifest has changes which have not been saved.
+        """
+
+        return self._is_dirty
+
+    def load( self ) -> bool:
+        """
+        Loads the manifest file, if it exists. A missing, unreadable or incompatible manifest is treated as empty.
+
+        Returns:
+        `True` if a manifest was loaded, `False` otherwise.
+        """
+
+        self._is_loaded = True
+        self._root = None
+        self._parameters = None
+        self._directories = {}
+
+        try:
+            with open( self.manifest_path, "r", encoding = "utf-8" ) as manifest_file:
+                content = json.load( manifest_file )
+        except ( OSError, ValueError ):
+            return False
+
+        if not isinstance( content, dict ) or content.get( "version", None ) != self.FORMAT_VERSION:
+            return False
+
+        directories = content.get( "directories", None )
+        if not isinstance( directories, dict ):
+            return False
+
+        self._root = content.get( "root", None )
+        self._parameters = content.get( "parameters", None )
+        self._directories = directories
+
+        return True
+
+    def save( self ) -> bool:
+        """
+        Writes the manifest file if it has changed. The file is replaced atomically so concurrent readers never observe a partial manifest.
+
+        Returns:
+        `True` if the manifest file was written, `False` otherwise.
+        """
+
+        if not self.is_dirty:
+            return False
+
+        # directories which were not visited during the last discovery no longer exist in the tree.
+        for relative_path in list( self._directories.keys() ):
+            if relative_path not in self._visited_directories:
+                del self._directories[ relative_path ]
+
+        content = {
+            "version": self.FORMAT_VERSION,
+            "root": self._root,
+            "parameters": self._parameters,
+            "directories": self._directories,
+        }
+
+        self.manifest_path.parent.mkdir( parents = True, exist_ok = True )
+        temporary_path = self.manifest_path.with_name( f"{ self.manifest_path.name }.{ os.getpid() }.tmp" )
+        with open( temporary_path, "w", encoding = "utf-8" ) as manifest_file:
+            json.dump( content, manifest_file, separators = ( ",", ":" ) )
+        os.replace( temporary_path, self.manifest_path )
+
+        self._is_dirty = False
+
+        return True
+
+    def bind( self, root: Union[ str, Path ], parameters: Dict[ str, Any ] ):
+        """
+        Prepares the manifest for a discovery pass over the given root directory using the given discovery parameters. Recorded listings are discarded if the
+        root or the parameters differ from the ones the manifest was recorded with.
+
+        Parameters:
+        `root`: root directory of the discovery pass.
+        `parameters`: JSON-serializable parameters which affect which files are discovered.
+        """
+
+        if not self._is_loaded:
+            self.load()
+
+        root = os.fspath( root )
+        if self._root != root or self._parameters != parameters:
+            self._root = root
+            self._parameters = parameters
+            self._directories = {}
+            self._is_dirty = True
+
+        self._visited_directories = set()
+        self._reused_directory_count = 0
+        self._scanned_directory_count = 0
+
+    def get_listing( self, directory_path: Union[ str, Path ], scan_callback: Callable[ [ str ], DirectoryListing ] ) -> DirectoryListing:
+        """
+        Gets the listing of the given directory, reusing the recorded listing when the directory signature is unchanged.
+
+        Parameters:
+        `directory_path`: directory to get the listing of; must be inside the bound root.
+        `scan_callback`: callable which lists the directory, returning the candidate filenames and the subdirectory names.
+
+        Returns:
+        Tuple of the candidate filenames and the subdirectory names.
+        """
+
+        if self._root is None:
+            raise Exception( "Cannot get a directory listing; the manifest is not bound to a root directory." )
+
+        directory_path = os.fspath( directory_path )
+        relative_path = Path( os.path.relpath( directory_path, self._root ) ).as_posix()
+        signature = self._get_signature( directory_path )
+
+        with self._lock:
+            self._visited_directories.add( relative_path )
+            record = self._directories.get( relative_path, None )
+
+            if signature is not None and record is not None and record.get( "signature", None ) == signature:
+                self._reused_directory_count += 1
+                return ( list( record[ "files" ] ), list( record[ "subdirectories" ] ) )
+
+        filenames, subdirectories = scan_callback( directory_path )
+
+        with self._lock:
+            self._scanned_directory_count += 1
+            self._directories[ relative_path ] = {
+                "signature": signature if signature is not None and not self._is_racy( signature ) else None,
+                "files": list( filenames ),
+                "subdirectories": list( subdirectories ),
+            }
+            self._is_dirty = True
+
+        return ( filenames, subdirectories )
+
+    @staticmethod
+    def _get_signature( directory_path: str ) -> Optional[ List[ int ] ]:
+        try:
+            stat_result = os.stat( directory_path )
+        except OSError:
+            return None
+        else:
+            return [ stat_result.st_mtime_ns, stat_result.st_ino ]
+
+    @staticmethod
+    def _is_racy( signature: List[ int ] ) -> bool:
+        return int( time.time() * 1e9 ) - signature[ 0 ] < _RACY_SIGNATURE_INTERVAL_NS
@@ -1,117 +1,373 @@
-__version__ = r"1.0.0"
-
-from types import ModuleType
-from typing import Any, Dict, Iterable, List, Set, Union
-
-import importlib
-import os
-import os.path
-from pathlib import Path
-
-def import_modules( directory_path: Union[ str, Path ], *target_file_extensions: Iterable[ str ], **kwargs: Dict[ str, Any ] ) -> List[ ModuleType ]:
-    """
-    Imports modules from files from the given directory path which have one of the target file extensions. Modules whose filenames start with a period are ignored.
-
-    Parameters:
-    `directory_path`: directory path to load modules from.
-    `target_file_extensions`: iterable of file extensions to match file to load from.
-
-    Keywords:
-    `relative_import_package`: package the modules are imported relative to; defaults to None indicating the imports are absolute.
-    `recursive`: indicates if the directory path should be searched recursively; defaults to `False`..
-    `ignored_filenames`: iterable of filenames which are ignored when discovering modules to import.
-
-    Returns:
-    List of modules loaded.
-
-    Notes:
-        - If the directory path is a relative string, it is assumed to be relative from the current working directory.
-    """
-
-    if isinstance( directory_path, str ):
-        if not os.path.isabs( directory_path ):
-            directory_path: Path = Path( os.getcwd(), directory_path )
-        else:
-            directory_path: Path = Path( directory_path )
-    elif not isinstance( directory_path, Path ):
-        raise ValueError( "Directory path must be a Path instance." )
-
-    relative_import_package_name: ModuleType = kwargs.get( "relative_import_package", None )
-    if relative_import_package_name is not None:
-        if isinstance( relative_import_package_name, ModuleType ):
-            relative_import_package_name = relative_import_package_name.__name__
-        elif not isinstance( relative_import_package_name, str ):
-            raise ValueError( f"Invalid relative import package name: { relative_import_package_name }" )
-
-    recursive: bool = bool( kwargs.get( "recursive", False ) )
-
-    raw_ignored_filenames: Iterable[ Union[ str, Path ] ] = kwargs.get( "ignored_filenames", None )
-    if raw_ignored_filenames is None:
-        raw_ignored_filenames = [ "__init__", "__main__" ]
-
-    ignored_filenames: Set[ Path ] = set()
-    for filename in raw_ignored_filenames:
-        if isinstance( filename, str ):
-            filename = Path( filename )
-        elif not isinstance( filename, Path ):
-            raise ValueError( "Invalid ignored filename; filename must be a Path." )
-
-        ignored_filenames.add( filename )
-    _ignored_filenames = set( map( lambda x: x.stem, ignored_filenames ) )
-
-    # verify the target_file_extensions
-    for ext in target_file_extensions:
-        if not isinstance( ext, str ):
-            raise ValueError( f"File extension '{ ext }' is not a valid string." )
-
-    modules_imported: List[ ModuleType ] = []
-
-    for root, directories, filenames in os.walk( directory_path, topdown = True ):
-        if not recursive:
-            directories[:] = []
-
-        failed_imports = []
-
-        if directory_path != root:
-            subdirectories = Path( os.path.relpath( root, directory_path ) ).parts
-            additional_pathage_path = "".join( map( lambda x: f"{ x }.", subdirectories ) )
-        else:
-            additional_pathage_path = ""
-
-        for filename in filenames:
-            name, extension = os.path.splitext( filename )
-
-            if extension in target_file_extensions and not name.lstrip().startswith( "." ) and name not in _ignored_filenames:
-                module_name = f".{ additional_pathage_path }{ name }"
-
-                try:
-                    imported_module = importlib.import_module( module_name, relative_import_package_name )
-                except ImportError as e:
-                    failed_imports.append( ( module_name, filename, root, e ) )
-                else:
-                    modules_imported.append( imported_module )
-
-        last_failed_import_count = None
-        # while there are failed imports and the last iteration resolved some of the previously-failed imports.
-        while len( failed_imports ) > 0 and ( last_failed_import_count is None or last_failed_import_count > len( failed_imports ) ):
-            last_failed_import_count = len( failed_imports )
-
-            module_index = 0
-            while module_index < len( failed_imports ):
-                module_name, filename, _, _ = failed_imports[ module_index ]
-
-                try:
-                    imported_module = importlib.import_module( module_name, relative_import_package_name )
-                except ImportError:
-                    module_index += 1
-                else:
-                    failed_imports.pop( module_index )
-                    modules_imported.append( imported_module )
-
-        if len( failed_imports ) > 0:
-            raise ImportError( f"Unable to dynamically import the following modules from the '{ root }' directory: { ', '.join( map( lambda m: m[ 0 ], failed_imports ) ) }" )
-
-    if len( modules_imported ) > 0:
-        importlib.invalidate_caches()
-
-    return modules_imported
+__version__ = r"1.0.0"
+
+from types import ModuleType
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple, Union
+
+import importlib
+import itertools
+import os
+import os.path
+import sys
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from .discovery_manifest import DiscoveryManifest
+from .file_state import execute_recording_source
+from .instrumentation import DISCOVERY, IMPORT, RETRY, measure
+from .static_analysis import get_absolute_module_name, sort_by_dependencies
+
+if TYPE_CHECKING:
+    from .plugin_bundle import PluginBundle
+    from .plugin_index import PluginIndex
+    from .plugin_policy import DisabledPluginFilter
+    from .sandbox import ImportSandbox
+    from .sharding import PluginShard
+
+class ModuleCandidate( NamedTuple ):
+    """
+    A discovered module file which is a candidate for importing.
+
+    Fields:
+    `module_name`: module name relative to the relative import package; starts with a period.
+    `filename`: name of the module file.
+    `directory`: directory containing the module file.
+    """
+
+    module_name: str
+    filename: str
+    directory: str
+
+    @property
+    def path( self ) -> Path:
+        """
+        The path of the module file.
+        """
+
+        return Path( self.directory, self.filename )
+
+def _resolve_directory_path( directory_path: Union[ str, Path ] ) -> Path:
+    if isinstance( directory_path, str ):
+        if not os.path.isabs( directory_path ):
+            directory_path: Path = Path( os.getcwd(), directory_path )
+        else:
+            directory_path: Path = Path( directory_path )
+    elif not isinstance( directory_path, Path ):
+        raise ValueError( "Directory path must be a Path instance." )
+
+    return directory_path
+
+def _resolve_relative_import_package_name( relative_import_package_name: Union[ ModuleType, str, None ] ) -> Optional[ str ]:
+    if relative_import_package_name is not None:
+        if isinstance( relative_import_package_name, ModuleType ):
+            relative_import_package_name = relative_import_package_name.__name__
+        elif not isinstance( relative_import_package_name, str ):
+            raise ValueError( f"Invalid relative import package name: { relative_import_package_name }" )
+
+    return relative_import_package_name
+
+def _resolve_ignored_filenames( raw_ignored_filenames: Optional[ Iterable[ Union[ str, Path ] ] ] ) -> Set[ str ]:
+    if raw_ignored_filenames is None:
+        raw_ignored_filenames = [ "__init__", "__main__" ]
+
+    ignored_filenames: Set[ Path ] = set()
+    for filename in raw_ignored_filenames:
+        if isinstance( filename, str ):
+            filename = Path( filename )
+        elif not isinstance( filename, Path ):
+            raise ValueError( "Invalid ignored filename; filename must be a Path." )
+
+        ignored_filenames.add( filename )
+
+    return set( map( lambda x: x.stem, ignored_filenames ) )
+
+def _scan_directory( directory_path: str, target_file_extensions: Iterable[ str ], ignored_filenames: Set[ str ] ) -> Tuple[ List[ str ], List[ str ] ]:
+    """
+    Lists the given directory in the same way `os.walk` does, keeping only the filenames which are module candidates.
+
+    Returns:
+    Tuple of the candidate filenames and the names of the subdirectories which may be descended into.
+    """
+
+    filenames: List[ str ] = []
+    subdirectories: List[ str ] = []
+
+    with os.scandir( directory_path ) as entries:
+        for entry in entries:
+            try:
+                is_directory = entry.is_dir()
+            except OSError:
+                is_directory = False
+
+            if is_directory:
+                # `os.walk` does not follow symbolic links to directories by default.
+                try:
+                    is_symlink = entry.is_symlink()
+                except OSError:
+                    is_symlink = False
+
+                if not is_symlink:
+                    subdirectories.append( entry.name )
+            else:
+                name, extension = os.path.splitext( entry.name )
+
+                if extension in target_file_extensions and not name.lstrip().startswith( "." ) and name not in ignored_filenames:
+                    filenames.append( entry.name )
+
+    return filenames, subdirectories
+
+def _walk_candidates( directory_path: Path, recursive: bool, list_directory: Callable[ [ str ], Tuple[ List[ str ], List[ str ] ] ] ) -> Iterator[ ModuleCandidate ]:
+    """
+    Walks the given directory top-down in `os.walk` order, yielding the module candidates found.
+    """
+
+    pending_directories: List[ Tuple[ str, str ] ] = [ ( os.fspath( directory_path ), "" ) ]
+
+    while len( pending_directories ) > 0:
+        root, additional_pathage_path = pending_directories.pop()
+
+        try:
+            filenames, subdirectories = list_directory( root )
+        except OSError:
+            # unreadable directories are skipped, as `os.walk` does.
+            continue
+
+        for filename in filenames:
+            name, _ = os.path.splitext( filename )
+            yield ModuleCandidate( f".{ additional_pathage_path }{ name }", filename, root )
+
+        if recursive:
+            # pushed in reverse so the directories are visited in listing order.
+            for subdirectory in reversed( subdirectories ):
+                pending_directories.append( ( os.path.join( root, subdirectory ), f"{ additional_pathage_path }{ subdirectory }." ) )
+
+def _walk_candidates_concurrently( directory_path: Path, recursive: bool, list_directory: Callable[ [ str ], Tuple[ List[ str ], List[ str ] ] ], worker_count: int ) -> Iterator[ ModuleCandidate ]:
+    """
+    Walks the given directory like `_walk_candidates`, listing directories concurrently on a bounded thread pool. Each directory's subdirectories are
+    submitted as soon as it is listed, and the listings are consumed in `os.walk` order, so the candidates are yielded in the same order as a serial walk.
+    """
+
+    with ThreadPoolExecutor( max_workers = worker_count, thread_name_prefix = "plugin-discovery" ) as executor:
+        def list_and_submit( root: str ) -> Tuple[ List[ str ], List[ Tuple[ str, Future ] ] ]:
+            filenames, subdirectories = list_directory( root )
+
+            subdirectory_futures: List[ Tuple[ str, Future ] ] = []
+            if recursive:
+                for subdirectory in subdirectories:
+                    subdirectory_futures.append( ( subdirectory, executor.submit( list_and_submit, os.path.join( root, subdirectory ) ) ) )
+
+            return filenames, subdirectory_futures
+
+        pending_directories: List[ Tuple[ str, str, Future ] ] = [ ( os.fspath( directory_path ), "", executor.submit( list_and_submit, os.fspath( directory_path ) ) ) ]
+
+        while len( pending_directories ) > 0:
+            root, additional_pathage_path, listing_future = pending_directories.pop()
+
+            try:
+                filenames, subdirectory_futures = listing_future.result()
+            except OSError:
+                # unreadable directories are skipped, as `os.walk` does.
+                continue
+
+            for filename in filenames:
+                name, _ = os.path.splitext( filename )
+                yield ModuleCandidate( f".{ additional_pathage_path }{ name }", filename, root )
+
+            # pushed in reverse so the directories are visited in listing order.
+            for subdirectory, subdirectory_future in reversed( subdirectory_futures ):
+                pending_directories.append( ( os.path.join( root, subdirectory ), f"{ additional_pathage_path }{ subdirectory }.", subdirectory_future ) )
+
+def discover_modules( directory_path: Union[ str, Path ], *target_file_extensions: Iterable[ str ], **kwargs: Dict[ str, Any ] ) -> List[ ModuleCandidate ]:
+    """
+    Discovers module files from the given directory path which have one of the target file extensions, without importing them. Modules whose filenames start with
+    a period are ignored.
+
+    Parameters:
+    `directory_path`: directory path to discover modules in.
+    `target_file_extensions`: iterable of file extensions to match files against.
+
+    Keywords:
+    `recursive`: indicates if the directory path should be searched recursively; defaults to `False`.
+    `ignored_filenames`: iterable of filenames which are ignored when discovering modules.
+    `discovery_manifest`: `DiscoveryManifest`, or path to a manifest file, used to skip listing directories which have not changed since the manifest was
+        last saved; defaults to None, indicating every directory is listed.
+    `discovery_workers`: number of threads used to list directories concurrently when searching recursively; defaults to 1, indicating directories are listed
+        serially on the calling thread.
+
+    Returns:
+    List of module candidates, in `os.walk` order.
+    """
+
+    directory_path = _resolve_directory_path( directory_path )
+    recursive: bool = bool( kwargs.get( "recursive", False ) )
+    ignored_filenames: Set[ str ] = _resolve_ignored_filenames( kwargs.get( "ignored_filenames", None ) )
+
+    # verify the target_file_extensions
+    for ext in target_file_extensions:
+        if not isinstance( ext, str ):
+            raise ValueError( f"File extension '{ ext }' is not a valid string." )
+
+    list_directory = lambda path: _scan_directory( path, target_file_extensions, ignored_filenames )
+
+    discovery_manifest: Union[ DiscoveryManifest, str, Path, None ] = kwargs.get( "discovery_manifest", None )
+    if discovery_manifest is not None:
+        if not isinstance( discovery_manifest, DiscoveryManifest ):
+            discovery_manifest = DiscoveryManifest( discovery_manifest )
+
+        discovery_manifest.bind( directory_path, {
+            "target_file_extensions": sorted( set( target_file_extensions ) ),
+            "ignored_filenames": sorted( ignored_filenames ),
+            "recursive": recursive,
+        } )
+
+        scan_directory = list_directory
+        list_directory = lambda path: discovery_manifest.get_listing( path, scan_directory )
+
+    discovery_workers: int = int( kwargs.get( "discovery_workers", 1 ) or 1 )
+    if discovery_workers < 1:
+        raise ValueError( f"Invalid discovery worker count: { discovery_workers }" )
+
+    with measure( DISCOVERY, str( directory_path ) ):
+        if recursive and discovery_workers > 1:
+            candidates = list( _walk_candidates_concurrently( directory_path, recursive, list_directory, discovery_workers ) )
+        else:
+            candidates = list( _walk_candidates( directory_path, recursive, list_directory ) )
+
+        if discovery_manifest is not None:
+            discovery_manifest.save()
+
+    return candidates
+
+def _import_candidate( candidate: ModuleCandidate, relative_import_package_name: Optional[ str ] ) -> ModuleType:
+    # a module which was already imported is not executed again, so the source state recorded when it was executed is kept.
+    if get_absolute_module_name( candidate.module_name, relative_import_package_name ) in sys.modules:
+        return importlib.import_module( candidate.module_name, relative_import_package_name )
+
+    return execute_recording_source( candidate.path, lambda: importlib.import_module( candidate.module_name, relative_import_package_name ) )
+
+def _import_candidates( candidates: Iterable[ ModuleCandidate ], relative_import_package_name: Optional[ str ], failure_location: str ) -> List[ ModuleType ]:
+    """
+    Imports the given candidates in order, retrying the failed imports until no further progress is made.
+    """
+
+    modules_imported: List[ ModuleType ] = []
+    failed_imports = []
+
+    for candidate in candidates:
+        try:
+            with measure( IMPORT, get_absolute_module_name( candidate.module_name, relative_import_package_name ) ):
+                imported_module = _import_candidate( candidate, relative_import_package_name )
+        except ImportError as e:
+            failed_imports.append( ( candidate.module_name, candidate.filename, candidate.directory, e ) )
+        else:
+            modules_imported.append( imported_module )
+
+    last_failed_import_count = None
+    # while there are failed imports and the last iteration resolved some of the previously-failed imports.
+    while len( failed_imports ) > 0 and ( last_failed_import_count is None or last_failed_import_count > len( failed_imports ) ):
+        last_failed_import_count = len( failed_imports )
+
+        module_index = 0
+        while module_index < len( failed_imports ):
+            module_name, filename, directory, _ = failed_imports[ module_index ]
+
+            try:
+                with measure( RETRY, get_absolute_module_name( module_name, relative_import_package_name ) ):
+                    imported_module = _import_candidate( ModuleCandidate( module_name, filename, directory ), relative_import_package_name )
+            except ImportError:
+                module_index += 1
+            else:
+                failed_imports.pop( module_index )
+                modules_imported.append( imported_module )
+
+    if len( failed_imports ) > 0:
+        raise ImportError( f"Unable to dynamically import the following modules from { failure_location }: { ', '.join( map( lambda m: m[ 0 ], failed_imports ) ) }" )
+
+    return modules_imported
+
+def import_modules( directory_path: Union[ str, Path, "PluginBundle" ], *target_file_extensions: Iterable[ str ], **kwargs: Dict[ str, Any ] ) -> List[ ModuleType ]:
+    """
+    Imports modules from files from the given directory path which have one of the target file extensions. Modules whose filenames start with a period are ignored.
+
+    Parameters:
+    `directory_path`: directory path to load modules from, or `PluginBundle` or `MappedPluginBundle` to load precompiled modules from.
+    `target_file_extensions`: iterable of file extensions to match file to load from; ignored when loading from a bundle which does not check its sources.
+
+    Keywords:
+    `relative_import_package`: package the modules are imported relative to; defaults to None indicating the imports are absolute.
+    `recursive`: indicates if the directory path should be searched recursively; defaults to `False`..
+    `ignored_filenames`: iterable of filenames which are ignored when discovering modules to import.
+    `discovery_manifest`: `DiscoveryManifest`, or path to a manifest file, used to skip listing directories which have not changed since the previous
+        discovery; defaults to None, indicating every directory is listed.
+    `discovery_workers`: number of threads used to list directories concurrently when searching recursively; defaults to 1. The modules are imported in the
+        same order regardless of the worker count.
+    `order_by_dependencies`: indicates if the modules should be imported in the order of their static imports of each other, across the whole directory tree;
+        defaults to `False`, indicating modules are imported in discovery order and failed imports are retried within their directory.
+    `plugin_index`: `PluginIndex` built from this and other sources, e.g. by `plugin_index.build_plugin_index`; modules whose plugins it shadows are not
+        imported; defaults to None, indicating every module is imported. Applied first, and not applied to bundles which do not check their sources.
+    `disabled_filter`: `DisabledPluginFilter` recognizing the modules whose classes are all disabled, statically or by policy, which are then not imported;
+        defaults to None, indicating every module is imported. Applied after the plugin index and before the sandbox, and not applied to bundles which do not check their sources.
+    `shard`: `PluginShard` whose modules are the only ones imported, e.g. by one of several worker processes; defaults to None, indicating every module is
+        imported. Applied after the disabled filter and before the sandbox, and not applied to bundles which do not check their sources.
+    `sandbox`: `ImportSandbox` each module is first imported by in a subprocess with resource limits; modules which exceed the limits are not imported;
+        defaults to None, indicating modules are only imported in-process. Not applied to bundles which do not check their sources.
+
+    Returns:
+    List of modules loaded.
+
+    Raises:
+    `ImportCycleError`: if dependency ordering is enabled and modules statically import each other in a cycle.
+
+    Notes:
+        - If the directory path is a relative string, it is assumed to be relative from the current working directory.
+        - A bundle is installed as a finder and its modules are imported in the order they were bundled in, without accessing the file system; the discovery
+          and ordering keywords are ignored. A bundle which checks its sources is installed too, but the modules are discovered in the package directory
+          like without a bundle, and the ones whose entries are missing or stale are imported from their source files.
+    """
+
+    from .plugin_bundle import PluginBundle
+
+    relative_import_package_name: Optional[ str ] = _resolve_relative_import_package_name( kwargs.get( "relative_import_package", None ) )
+
+    if isinstance( directory_path, PluginBundle ):
+        if relative_import_package_name != directory_path.package_name:
+            raise ImportError( f"'{ directory_path.bundle_path }' plugin bundle was built for the '{ directory_path.package_name }' package, not '{ relative_import_package_name }'." )
+
+        directory_path.install()
+
+    if isinstance( directory_path, PluginBundle ) and not directory_path.check_sources:
+        candidates: List[ ModuleCandidate ] = directory_path.get_candidates()
+    else:
+        # a bundle which checks its sources only serves the discovered modules whose entries are current.
+        source_path = Path( sys.modules[ relative_import_package_name ].__file__ ).parent if isinstance( directory_path, PluginBundle ) else directory_path
+        candidates = discover_modules( source_path, *target_file_extensions, **kwargs )
+
+        plugin_index: Optional[ "PluginIndex" ] = kwargs.get( "plugin_index", None )
+        if plugin_index is not None:
+            candidates = plugin_index.filter_candidates( candidates, relative_import_package_name )
+
+        disabled_filter: Optional[ "DisabledPluginFilter" ] = kwargs.get( "disabled_filter", None )
+        if disabled_filter is not None:
+            candidates = disabled_filter.filter_candidates( candidates, relative_import_package_name )
+
+        shard: Optional[ "PluginShard" ] = kwargs.get( "shard", None )
+        if shard is not None:
+            candidates = shard.filter_candidates( candidates, relative_import_package_name )
+
+        sandbox: Optional[ "ImportSandbox" ] = kwargs.get( "sandbox", None )
+        if sandbox is not None:
+            candidates = sandbox.filter_candidates( candidates, relative_import_package_name )
+
+    modules_imported: List[ ModuleType ] = []
+
+    if bool( kwargs.get( "order_by_dependencies", False ) ) and not ( isinstance( directory_path, PluginBundle ) and not directory_path.check_sources ):
+        # imports which cannot be resolved statically are still retried.
+        candidates = sort_by_dependencies( candidates, relative_import_package_name )
+        modules_imported.extend( _import_candidates( candidates, relative_import_package_name, f"the '{ directory_path }' directory tree" ) )
+    else:
+        # failed imports are retried within the directory they were discovered in.
+        for root, directory_candidates in itertools.groupby( candidates, key = lambda c: c.directory ):
+            modules_imported.extend( _import_candidates( directory_candidates, relative_import_package_name, f"the '{ root }' directory" ) )
+
+    if len( modules_imported ) > 0:
+        importlib.invalidate_caches()
+
+    return modules_imported
@@ -0,0 +1,147 @@
+__version__ = r"1.0.0"
+
+from types import ModuleType
+from typing import Callable, NamedTuple, Optional, Union
+
+import hashlib
+import os
+import threading
+import weakref
+from pathlib import Path
+
+_HASH_CHUNK_SIZE: int = 1024 * 1024
+
+# modules to the states of the source files they were executed from; the content hash is empty until `get_source_state` computes it.
+_source_states: "weakref.WeakKeyDictionary[ ModuleType, FileState ]" = weakref.WeakKeyDictionary()
+_source_states_lock: threading.Lock = threading.Lock()
+
+class FileState( NamedTuple ):
+    """
+    The state of a file used to detect changes to it.
+
+    Fields:
+    `path`: path of the file.
+    `mtime_ns`: modification time of the file, in nanoseconds.
+    `size`: size of the file, in bytes.
+    `content_hash`: SHA-256 hex digest of the file content.
+    """
+
+    path: str
+    mtime_ns: int
+    size: int
+    content_hash: str
+
+    def has_same_content( self, other: Optional[ "FileState" ] ) -> bool:
+        """
+        Indicates if the given state has the same content as this state.
+        """
+
+        return other is not None and self.size == other.size and self.content_hash == other.content_hash
+
+def hash_file( path: Union[ str, Path ] ) -> str:
+    """
+    Gets the SHA-256 hex digest of the content of the given file.
+    """
+
+    content_hash = hashlib.sha256()
+
+    with open( path, "rb" ) as file:
+        for chunk in iter( lambda: file.read( _HASH_CHUNK_SIZE ), b"" ):
+            content_hash.update( chunk )
+
+    return content_hash.hexdigest()
+
+def get_file_state( path: Union[ str, Path ], previous_state: Optional[ FileState ] = None ) -> FileState:
+    """
+    Gets the state of the given file.
+
+    Parameters:
+    `path`: path of the file.
+    `previous_state`: previously recorded state of the file; if its modification time and size are unchanged, its content hash is reused instead of reading
+        the file.
+
+    Raises:
+    `OSError`: if the file cannot be read.
+    """
+
+    path = os.fspath( path )
+    stat_result = os.stat( path )
+
+    if previous_state is not None and previous_state.path == path and previous_state.mtime_ns == stat_result.st_mtime_ns and previous_state.size == stat_result.st_size:
+        content_hash = previous_state.content_hash
+    else:
+        content_hash = hash_file( path )
+
+    return FileState( path, stat_result.st_mtime_ns, stat_result.st_size, content_hash )
+
+def _stat_file( path: str ) -> Optional[ os.stat_result ]:
+    try:
+        return os.stat( path )
+    except OSError:
+        return None
+
+def execute_recording_source( path: Union[ str, Path ], execute: Callable[ [], ModuleType ] ) -> ModuleType:
+    """
+    Imports or reloads a module from the given source file with the given callable, recording the modification time and size of the file, so
+    `get_source_state` can later tell if the file still holds the source the module was executed from.
+
+    Returns:
+    The module returned by the callable.
+
+    Notes:
+        - Nothing is recorded if the file changed while the module was executed, or if the module was not loaded from the file, e.g. from a bundle.
+    """
+
+    path = os.fspath( path )
+    before = _stat_file( path )
+    module = execute()
+    after = _stat_file( path )
+
+    origin: Optional[ str ] = getattr( getattr( module, "__spec__", None ), "origin", None )
+    is_loaded_from_path = origin is not None and os.path.normcase( os.path.abspath( origin ) ) == os.path.normcase( os.path.abspath( path ) )
+
+    with _source_states_lock:
+        if is_loaded_from_path and before is not None and after is not None and ( before.st_mtime_ns, before.st_size ) == ( after.st_mtime_ns, after.st_size ):
+            _source_states[ module ] = FileState( path, after.st_mtime_ns, after.st_size, "" )
+        else:
+            _source_states.pop( module, None )
+
+    return module
+
+def get_source_state( module: ModuleType ) -> Optional[ FileState ]:
+    """
+    Gets the state, including the content hash, of the source file the given module was executed from, as recorded by `execute_recording_source`.
+
+    Returns:
+    The state, or None if it was not recorded, or if the file changed since the module was executed, so the executed source is unknown.
+    """
+
+    with _source_states_lock:
+        recorded: Optional[ FileState ] = _source_states.get( module, None )
+
+    if recorded is None:
+        return None
+
+    stat_result = _stat_file( recorded.path )
+    if stat_result is None or ( stat_result.st_mtime_ns, stat_result.st_size ) != ( recorded.mtime_ns, recorded.size ):
+        return None
+    elif recorded.content_hash != "":
+        return recorded
+
+    try:
+        content_hash = hash_file( recorded.path )
+    except OSError:
+        return None
+
+    # the file must not have changed while it was hashed.
+    stat_result = _stat_file( recorded.path )
+    if stat_result is None or ( stat_result.st_mtime_ns, stat_result.st_size ) != ( recorded.mtime_ns, recorded.size ):
+        return None
+
+    state = recorded._replace( content_hash = content_hash )
+
+    with _source_states_lock:
+        if _source_states.get( module, None ) == recorded:
+            _source_states[ module ] = state
+
+    return state
@@ -0,0 +1,145 @@
+__version__ = r"1.0.0"
+
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import multiprocessing
+import multiprocessing.synchronize
+import os
+import threading
+import weakref
+
+# keyed by the owner's identity and the attribute name; values are a callable returning the owner, or None once it was collected, the attribute name and the
+# factory of the replacement lock.
+_fork_locks: Dict[ Tuple[ int, str ], Tuple[ Callable[ [], Any ], str, Optional[ Callable[ [], Any ] ] ] ] = {}
+_fork_locks_lock: threading.Lock = threading.Lock()
+_are_fork_hooks_registered: bool = False
+_locks_held_at_fork: Tuple[ str, ... ] = ()
+_pending_locks_held_at_fork: Tuple[ str, ... ] = ()
+
+_THREADING_LOCK_TYPE = type( threading.Lock() )
+_THREADING_RLOCK_TYPE = type( threading.RLock() )
+
+def create_lock_like( lock: Any ) -> Any:
+    """
+    Creates a new, released lock of the same kind as the given lock.
+
+    Raises:
+    `ValueError`: if the kind of lock is not supported.
+    """
+
+    if isinstance( lock, multiprocessing.synchronize.RLock ):
+        return multiprocessing.RLock()
+    elif isinstance( lock, multiprocessing.synchronize.Lock ):
+        return multiprocessing.Lock()
+    elif isinstance( lock, _THREADING_RLOCK_TYPE ):
+        return threading.RLock()
+    elif isinstance( lock, _THREADING_LOCK_TYPE ):
+        return threading.Lock()
+    else:
+        raise ValueError( f"Cannot create a lock like '{ type( lock ).__qualname__ }'; a lock factory is required." )
+
+def reset_lock_after_fork( owner: Any, attribute_name: str, lock_factory: Optional[ Callable[ [], Any ] ] = None ):
+    """
+    Replaces the lock stored in the given attribute with a new lock in every child process forked afterwards, so a lock which another thread held at fork
+    time cannot deadlock the child.
+
+    Parameters:
+    `owner`: object, e.g. a module, whose attribute stores the lock.
+    `attribute_name`: name of the attribute storing the lock.
+    `lock_factory`: callable creating the replacement lock; defaults to None, indicating a new lock of the same kind is created.
+
+    Notes:
+        - Does nothing on platforms without `os.register_at_fork`.
+        - The owner is referenced weakly, so registering its lock does not keep it alive; owners which cannot be referenced weakly are kept alive until
+          `forget_lock_after_fork` is called.
+    """
+
+    global _are_fork_hooks_registered
+
+    if not hasattr( os, "register_at_fork" ):
+        return
+
+    if lock_factory is None:
+        # fails early for unsupported kinds of lock rather than in the child.
+        create_lock_like( getattr( owner, attribute_name ) )
+
+    try:
+        get_owner: Callable[ [], Any ] = weakref.ref( owner )
+    except TypeError:
+        get_owner = lambda: owner
+
+    with _fork_locks_lock:
+        _drop_collected_owners()
+        _fork_locks[ ( id( owner ), attribute_name ) ] = ( get_owner, attribute_name, lock_factory )
+
+        if not _are_fork_hooks_registered:
+            os.register_at_fork( before = _before_fork, after_in_parent = _after_fork_in_parent, after_in_child = _after_fork_in_child )
+            _are_fork_hooks_registered = True
+
+def forget_lock_after_fork( owner: Any, attribute_name: str ):
+    """
+    Stops replacing the lock stored in the given attribute in child processes, as registered by `reset_lock_after_fork`. Does nothing if it is not
+    registered.
+    """
+
+    with _fork_locks_lock:
+        entry = _fork_locks.get( ( id( owner ), attribute_name ), None )
+        if entry is not None and entry[ 0 ]() is owner:
+            del _fork_locks[ ( id( owner ), attribute_name ) ]
+
+def _drop_collected_owners():
+    # called with `_fork_locks_lock` held.
+    for key in [ key for key, ( get_owner, _, _ ) in _fork_locks.items() if get_owner() is None ]:
+        del _fork_locks[ key ]
+
+def get_locks_held_at_fork() -> Tuple[ str, ... ]:
+    """
+    Gets descriptions of the registered locks which were held when this process was forked, and which were replaced with released locks.
+
+    Returns:
+    Iterable of descriptions, which is empty in a process which was not forked or whose locks were all released at fork time.
+    """
+
+    return _locks_held_at_fork
+
+def _describe_lock( owner: Any, attribute_name: str ) -> str:
+    return f"{ getattr( owner, '__name__', type( owner ).__qualname__ ) }.{ attribute_name }"
+
+def _before_fork():
+    global _pending_locks_held_at_fork
+
+    _fork_locks_lock.acquire()
+    _drop_collected_owners()
+
+    held_locks = []
+    for get_owner, attribute_name, _ in _fork_locks.values():
+        owner = get_owner()
+        lock = getattr( owner, attribute_name, None ) if owner is not None else None
+
+        # a positional argument is accepted by both threading and multiprocessing locks.
+        if lock is not None and not lock.acquire( False ):
+            held_locks.append( _describe_lock( owner, attribute_name ) )
+        elif lock is not None:
+            lock.release()
+
+    _pending_locks_held_at_fork = tuple( held_locks )
+
+def _after_fork_in_parent():
+    global _pending_locks_held_at_fork
+
+    _pending_locks_held_at_fork = ()
+    _fork_locks_lock.release()
+
+def _after_fork_in_child():
+    global _fork_locks_lock, _locks_held_at_fork, _pending_locks_held_at_fork
+
+    for get_owner, attribute_name, lock_factory in _fork_locks.values():
+        owner = get_owner()
+        lock = getattr( owner, attribute_name, None ) if owner is not None else None
+
+        if lock is not None:
+            setattr( owner, attribute_name, lock_factory() if lock_factory is not None else create_lock_like( lock ) )
+
+    _locks_held_at_fork = _pending_locks_held_at_fork
+    _pending_locks_held_at_fork = ()
+    _fork_locks_lock = threading.Lock()
@@ -0,0 +1,155 @@
+__version__ = r"1.0.0"
+
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import threading
+import time
+import tracemalloc
+
+DISCOVERY: str = "discovery"
+IMPORT: str = "import"
+RETRY: str = "retry"
+REGISTRATION: str = "registration"
+RELOAD: str = "reload"
+
+class InstrumentationEvent( NamedTuple ):
+    """
+    A measured step of loading plugins.
+
+    Fields:
+    `kind`: one of `DISCOVERY`, `IMPORT`, `RETRY`, `REGISTRATION` or `RELOAD`.
+    `name`: what the step acted on; the directory path for discoveries, the absolute module name for imports, retries and reloads, and the registration ID
+        for registrations, or the number of classes for a bulk registration.
+    `succeeded`: indicates if the step completed without raising an exception.
+    `wall_time`: elapsed wall clock time, in seconds.
+    `cpu_time`: elapsed CPU time of the process, in seconds.
+    `memory_delta`: change in the memory traced by `tracemalloc`, in bytes; None if `tracemalloc` was not tracing.
+    `error`: description of the exception raised by the step; None if it succeeded.
+
+    Notes:
+        - Steps nest; the cost of an import includes the modules and registrations it triggers.
+    """
+
+    kind: str
+    name: str
+    succeeded: bool
+    wall_time: float
+    cpu_time: float
+    memory_delta: Optional[ int ]
+    error: Optional[ str ]
+
+_listeners: Tuple[ Callable[ [ InstrumentationEvent ], Any ], ... ] = ()
+_listeners_lock: threading.Lock = threading.Lock()
+
+def add_listener( listener: Callable[ [ InstrumentationEvent ], Any ] ):
+    """
+    Adds a callable invoked with every event, on the thread which performed the step.
+    """
+
+    global _listeners
+
+    with _listeners_lock:
+        _listeners = _listeners + ( listener, )
+
+def remove_listener( listener: Callable[ [ InstrumentationEvent ], Any ] ):
+    """
+    Removes a listener previously added; removing a listener which is not added does nothing.
+    """
+
+    global _listeners
+
+    with _listeners_lock:
+        listeners = list( _listeners )
+        if listener in listeners:
+            listeners.remove( listener )
+        _listeners = tuple( listeners )
+
+def is_enabled() -> bool:
+    """
+    Indicates if any listener is added; steps are only measured while one is.
+    """
+
+    return len( _listeners ) > 0
+
+@contextmanager
+def measure( kind: str, name: str ) -> Iterator[ None ]:
+    """
+    Measures the wrapped step and emits its event to the listeners. Does nothing when no listener is added.
+    """
+
+    listeners = _listeners
+
+    if len( listeners ) == 0:
+        yield
+        return
+
+    is_tracing = tracemalloc.is_tracing()
+    start_memory: int = tracemalloc.get_traced_memory()[ 0 ] if is_tracing else 0
+    start_cpu_time = time.process_time()
+    start_wall_time = time.perf_counter()
+    error: Optional[ BaseException ] = None
+
+    try:
+        yield
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        wall_time = time.perf_counter() - start_wall_time
+        cpu_time = time.process_time() - start_cpu_time
+        memory_delta: Optional[ int ] = tracemalloc.get_traced_memory()[ 0 ] - start_memory if is_tracing and tracemalloc.is_tracing() else None
+
+        event = InstrumentationEvent( kind, name, error is None, wall_time, cpu_time, memory_delta, f"{ type( error ).__name__ }: { error }" if error is not None else None )
+        for listener in listeners:
+            listener( event )
+
+class EventRecorder( object ):
+    """
+    Listener which collects events.
+    """
+
+    def __init__( self ):
+        self._events: List[ InstrumentationEvent ] = []
+        self._lock: threading.Lock = threading.Lock()
+
+    def __call__( self, event: InstrumentationEvent ):
+        with self._lock:
+            self._events.append( event )
+
+    @property
+    def events( self ) -> Tuple[ InstrumentationEvent, ... ]:
+        """
+        The collected events, in the order the steps completed.
+        """
+
+        with self._lock:
+            return tuple( self._events )
+
+@contextmanager
+def instrument( **kwargs: Dict[ str, Any ] ) -> Iterator[ EventRecorder ]:
+    """
+    Collects the events emitted while the context is active.
+
+    Keywords:
+    `trace_memory`: indicates if `tracemalloc` is started for the duration of the context, if it is not already tracing, so events carry memory deltas;
+        defaults to `False`.
+
+    Returns:
+    Recorder of the events; events of steps performed by other threads while the context is active are collected as well.
+    """
+
+    recorder = EventRecorder()
+    started_tracing = bool( kwargs.get( "trace_memory", False ) ) and not tracemalloc.is_tracing()
+
+    if started_tracing:
+        tracemalloc.start()
+
+    add_listener( recorder )
+    try:
+        yield recorder
+    finally:
+        remove_listener( recorder )
+
+        if started_tracing:
+            tracemalloc.stop()
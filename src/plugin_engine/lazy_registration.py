@@ -0,0 +1,315 @@
+__version__ = r"1.0.0"
+
+from types import ModuleType
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple, Type, Union
+
+import importlib
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+from .static_analysis import get_absolute_module_name, get_class_registrations, parse_module
+
+class RegistrationRecord( NamedTuple ):
+    """
+    Registration metadata of a plugin class, known without importing the class' module.
+
+    Fields:
+    `registration_id`: ID the class is registered with.
+    `module_name`: name of the class' module, relative to the relative import package if it starts with a period.
+    `qualname`: qualified name of the class.
+    `enabled`: indicates if the class is registered; None indicates it is only known once the module is imported.
+    `parent_class_names`: names of the class' bases, as written in the source.
+    """
+
+    registration_id: str
+    module_name: str
+    qualname: str
+    enabled: Optional[ bool ] = True
+    parent_class_names: Tuple[ str, ... ] = ()
+
+class LazyClass( object ):
+    """
+    Lightweight stand-in for a registered class whose module has not been imported yet. The module is imported when the class is first resolved: explicitly
+    through `resolve`, by calling the stand-in to create an instance, or by accessing a class attribute through it. Once the module's registration decorator
+    registers the real class, the stand-in is replaced in the registration target.
+    """
+
+    def __init__( self, registration_id: Any, module_name: str, qualname: str, **kwargs: Dict[ str, Any ] ):
+        """
+        Parameters:
+        `registration_id`: ID the class is registered with.
+        `module_name`: absolute name of the class' module.
+        `qualname`: qualified name of the class.
+
+        Keywords:
+        `registration_target`: registration target the stand-in is registered into; defaults to None.
+        `registration_target_lock`: lock controlling access to the registration target; defaults to None, indicating there is no lock.
+        `parent_class_names`: names of the class' bases, as written in the source; defaults to no names.
+        `requires_registration`: indicates if the class' module must register the class when it is imported; otherwise the class is looked up in the module
+            and registered by the stand-in, e.g. for classes advertised by entry points; defaults to `True`.
+        """
+
+        self._registration_id = registration_id
+        self._module_name: str = module_name
+        self._qualname: str = qualname
+        self._registration_target: Optional[ Dict[ Any, Type ] ] = kwargs.get( "registration_target", None )
+        self._registration_target_lock = kwargs.get( "registration_target_lock", None )
+        self._parent_class_names: Tuple[ str, ... ] = tuple( kwargs.get( "parent_class_names", () ) )
+        self._requires_registration: bool = bool( kwargs.get( "requires_registration", True ) )
+        self._resolved_class: Optional[ Type ] = None
+        self._resolve_lock: threading.RLock = threading.RLock()
+
+    @property
+    def registration_id( self ) -> Any:
+        """
+        The ID the class is registered with.
+        """
+
+        return self._registration_id
+
+    @property
+    def module_name( self ) -> str:
+        """
+        The absolute name of the class' module.
+        """
+
+        return self._module_name
+
+    @property
+    def qualname( self ) -> str:
+        """
+        The qualified name of the class.
+        """
+
+        return self._qualname
+
+    @property
+    def parent_class_names( self ) -> Tuple[ str, ... ]:
+        """
+        The names of the class' bases, as written in the source.
+        """
+
+        return self._parent_class_names
+
+    @property
+    def is_resolved( self ) -> bool:
+        """
+        Indicates if the class has been resolved.
+        """
+
+        return self._resolved_class is not None
+
+    def is_stand_in_for( self, class_: Type ) -> bool:
+        """
+        Indicates if this object stands in for the given class.
+        """
+
+        return getattr( class_, "__module__", None ) == self.module_name and getattr( class_, "__qualname__", None ) == self.qualname
+
+    def bind( self, class_: Type ):
+        """
+        Binds the real class to this stand-in; called when the class is registered.
+        """
+
+        if not self.is_stand_in_for( class_ ):
+            raise ValueError( f"'{ class_.__qualname__ }' class is not the class the stand-in for '{ self.module_name }.{ self.qualname }' refers to." )
+
+        self._resolved_class = class_
+
+    def resolve( self ) -> Type:
+        """
+        Resolves the real class, importing its module if needed.
+
+        Returns:
+        The real class.
+
+        Raises:
+        `ImportError`: if the module cannot be imported or the class was not registered by its module.
+        """
+
+        if self._resolved_class is None:
+            with self._resolve_lock:
+                if self._resolved_class is None:
+                    was_imported: bool = self.module_name in sys.modules
+                    module: ModuleType = importlib.import_module( self.module_name )
+
+                    if self._resolved_class is None:
+                        if not was_imported and self._requires_registration:
+                            self._remove_from_registration_target()
+                            raise ImportError( f"'{ self.module_name }' module did not register the '{ self.qualname }' class with ID '{ self.registration_id }'." )
+
+                        # the module was imported before the stand-in was registered, so its registration decorator will not run again.
+                        class_ = module
+                        try:
+                            for name in self.qualname.split( "." ):
+                                class_ = getattr( class_, name )
+                        except AttributeError:
+                            self._remove_from_registration_target()
+                            raise ImportError( f"'{ self.module_name }' module does not define the '{ self.qualname }' class." )
+
+                        self._resolved_class = class_
+                        self._replace_in_registration_target()
+
+        return self._resolved_class
+
+    def _remove_from_registration_target( self ):
+        if self._registration_target is not None:
+            def remove():
+                if self._registration_target.get( self.registration_id, None ) is self:
+                    del self._registration_target[ self.registration_id ]
+
+            self._with_registration_target_lock( remove )
+
+    def _replace_in_registration_target( self ):
+        if self._registration_target is not None:
+            def replace():
+                if self._registration_target.get( self.registration_id, None ) is self:
+                    self._registration_target[ self.registration_id ] = self._resolved_class
+
+            self._with_registration_target_lock( replace )
+
+    def _with_registration_target_lock( self, callback ):
+        lock = self._registration_target_lock
+
+        if lock is not None:
+            lock.acquire()
+
+        try:
+            callback()
+        finally:
+            if lock is not None:
+                lock.release()
+
+    def __call__( self, *args: Iterable[ Any ], **kwargs: Dict[ str, Any ] ) -> Any:
+        return self.resolve()( *args, **kwargs )
+
+    def __getattr__( self, name: str ) -> Any:
+        # private and special lookups, such as those made by copy and pickle, are not forwarded.
+        if name.startswith( "_" ):
+            raise AttributeError( name )
+
+        return getattr( self.resolve(), name )
+
+    def __repr__( self ) -> str:
+        state = "resolved" if self.is_resolved else "unresolved"
+        return f"<LazyClass { self.module_name }.{ self.qualname } ({ state })>"
+
+def scan_registrations( candidates: Iterable[ Any ], decorator_names: Iterable[ str ] ) -> List[ RegistrationRecord ]:
+    """
+    Gets the registration metadata of the given module candidates by static analysis, without importing them. The registration ID of each class is its
+    qualified name, matching the default ID of `register_class`.
+
+    Parameters:
+    `candidates`: module candidates, as returned by `dynamic_import.discover_modules`.
+    `decorator_names`: names of the registration decorators.
+
+    Returns:
+    List of the registration records, with module names relative to the relative import package.
+    """
+
+    decorator_names = list( decorator_names )
+    records: List[ RegistrationRecord ] = []
+
+    for candidate in candidates:
+        module_tree = parse_module( candidate.path )
+
+        if module_tree is not None:
+            for registration in get_class_registrations( module_tree, decorator_names ):
+                records.append( RegistrationRecord( registration.qualname, candidate.module_name, registration.qualname, registration.enabled, registration.parent_class_names ) )
+
+    return records
+
+def read_registration_manifest( manifest_path: Union[ str, Path ] ) -> List[ RegistrationRecord ]:
+    """
+    Reads a sidecar registration manifest.
+
+    Parameters:
+    `manifest_path`: path of the manifest file; a JSON object whose `registrations` member is a list of objects with the `RegistrationRecord` fields.
+
+    Returns:
+    List of the registration records.
+    """
+
+    with open( manifest_path, "r", encoding = "utf-8" ) as manifest_file:
+        content = json.load( manifest_file )
+
+    try:
+        return [ RegistrationRecord( record[ "registration_id" ], record[ "module_name" ], record[ "qualname" ], record.get( "enabled", True ), tuple( record.get( "parent_class_names", () ) ) ) for record in content[ "registrations" ] ]
+    except ( KeyError, TypeError ) as e:
+        raise ValueError( f"Invalid registration manifest '{ manifest_path }': { e }" )
+
+def write_registration_manifest( manifest_path: Union[ str, Path ], records: Iterable[ RegistrationRecord ] ):
+    """
+    Writes a sidecar registration manifest for the given registration records.
+    """
+
+    content = { "registrations": [ record._asdict() for record in records ] }
+
+    temporary_path = f"{ os.fspath( manifest_path ) }.{ os.getpid() }.tmp"
+    with open( temporary_path, "w", encoding = "utf-8" ) as manifest_file:
+        json.dump( content, manifest_file, indent = 4 )
+    os.replace( temporary_path, manifest_path )
+
+def register_lazy_classes( records: Iterable[ RegistrationRecord ], registration_target: Dict[ Any, Type ], relative_import_package_name: Optional[ str ] = None, **kwargs: Dict[ str, Any ] ) -> List[ LazyClass ]:
+    """
+    Registers stand-ins for the enabled classes of the given registration records into the given registration target.
+
+    Parameters:
+    `records`: registration records to register stand-ins for; records which are statically disabled are skipped.
+    `registration_target`: registration target to register into.
+    `relative_import_package_name`: package relative module names are relative to.
+
+    Keywords:
+    `registration_target_lock`: lock controlling access to the registration target; defaults to None, indicating there is no lock.
+
+    Returns:
+    List of the registered stand-ins.
+    """
+
+    if registration_target is None:
+        raise ValueError( "Registration target dictionary cannot be None." )
+
+    lock = kwargs.get( "registration_target_lock", None )
+    lazy_classes: List[ LazyClass ] = []
+
+    for record in records:
+        if record.enabled is False:
+            continue
+
+        lazy_class = LazyClass( record.registration_id, get_absolute_module_name( record.module_name, relative_import_package_name ), record.qualname,
+                                registration_target = registration_target, registration_target_lock = lock, parent_class_names = record.parent_class_names )
+        lazy_classes.append( lazy_class )
+
+    _register_stand_ins( lazy_classes, registration_target, lock )
+
+    return lazy_classes
+
+def _register_stand_ins( lazy_classes: List[ LazyClass ], registration_target: Dict[ Any, Type ], lock: Any, tags: Optional[ Dict[ Any, Tuple[ Any, ... ] ] ] = None ):
+    """
+    Registers the given stand-ins into the given registration target, all or none of them. Stand-ins with tags are registered with them, which requires the
+    registration target to be a `PluginRegistry`.
+
+    Raises:
+    `ValueError`: if a class with the ID of a stand-in already exists in the registration target.
+    """
+
+    if lock is not None:
+        lock.acquire()
+
+    try:
+        for lazy_class in lazy_classes:
+            if lazy_class.registration_id in registration_target:
+                raise ValueError( f"A class with ID ('{ lazy_class.registration_id }') already exists in the registration target." )
+
+        for lazy_class in lazy_classes:
+            lazy_class_tags = tags.get( lazy_class.registration_id, () ) if tags is not None else ()
+
+            if len( lazy_class_tags ) > 0:
+                registration_target.register( lazy_class.registration_id, lazy_class, lazy_class_tags )
+            else:
+                registration_target[ lazy_class.registration_id ] = lazy_class
+    finally:
+        if lock is not None:
+            lock.release()
@@ -0,0 +1,101 @@
+__version__ = r"1.0.0"
+
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional, TextIO, Tuple
+
+import io
+import sys
+import threading
+
+class _ThreadLocalStream( object ):
+    """
+    Stream which writes into the calling thread's buffer while one is set, and into the wrapped stream otherwise.
+    """
+
+    def __init__( self, stream: TextIO ):
+        self._stream = stream
+        self._local = threading.local()
+
+    @property
+    def wrapped_stream( self ) -> TextIO:
+        return self._stream
+
+    def set_buffer( self, buffer: Optional[ io.StringIO ] ) -> Optional[ io.StringIO ]:
+        """
+        Sets the calling thread's buffer.
+
+        Returns:
+        The buffer previously set, if any.
+        """
+
+        previous_buffer = getattr( self._local, "buffer", None )
+        self._local.buffer = buffer
+        return previous_buffer
+
+    def write( self, text: str ) -> int:
+        buffer = getattr( self._local, "buffer", None )
+        return ( buffer if buffer is not None else self._stream ).write( text )
+
+    def flush( self ):
+        if getattr( self._local, "buffer", None ) is None:
+            self._stream.flush()
+
+    def __getattr__( self, name: str ) -> Any:
+        return getattr( self._stream, name )
+
+_streams_lock: threading.Lock = threading.Lock()
+_streams_users: int = 0
+_streams: Optional[ Tuple[ _ThreadLocalStream, _ThreadLocalStream ] ] = None
+
+def _install_streams() -> Tuple[ _ThreadLocalStream, _ThreadLocalStream ]:
+    global _streams_users, _streams
+
+    with _streams_lock:
+        if _streams_users == 0:
+            _streams = ( _ThreadLocalStream( sys.stdout ), _ThreadLocalStream( sys.stderr ) )
+            sys.stdout, sys.stderr = _streams
+        _streams_users += 1
+
+        return _streams
+
+def _uninstall_streams():
+    global _streams_users, _streams
+
+    with _streams_lock:
+        _streams_users -= 1
+        if _streams_users == 0:
+            stdout_proxy, stderr_proxy = _streams
+            _streams = None
+
+            # a stream which replaced a proxy in the meantime, e.g. by `contextlib.redirect_stdout`, is kept.
+            if sys.stdout is stdout_proxy:
+                sys.stdout = stdout_proxy.wrapped_stream
+            if sys.stderr is stderr_proxy:
+                sys.stderr = stderr_proxy.wrapped_stream
+
+@contextmanager
+def capture_output() -> Iterator[ Tuple[ io.StringIO, io.StringIO ] ]:
+    """
+    Context manager which captures the text the current thread writes to `sys.stdout` and `sys.stderr` into buffers, without capturing the writes of other
+    threads, unlike `contextlib.redirect_stdout`. Captures may be nested.
+
+    Returns:
+    The buffers of the text written to `sys.stdout` and `sys.stderr`.
+
+    Notes:
+        - While any thread captures output, `sys.stdout` and `sys.stderr` are replaced by proxies which write into the calling thread's buffers, if any, and
+          into the original streams otherwise.
+        - Text written by threads started within the context is not captured.
+    """
+
+    stdout_proxy, stderr_proxy = _install_streams()
+    stdout_buffer, stderr_buffer = io.StringIO(), io.StringIO()
+    previous_stdout_buffer = stdout_proxy.set_buffer( stdout_buffer )
+    previous_stderr_buffer = stderr_proxy.set_buffer( stderr_buffer )
+
+    try:
+        yield stdout_buffer, stderr_buffer
+    finally:
+        stdout_proxy.set_buffer( previous_stdout_buffer )
+        stderr_proxy.set_buffer( previous_stderr_buffer )
+        _uninstall_streams()
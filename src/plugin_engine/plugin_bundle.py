@@ -0,0 +1,405 @@
+__version__ = r"1.0.0"
+
+from importlib.abc import Loader, MetaPathFinder
+from importlib.machinery import ModuleSpec
+from types import CodeType, ModuleType
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import importlib
+import importlib.util
+import io
+import json
+import marshal
+import mmap
+import os
+import os.path
+import sys
+import struct
+import threading
+import zipfile
+from pathlib import Path
+from .dynamic_import import ModuleCandidate, discover_modules
+from .static_analysis import get_absolute_module_name, sort_by_dependencies
+
+INDEX_ENTRY_NAME: str = "__index__.json"
+FORMAT_VERSION: int = 1
+
+# hash-based .pyc flags: the source hash is recorded but not checked, as the bundle carries no sources.
+_UNCHECKED_HASH_BASED_PYC_FLAGS: int = 0b01
+_PYC_HEADER_SIZE: int = 16
+_ZIP_LOCAL_HEADER_SIZE: int = 30
+_ZIP_LOCAL_HEADER_NAME_LENGTHS = struct.Struct( "<HH" )
+_ZIP_LOCAL_HEADER_NAME_LENGTHS_OFFSET: int = 26
+
+def _code_to_pyc( code: CodeType, source: bytes ) -> bytes:
+    return importlib.util.MAGIC_NUMBER + _UNCHECKED_HASH_BASED_PYC_FLAGS.to_bytes( 4, "little" ) + importlib.util.source_hash( source ) + marshal.dumps( code )
+
+def build_bundle( relative_import_package: Union[ ModuleType, str ], bundle_path: Union[ str, Path ], *target_file_extensions: Iterable[ str ], **kwargs: Dict[ str, Any ] ) -> int:
+    """
+    Packs the plugin modules of the given package into a bundle file: an uncompressed zip archive of hash-based `.pyc` files plus a discovery index listing the
+    modules in import order and their source files relative to the package directory.
+
+    Parameters:
+    `relative_import_package`: package, or name of the package, whose directory contains the plugin modules; the package is imported if a name is given.
+    `bundle_path`: path of the bundle file to write.
+    `target_file_extensions`: iterable of file extensions of the module files to pack; defaults to `.py`.
+
+    Keywords:
+    `recursive`, `ignored_filenames`: see `dynamic_import.discover_modules`.
+    `order_by_dependencies`: indicates if the index lists the modules in the order of their static imports of each other; defaults to `False`, indicating
+        discovery order.
+    `optimize`: optimization level the modules are compiled with; defaults to -1, indicating the interpreter's level.
+
+    Returns:
+    The number of modules packed.
+    """
+
+    if isinstance( relative_import_package, str ):
+        relative_import_package = importlib.import_module( relative_import_package )
+    elif not isinstance( relative_import_package, ModuleType ):
+        raise ValueError( "The relative import package must a package or module." )
+
+    if len( target_file_extensions ) == 0:
+        target_file_extensions = ( ".py", )
+
+    package_name: str = relative_import_package.__name__
+    package_directory_path = Path( relative_import_package.__file__ ).parent
+    optimize: int = int( kwargs.get( "optimize", -1 ) )
+
+    candidates: List[ ModuleCandidate ] = discover_modules( package_directory_path, *target_file_extensions, **kwargs )
+    if bool( kwargs.get( "order_by_dependencies", False ) ):
+        candidates = sort_by_dependencies( candidates, package_name )
+
+    modules: List[ Dict[ str, Any ] ] = []
+    packages: Dict[ str, Dict[ str, Any ] ] = {}
+
+    temporary_path = f"{ os.fspath( bundle_path ) }.{ os.getpid() }.tmp"
+    with zipfile.ZipFile( temporary_path, "w", compression = zipfile.ZIP_STORED ) as bundle_file:
+        def add_module( module_name: str, source_path: Path, entry_name: str ):
+            source = source_path.read_bytes()
+            code = compile( source, os.fspath( source_path ), "exec", dont_inherit = True, optimize = optimize )
+            bundle_file.writestr( entry_name, _code_to_pyc( code, source ) )
+
+        for candidate in candidates:
+            relative_parts: Tuple[ str, ... ] = candidate.module_name.lstrip( "." ).split( "." )
+
+            # subpackages between the package and the module are bundled too, so importing them needs no file system access.
+            for depth in range( 1, len( relative_parts ) ):
+                subpackage_name = "." + ".".join( relative_parts[ :depth ] )
+
+                if subpackage_name not in packages:
+                    subpackage_directory = package_directory_path.joinpath( *relative_parts[ :depth ] )
+                    init_path = subpackage_directory / "__init__.py"
+                    package_entry = { "module_name": subpackage_name, "entry": None, "source": None }
+
+                    if init_path.is_file():
+                        package_entry[ "entry" ] = "/".join( relative_parts[ :depth ] ) + "/__init__.pyc"
+                        package_entry[ "source" ] = init_path.relative_to( package_directory_path ).as_posix()
+                        add_module( subpackage_name, init_path, package_entry[ "entry" ] )
+
+                    packages[ subpackage_name ] = package_entry
+
+            entry_name = "/".join( relative_parts ) + ".pyc"
+            add_module( candidate.module_name, candidate.path, entry_name )
+            modules.append( { "module_name": candidate.module_name, "entry": entry_name, "directory": "/".join( relative_parts[ :-1 ] ),
+                              "source": candidate.path.relative_to( package_directory_path ).as_posix() } )
+
+        index = {
+            "version": FORMAT_VERSION,
+            "magic": importlib.util.MAGIC_NUMBER.hex(),
+            "package": package_name,
+            "packages": list( packages.values() ),
+            "modules": modules,
+        }
+        bundle_file.writestr( INDEX_ENTRY_NAME, json.dumps( index, indent = 1 ) )
+
+    os.replace( temporary_path, bundle_path )
+
+    return len( modules )
+
+class _BundleLoader( Loader ):
+    def __init__( self, bundle: "PluginBundle", entry_name: Optional[ str ] ):
+        self._bundle = bundle
+        self._entry_name = entry_name
+
+    def create_module( self, spec: ModuleSpec ) -> Optional[ ModuleType ]:
+        return None
+
+    def exec_module( self, module: ModuleType ):
+        if self._entry_name is not None:
+            exec( self._bundle.get_code( self._entry_name ), module.__dict__ )
+
+class PluginBundle( MetaPathFinder ):
+    """
+    Plugin modules loaded from a bundle file written by `build_bundle`. The bundle file is read with one sequential read; once the bundle is installed as a
+    finder, its modules and subpackages are imported from memory without any per-file stat or read.
+
+    Keywords:
+    `check_sources`: indicates if each module's source file in the package directory is hashed and compared with the source the module's entry was compiled
+        from before the entry is used; defaults to `False`, indicating the entries are used without accessing the file system.
+
+    Notes:
+        - When sources are checked, entries whose source file changed are not used, so the module is imported from its source file by the next finder, and
+          the bundled subpackages search their source directories, so modules added after the bundle was built are imported from their source files too.
+        - Entries whose source file was removed, and entries of bundles built without source paths, are used regardless.
+    """
+
+    def __init__( self, bundle_path: Union[ str, Path ], **kwargs: Dict[ str, Any ] ):
+        if isinstance( bundle_path, str ):
+            bundle_path = Path( bundle_path )
+        elif not isinstance( bundle_path, Path ):
+            raise ValueError( "Bundle path must be a Path instance." )
+
+        self._bundle_path: Path = bundle_path
+        self._archive: zipfile.ZipFile = self._open_archive()
+        self._lock: threading.Lock = threading.Lock()
+        self._check_sources: bool = bool( kwargs.get( "check_sources", False ) )
+
+        try:
+            index = json.loads( bytes( self._read_entry( INDEX_ENTRY_NAME ) ) )
+        except ( KeyError, ValueError ) as e:
+            raise ImportError( f"'{ bundle_path }' is not a valid plugin bundle: { e }" )
+
+        if index.get( "version", None ) != FORMAT_VERSION:
+            raise ImportError( f"'{ bundle_path }' plugin bundle has an unsupported format version." )
+        elif index.get( "magic", None ) != importlib.util.MAGIC_NUMBER.hex():
+            raise ImportError( f"'{ bundle_path }' plugin bundle was built for a different Python version." )
+
+        self._package_name: str = index[ "package" ]
+        self._modules: List[ Dict[ str, Any ] ] = index[ "modules" ]
+        # absolute module names to their entry names, whether they are packages and their source paths relative to the package directory.
+        self._entries: Dict[ str, Tuple[ Optional[ str ], bool, Optional[ str ] ] ] = {}
+
+        for package in index[ "packages" ]:
+            self._entries[ get_absolute_module_name( package[ "module_name" ], self._package_name ) ] = ( package[ "entry" ], True, package.get( "source", None ) )
+        for module in self._modules:
+            self._entries[ get_absolute_module_name( module[ "module_name" ], self._package_name ) ] = ( module[ "entry" ], False, module.get( "source", None ) )
+
+    def _open_archive( self ) -> zipfile.ZipFile:
+        return zipfile.ZipFile( io.BytesIO( self._bundle_path.read_bytes() ) )
+
+    def _read_entry( self, entry_name: str ) -> Union[ bytes, memoryview ]:
+        with self._lock:
+            return self._archive.read( entry_name )
+
+    @property
+    def bundle_path( self ) -> Path:
+        """
+        The path of the bundle file.
+        """
+
+        return self._bundle_path
+
+    @property
+    def package_name( self ) -> str:
+        """
+        The name of the package the bundled modules are relative to.
+        """
+
+        return self._package_name
+
+    @property
+    def check_sources( self ) -> bool:
+        """
+        Indicates if entries are only used while their source files are unchanged.
+        """
+
+        return self._check_sources
+
+    @property
+    def is_installed( self ) -> bool:
+        """
+        Indicates if the bundle is installed as a finder in `sys.meta_path`.
+        """
+
+        return any( finder is self for finder in sys.meta_path )
+
+    def get_candidates( self ) -> List[ ModuleCandidate ]:
+        """
+        Gets the bundled modules as module candidates, in the order they were bundled. The candidates' directories are locations inside the bundle file.
+        """
+
+        return [ ModuleCandidate( module[ "module_name" ], os.path.basename( module[ "entry" ] ), os.path.join( os.fspath( self.bundle_path ), module[ "directory" ] ) ) for module in self._modules ]
+
+    def get_code( self, entry_name: str ) -> CodeType:
+        """
+        Gets the code object of the given bundle entry.
+        """
+
+        data = self._read_entry( entry_name )
+        if bytes( data[ :4 ] ) != importlib.util.MAGIC_NUMBER:
+            raise ImportError( f"'{ entry_name }' entry of the '{ self.bundle_path }' plugin bundle was built for a different Python version." )
+
+        return marshal.loads( data[ _PYC_HEADER_SIZE: ] )
+
+    def close( self ):
+        """
+        Uninstalls the bundle and releases its archive; modules already imported from it stay imported.
+        """
+
+        self.uninstall()
+        self._archive.close()
+
+    def install( self ):
+        """
+        Installs the bundle as the first finder in `sys.meta_path`, so its modules take precedence over modules on the file system.
+        """
+
+        if not self.is_installed:
+            sys.meta_path.insert( 0, self )
+            importlib.invalidate_caches()
+
+    def uninstall( self ):
+        """
+        Removes the bundle from `sys.meta_path`; modules already imported from it stay imported.
+        """
+
+        sys.meta_path[:] = [ finder for finder in sys.meta_path if finder is not self ]
+
+    def _get_package_directory_path( self ) -> Optional[ Path ]:
+        package = sys.modules.get( self._package_name, None )
+        package_file = getattr( package, "__file__", None )
+
+        return Path( package_file ).parent if package_file is not None else None
+
+    def _is_source_changed( self, entry_name: Optional[ str ], source_path: Optional[ Path ] ) -> bool:
+        if entry_name is None or source_path is None:
+            return False
+
+        try:
+            source = source_path.read_bytes()
+        except FileNotFoundError:
+            return False
+
+        # the hash-based .pyc header records the hash of the source the entry was compiled from.
+        return bytes( self._read_entry( entry_name )[ 8:_PYC_HEADER_SIZE ] ) != importlib.util.source_hash( source )
+
+    def find_spec( self, fullname: str, path: Optional[ Sequence[ str ] ] = None, target: Optional[ ModuleType ] = None ) -> Optional[ ModuleSpec ]:
+        entry = self._entries.get( fullname, None )
+
+        if entry is None:
+            return None
+
+        entry_name, is_package, source = entry
+        package_directory_path = self._get_package_directory_path() if self._check_sources else None
+
+        if package_directory_path is not None and self._is_source_changed( entry_name, package_directory_path / source if source is not None else None ):
+            return None
+
+        origin = f"{ self.bundle_path }/{ entry_name }" if entry_name is not None else None
+        spec = ModuleSpec( fullname, _BundleLoader( self, entry_name ), origin = origin, is_package = is_package )
+        spec.has_location = origin is not None
+        if is_package:
+            if package_directory_path is not None:
+                spec.submodule_search_locations = [ os.fspath( package_directory_path.joinpath( *fullname[ len( self._package_name ) + 1: ].split( "." ) ) ) ]
+            else:
+                spec.submodule_search_locations = []
+
+        return spec
+
+class MappedPluginBundle( PluginBundle ):
+    """
+    Plugin modules loaded from a bundle file which is memory-mapped once. Each module's code object is unmarshalled directly from a slice of the mapping, so no
+    file is opened and no read buffer is allocated per module, and only the pages of the modules which are imported are read from disk.
+    """
+
+    def __init__( self, bundle_path: Union[ str, Path ], **kwargs: Dict[ str, Any ] ):
+        self._mapping: Optional[ mmap.mmap ] = None
+        self._mapping_view: Optional[ memoryview ] = None
+        # entry names to the offsets and sizes of their data in the mapping.
+        self._entry_ranges: Dict[ str, Tuple[ int, int ] ] = {}
+        self._touched_entries: Dict[ str, int ] = {}
+
+        super().__init__( bundle_path, **kwargs )
+
+    def _open_archive( self ) -> zipfile.ZipFile:
+        with open( self._bundle_path, "rb" ) as bundle_file:
+            self._mapping = mmap.mmap( bundle_file.fileno(), 0, access = mmap.ACCESS_READ )
+
+        self._mapping_view = memoryview( self._mapping )
+        archive = zipfile.ZipFile( self._mapping )
+
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ImportError( f"'{ self._bundle_path }' plugin bundle cannot be memory-mapped; its '{ info.filename }' entry is compressed." )
+
+            name_length, extra_length = _ZIP_LOCAL_HEADER_NAME_LENGTHS.unpack_from( self._mapping_view, info.header_offset + _ZIP_LOCAL_HEADER_NAME_LENGTHS_OFFSET )
+            self._entry_ranges[ info.filename ] = ( info.header_offset + _ZIP_LOCAL_HEADER_SIZE + name_length + extra_length, info.file_size )
+
+        return archive
+
+    def _read_entry( self, entry_name: str ) -> Union[ bytes, memoryview ]:
+        if self._mapping_view is None:
+            raise ValueError( f"'{ self._bundle_path }' plugin bundle is closed." )
+
+        offset, size = self._entry_ranges[ entry_name ]
+
+        with self._lock:
+            self._touched_entries[ entry_name ] = size
+
+        return self._mapping_view[ offset : offset + size ]
+
+    @property
+    def mapped_byte_count( self ) -> int:
+        """
+        The number of bytes of the bundle file which are mapped.
+        """
+
+        return len( self._mapping ) if self._mapping is not None and not self._mapping.closed else 0
+
+    @property
+    def touched_byte_count( self ) -> int:
+        """
+        The number of bytes of bundle entries which were read through the mapping, counting each entry once.
+        """
+
+        with self._lock:
+            return sum( self._touched_entries.values() )
+
+    @property
+    def touched_entry_names( self ) -> Tuple[ str, ... ]:
+        """
+        The names of the bundle entries which were read through the mapping.
+        """
+
+        with self._lock:
+            return tuple( self._touched_entries )
+
+    def close( self ):
+        """
+        Uninstalls the bundle and unmaps the bundle file; modules already imported from it stay imported.
+        """
+
+        super().close()
+
+        if self._mapping_view is not None:
+            self._mapping_view.release()
+            self._mapping_view = None
+
+        if self._mapping is not None:
+            self._mapping.close()
+
+def main( args = None ) -> int:
+    """
+    Command line tool which builds a plugin bundle.
+    """
+
+    import argparse
+
+    parser = argparse.ArgumentParser( prog = "python -m plugin_engine.plugin_bundle", description = "Packs the plugin modules of a package into a bundle file." )
+    parser.add_argument( "package", help = "name of the package containing the plugin modules; must be importable" )
+    parser.add_argument( "bundle_path", help = "path of the bundle file to write" )
+    parser.add_argument( "--ext", action = "append", default = None, help = "file extension of the module files; may be repeated; defaults to .py" )
+    parser.add_argument( "--recursive", action = "store_true", help = "search the package directory recursively" )
+    parser.add_argument( "--order-by-dependencies", action = "store_true", help = "list the modules in the order of their static imports of each other" )
+    parser.add_argument( "--optimize", type = int, default = -1, help = "optimization level the modules are compiled with" )
+    arguments = parser.parse_args( args )
+
+    module_count = build_bundle( arguments.package, arguments.bundle_path, *( arguments.ext or [ ".py" ] ), recursive = arguments.recursive,
+                                 order_by_dependencies = arguments.order_by_dependencies, optimize = arguments.optimize )
+    print( f"Packed { module_count } modules into '{ arguments.bundle_path }'." )
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit( main() )
@@ -0,0 +1,231 @@
+__version__ = r"1.0.0"
+
+from types import ModuleType
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+import ast
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from .dynamic_import import ModuleCandidate, _resolve_relative_import_package_name, discover_modules
+from .file_state import FileState, get_file_state
+from .static_analysis import StaticRegistration, get_absolute_module_name, get_class_registrations, parse_module
+
+CACHE_FORMAT_VERSION: int = 1
+
+# Files modified within this many nanoseconds of the catalog are not cached; a change made in the same timestamp granule would otherwise go unnoticed.
+_RACY_FILE_INTERVAL_NS: int = 2 * 1000 * 1000 * 1000
+
+class CatalogEntry( NamedTuple ):
+    """
+    A discovered plugin module, described without executing it.
+
+    Fields:
+    `module_name`: absolute name of the module, or the module name relative to the package directory if no relative import package was given.
+    `path`: path of the module file.
+    `size`: size of the module file, in bytes.
+    `mtime_ns`: modification time of the module file, in nanoseconds.
+    `content_hash`: SHA-256 hex digest of the module file content.
+    `registrations`: decorated class registrations found by static analysis, in source order.
+    `is_parsed`: indicates if the module file could be parsed; registrations are unknown if it could not.
+    """
+
+    module_name: str
+    path: str
+    size: int
+    mtime_ns: int
+    content_hash: str
+    registrations: Tuple[ StaticRegistration, ... ]
+    is_parsed: bool
+
+    @property
+    def is_disabled( self ) -> bool:
+        """
+        Indicates if the module registers classes and every one of them is statically disabled, e.g. with `enabled = False`, so importing the module would
+        not register anything.
+        """
+
+        return len( self.registrations ) > 0 and all( registration.enabled is False for registration in self.registrations )
+
+def describe_registration( registration: StaticRegistration ) -> str:
+    """
+    Describes the given registration as its decorator call, such as `register_command( enabled = False )`; keywords whose values are not literals are shown
+    as `...`.
+    """
+
+    keywords = [ f"{ name } = { value!r}" for name, value in registration.keywords.items() ]
+    keywords.extend( f"{ name } = ..." for name in registration.dynamic_keyword_names )
+
+    return f"{ registration.decorator_name }( { ', '.join( keywords ) } )" if len( keywords ) > 0 else f"{ registration.decorator_name }()"
+
+def _encode_registration( registration: StaticRegistration ) -> Dict[ str, Any ]:
+    fields = registration._asdict()
+    # literal values are not all JSON-serializable, e.g. tuples and bytes, but their representations are literals again.
+    fields[ "keywords" ] = repr( registration.keywords )
+    return fields
+
+def _decode_registration( fields: Dict[ str, Any ] ) -> StaticRegistration:
+    return StaticRegistration( fields[ "qualname" ], fields[ "decorator_name" ], ast.literal_eval( fields[ "keywords" ] ), tuple( fields[ "dynamic_keyword_names" ] ),
+                               tuple( fields[ "parent_class_names" ] ), fields[ "line_number" ] )
+
+def _load_cache( cache_path: Path, parameters: Dict[ str, Any ] ) -> Dict[ str, Tuple[ FileState, Tuple[ StaticRegistration, ... ], bool ] ]:
+    try:
+        with open( cache_path, "r", encoding = "utf-8" ) as cache_file:
+            content = json.load( cache_file )
+    except ( OSError, ValueError ):
+        return {}
+
+    # registrations found with other decorator names are not reused.
+    if not isinstance( content, dict ) or content.get( "version", None ) != CACHE_FORMAT_VERSION or content.get( "parameters", None ) != parameters:
+        return {}
+
+    try:
+        return {
+            path: ( FileState( path, record[ "mtime_ns" ], record[ "size" ], record[ "content_hash" ] ), tuple( map( _decode_registration, record[ "registrations" ] ) ), record[ "is_parsed" ] )
+            for path, record in content.get( "files", {} ).items()
+        }
+    except ( KeyError, TypeError, ValueError, SyntaxError ):
+        return {}
+
+def _save_cache( cache_path: Path, parameters: Dict[ str, Any ], entries: Iterable[ CatalogEntry ] ):
+    now_ns = int( time.time() * 1e9 )
+
+    content = {
+        "version": CACHE_FORMAT_VERSION,
+        "parameters": parameters,
+        "files": {
+            entry.path: {
+                "mtime_ns": entry.mtime_ns,
+                "size": entry.size,
+                "content_hash": entry.content_hash,
+                "registrations": [ _encode_registration( registration ) for registration in entry.registrations ],
+                "is_parsed": entry.is_parsed,
+            }
+            for entry in entries if now_ns - entry.mtime_ns >= _RACY_FILE_INTERVAL_NS
+        },
+    }
+
+    cache_path.parent.mkdir( parents = True, exist_ok = True )
+    temporary_path = cache_path.with_name( f"{ cache_path.name }.{ os.getpid() }.tmp" )
+    with open( temporary_path, "w", encoding = "utf-8" ) as cache_file:
+        json.dump( content, cache_file, separators = ( ",", ":" ) )
+    os.replace( temporary_path, cache_path )
+
+def build_catalog( directory_path: Union[ str, Path ], *target_file_extensions: Iterable[ str ], **kwargs: Dict[ str, Any ] ) -> List[ CatalogEntry ]:
+    """
+    Discovers the module files in the given directory path like `dynamic_import.discover_modules`, and describes each of them by its file state and its
+    statically extracted registration decorator calls, without importing any module.
+
+    Parameters:
+    `directory_path`: directory path to discover modules in.
+    `target_file_extensions`: iterable of file extensions to match files against.
+
+    Keywords:
+    `relative_import_package`: package the module names are relative to; defaults to None, indicating the module names are relative to the directory.
+    `registration_decorators`: names of the registration decorators whose calls are extracted; defaults to none, indicating registrations are not
+        extracted.
+    `cache_path`: path of a JSON file the descriptions are cached in, so files whose modification time and size are unchanged are neither hashed nor parsed
+        again; defaults to None, indicating every file is read.
+    Other keywords, such as `recursive` and `discovery_manifest`, are passed to `dynamic_import.discover_modules`.
+
+    Returns:
+    List of the catalog entries, in discovery order.
+    """
+
+    candidates = discover_modules( directory_path, *target_file_extensions, **kwargs )
+
+    return describe_candidates( candidates, kwargs.get( "relative_import_package", None ), kwargs.get( "registration_decorators", None ), kwargs.get( "cache_path", None ) )
+
+def describe_candidates( candidates: Iterable[ ModuleCandidate ], relative_import_package: Union[ ModuleType, str, None ], registration_decorators: Optional[ Iterable[ str ] ],
+                         cache_path: Union[ str, Path, None ] = None ) -> List[ CatalogEntry ]:
+    """
+    Describes the given discovered module candidates like `build_catalog`, without importing them.
+
+    Parameters:
+    `candidates`: module candidates, as returned by `dynamic_import.discover_modules`.
+    `relative_import_package`: package the candidate module names are relative to.
+    `registration_decorators`: names of the registration decorators whose calls are extracted; None indicates registrations are not extracted.
+    `cache_path`: path of a JSON file the descriptions are cached in; defaults to None, indicating every file is read.
+
+    Returns:
+    List of the catalog entries, in candidate order; candidates whose files were removed are left out.
+    """
+
+    relative_import_package_name: Optional[ str ] = _resolve_relative_import_package_name( relative_import_package )
+
+    decorator_names = registration_decorators or ()
+    if isinstance( decorator_names, str ):
+        decorator_names = [ decorator_names ]
+    decorator_names = sorted( set( decorator_names ) )
+
+    cache_path = Path( cache_path ) if cache_path is not None else None
+    parameters: Dict[ str, Any ] = { "registration_decorators": decorator_names }
+    cached: Dict[ str, Tuple[ FileState, Tuple[ StaticRegistration, ... ], bool ] ] = _load_cache( cache_path, parameters ) if cache_path is not None else {}
+
+    entries: List[ CatalogEntry ] = []
+    is_cache_stale: bool = False
+
+    for candidate in candidates:
+        path = os.fspath( candidate.path )
+        previous_state, registrations, is_parsed = cached.get( path, ( None, (), False ) )
+
+        try:
+            state = get_file_state( path, previous_state )
+        except OSError:
+            # the file was removed after it was discovered.
+            is_cache_stale = True
+            continue
+
+        if not state.has_same_content( previous_state ):
+            module_tree = parse_module( path )
+            is_parsed = module_tree is not None
+            registrations = tuple( get_class_registrations( module_tree, decorator_names ) ) if is_parsed and len( decorator_names ) > 0 else ()
+            is_cache_stale = True
+        elif state.mtime_ns != previous_state.mtime_ns:
+            is_cache_stale = True
+
+        module_name = get_absolute_module_name( candidate.module_name, relative_import_package_name )
+        entries.append( CatalogEntry( module_name, path, state.size, state.mtime_ns, state.content_hash, registrations, is_parsed ) )
+
+    if cache_path is not None and ( is_cache_stale or len( entries ) != len( cached ) ):
+        _save_cache( cache_path, parameters, entries )
+
+    return entries
+
+def main( args = None ) -> int:
+    """
+    Command line tool which lists the plugin modules of a package without importing them.
+    """
+
+    import argparse
+    import importlib
+
+    parser = argparse.ArgumentParser( prog = "python -m plugin_engine.plugin_catalog", description = "Lists the plugin modules of a package and their registrations without importing them." )
+    parser.add_argument( "package", help = "name of the package containing the plugin modules; the package itself is imported, its plugin modules are not" )
+    parser.add_argument( "--ext", action = "append", default = None, help = "file extension of the module files; may be repeated; defaults to .py" )
+    parser.add_argument( "--recursive", action = "store_true", help = "search the package directory recursively" )
+    parser.add_argument( "--decorator", action = "append", default = None, help = "name of a registration decorator; may be repeated" )
+    parser.add_argument( "--cache", default = None, help = "path of a JSON file the catalog is cached in" )
+    parser.add_argument( "--json", action = "store_true", help = "write the catalog as JSON" )
+    arguments = parser.parse_args( args )
+
+    package: ModuleType = importlib.import_module( arguments.package )
+    entries = build_catalog( Path( package.__file__ ).parent, *( arguments.ext or [ ".py" ] ), recursive = arguments.recursive, relative_import_package = package,
+                             registration_decorators = arguments.decorator, cache_path = arguments.cache )
+
+    if arguments.json:
+        json.dump( [ dict( entry._asdict(), registrations = [ dict( registration._asdict(), call = describe_registration( registration ) ) for registration in entry.registrations ] )
+                     for entry in entries ], sys.stdout, indent = 2, default = repr )
+        print()
+    else:
+        for entry in entries:
+            print( f"{ entry.module_name }  { entry.size } bytes  { entry.content_hash[ :12 ] }{ '  (disabled)' if entry.is_disabled else '' }" )
+            for registration in entry.registrations:
+                print( f"    { registration.qualname }: @{ describe_registration( registration ) }" )
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit( main() )
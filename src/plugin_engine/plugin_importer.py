@@ -1,95 +1,1067 @@
-__version__ = r"1.0.0"
-
-from types import ModuleType
-from typing import Any, Dict, Tuple
-
-import importlib
-from pathlib import Path
-from .dynamic_import import import_modules
-
-class PluginImporter( object ):
-    """
-    Imports plugins dynamically. A plugin is a module relative to a given package.
-    """
-
-    def __init__( self, relative_import_package: ModuleType, **kwargs: Dict[ str, Any ] ):
-        if not isinstance( relative_import_package, ModuleType ):
-            raise ValueError( "The relative import package must a package or module." )
-
-        self._relative_import_package = relative_import_package
-        self._loaded_modules = None
-
-    def __del__( self ):
-        del self._loaded_modules
-
-    @property
-    def relative_import_package( self ) -> ModuleType:
-        """
-        The package to use as an anchor for imports.
-        """
-
-        return self._relative_import_package
-
-    @property
-    def _package_directory_path( self ) -> Path:
-        """
-        The path to search in for modules to load.
-        """
-
-        return Path( self.relative_import_package.__file__ ).parent
-
-    @property
-    def loaded_modules( self ) -> Tuple[ ModuleType ]:
-        """
-        The collection of modules previously loaded.
-        
-        Returns:
-        Iterable of modules which are loaded.
-        """
-
-        return self._loaded_modules
-
-    @property
-    def has_loaded_modules( self ) -> bool:
-        """
-        Indicates if modules have been loaded on this importer yet.
-        
-        Returns:
-        `True` if modules are currently loaded, `False` otherwise.
-        """
-
-        return self.loaded_modules is not None
-
-    def import_modules( self, **kwargs: Dict[ str, Any ] ) -> Tuple[ ModuleType ]:
-        """
-        Loads modules as relative imports to the relative import package. Files starting '.' will be skipped.
-        
-        Returns:
-        Iterable of modules which were loaded.
-        """
-
-        module_file_ext = kwargs.get( "module_file_ext", None )
-        if module_file_ext is None:
-            module_file_ext = [ ".py" ]
-
-        if not self.has_loaded_modules:
-            keyword_args: Dict[ str, Any ] = kwargs.copy()
-            keyword_args[ "relative_import_package" ] = self.relative_import_package
-
-            self._loaded_modules = tuple( import_modules( self._package_directory_path, *module_file_ext, **keyword_args ) )
-
-            return self.loaded_modules
-        else:
-            raise Exception( "Cannot load modules; modules were already loaded." )
-
-    def reload_modules( self ) -> Tuple[ ModuleType ]:
-        """
-        Reloads modules previously loaded.
-        
-        Returns:
-        Iterable of modules which are loaded.
-        """
-
-        self._loaded_modules = tuple( [ importlib.reload( module ) for module in self.loaded_modules ] )
-
-        return self.loaded_modules
+__version__ = r"1.0.0"
+
+from concurrent.futures import Executor
+from contextlib import contextmanager
+from types import ModuleType
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple, Type, Union
+
+import asyncio
+import functools
+import gc
+import importlib
+import json
+import os
+import sys
+import types
+import weakref
+from . import instrumentation
+from collections import OrderedDict
+from pathlib import Path
+from .class_registration import buffered_registrations
+from .dynamic_import import ModuleCandidate, _import_candidates, _resolve_ignored_filenames, discover_modules, import_modules
+from .file_state import FileState, execute_recording_source, get_file_state
+from .fork_support import reset_lock_after_fork
+from .instrumentation import IMPORT, RELOAD, RETRY, InstrumentationEvent, instrument, measure
+from .lazy_registration import LazyClass, RegistrationRecord, read_registration_manifest, register_lazy_classes, scan_registrations
+from .plugin_bundle import MappedPluginBundle, PluginBundle
+from .plugin_catalog import CatalogEntry, build_catalog
+from .plugin_registry import PluginRegistry
+from .static_analysis import ImportCycleError, build_dependency_graph, get_absolute_module_name, sort_by_dependencies
+from .warm_start import SnapshotRegistration, WarmStartSnapshot, count_untrusted_entries, get_directory_signature, is_snapshot_current, read_warm_start_snapshot, register_snapshot_classes, write_warm_start_snapshot
+
+class ReloadResult( NamedTuple ):
+    """
+    The changes applied by an incremental reload, as absolute module names in discovery order.
+
+    Fields:
+    `added`: modules whose files were added and which were imported.
+    `changed`: modules whose files changed and which were reloaded.
+    `dependents`: unchanged modules which were reloaded because they import a changed or removed module.
+    `removed`: modules whose files were removed and which were dropped.
+    `unchanged_count`: number of loaded modules which were not reloaded.
+    `deregistered`: IDs of the registrations removed from the registration targets, because their modules were removed or no longer register them.
+    """
+
+    added: Tuple[ str, ... ]
+    changed: Tuple[ str, ... ]
+    dependents: Tuple[ str, ... ]
+    removed: Tuple[ str, ... ]
+    unchanged_count: int
+    deregistered: Tuple[ Any, ... ] = ()
+
+    @property
+    def reloaded( self ) -> Tuple[ str, ... ]:
+        """
+        The modules which were reloaded.
+        """
+
+        return self.changed + self.dependents
+
+    @property
+    def has_changes( self ) -> bool:
+        """
+        Indicates if any module was added, reloaded or removed.
+        """
+
+        return len( self.added ) > 0 or len( self.changed ) > 0 or len( self.removed ) > 0
+
+class PluginLoadCost( NamedTuple ):
+    """
+    The recorded cost of loading a plugin module.
+
+    Fields:
+    `module_name`: absolute name of the module.
+    `import_time`: wall clock time of the successful import, in seconds.
+    `cpu_time`: CPU time of all of the import attempts and reloads, in seconds.
+    `memory_delta`: memory traced by `tracemalloc` across all of the import attempts and reloads, in bytes; None if memory was not traced.
+    `failed_attempt_count`: number of import attempts which failed, including failed retries.
+    `wasted_time`: wall clock time of the import attempts which failed, in seconds.
+    `reload_count`: number of reloads.
+    `reload_time`: wall clock time of the reloads, in seconds.
+    """
+
+    module_name: str
+    import_time: float
+    cpu_time: float
+    memory_delta: Optional[ int ]
+    failed_attempt_count: int
+    wasted_time: float
+    reload_count: int
+    reload_time: float
+
+    @property
+    def total_time( self ) -> float:
+        """
+        The wall clock time of all of the import attempts and reloads, in seconds.
+        """
+
+        return self.import_time + self.wasted_time + self.reload_time
+
+def write_load_cost_report( report_path: Union[ str, Path ], costs: Iterable[ PluginLoadCost ] ):
+    """
+    Writes the given load costs, e.g. from `PluginImporter.get_load_cost_report`, to a JSON file, so a later run can estimate the time avoided by not
+    importing modules.
+    """
+
+    content = { "costs": [ cost._asdict() for cost in costs ] }
+
+    temporary_path = f"{ os.fspath( report_path ) }.{ os.getpid() }.tmp"
+    with open( temporary_path, "w", encoding = "utf-8" ) as report_file:
+        json.dump( content, report_file, indent = 4 )
+    os.replace( temporary_path, report_path )
+
+def read_load_cost_report( report_path: Union[ str, Path ] ) -> List[ PluginLoadCost ]:
+    """
+    Reads load costs written by `write_load_cost_report`.
+
+    Raises:
+    `ValueError`: if the file is not a valid load cost report.
+    """
+
+    with open( report_path, "r", encoding = "utf-8" ) as report_file:
+        content = json.load( report_file )
+
+    try:
+        return [ PluginLoadCost( **cost ) for cost in content[ "costs" ] ]
+    except ( KeyError, TypeError ) as e:
+        raise ValueError( f"Invalid load cost report '{ report_path }': { e }" )
+
+class LeakedObject( NamedTuple ):
+    """
+    An unloaded module or deregistered class which was still alive after garbage collection.
+
+    Fields:
+    `name`: name of the module, or qualified name of the class.
+    `kind`: `module` or `class`.
+    `referrers`: descriptions of the objects which still refer to it.
+    """
+
+    name: str
+    kind: str
+    referrers: Tuple[ str, ... ]
+
+class UnloadResult( NamedTuple ):
+    """
+    The outcome of unloading the plugin modules.
+
+    Fields:
+    `modules`: absolute names of the modules which were removed from `sys.modules`.
+    `registration_ids`: IDs of the classes which were deregistered.
+    `leaked`: modules and classes which were not collected; empty if leaks were not verified.
+    """
+
+    modules: Tuple[ str, ... ]
+    registration_ids: Tuple[ Any, ... ]
+    leaked: Tuple[ LeakedObject, ... ]
+
+    @property
+    def is_clean( self ) -> bool:
+        """
+        Indicates if every unloaded module and deregistered class was collected.
+        """
+
+        return len( self.leaked ) == 0
+
+@contextmanager
+def _holding( lock: Any ) -> Iterator[ None ]:
+    if lock is not None:
+        lock.acquire()
+
+    try:
+        yield
+    finally:
+        if lock is not None:
+            lock.release()
+
+def _get_registered_module_name( registered: Any ) -> Optional[ str ]:
+    return registered.module_name if isinstance( registered, LazyClass ) else getattr( registered, "__module__", None )
+
+def _deregister_classes( registration_targets: Iterable[ Dict[ Any, Any ] ], lock: Any, is_plugin: Callable[ [ Dict[ Any, Any ], Any, Any ], bool ] ) -> List[ Tuple[ Any, Any ] ]:
+    """
+    Removes the registrations recognized by the given callable, which is called with the registration target, the registration ID and the registered class
+    or stand-in, from the given registration targets while holding the given lock.
+
+    Returns:
+    List of the registration IDs and registered objects which were removed.
+    """
+
+    removed: List[ Tuple[ Any, Any ] ] = []
+
+    with _holding( lock ):
+        for registration_target in registration_targets:
+            for registration_id, registered in list( registration_target.items() ):
+                if is_plugin( registration_target, registration_id, registered ):
+                    del registration_target[ registration_id ]
+                    removed.append( ( registration_id, registered ) )
+
+    return removed
+
+def _describe_referrer( referrer: Any, referent: Any ) -> str:
+    if isinstance( referrer, dict ):
+        keys = [ repr( key ) for key, value in referrer.items() if value is referent ][ :3 ]
+
+        for module in list( sys.modules.values() ):
+            if getattr( module, "__dict__", None ) is referrer:
+                return f"attribute { ', '.join( keys ) } of module '{ module.__name__ }'"
+
+        return f"dict { ', '.join( keys ) }" if len( keys ) > 0 else f"dict of { len( referrer ) } items"
+    elif isinstance( referrer, ( list, tuple, set, frozenset ) ):
+        return f"{ type( referrer ).__name__ } of { len( referrer ) } items"
+    elif isinstance( referrer, ( types.FunctionType, types.MethodType ) ):
+        return f"function '{ getattr( referrer, '__qualname__', '?' ) }'"
+    elif isinstance( referrer, type ):
+        return f"class '{ referrer.__module__ }.{ referrer.__qualname__ }'"
+    else:
+        return f"{ type( referrer ).__module__ }.{ type( referrer ).__qualname__ } object"
+
+class PluginImporter( object ):
+    """
+    Imports plugins dynamically. A plugin is a module relative to a given package.
+    """
+
+    def __init__( self, relative_import_package: ModuleType, **kwargs: Dict[ str, Any ] ):
+        if not isinstance( relative_import_package, ModuleType ):
+            raise ValueError( "The relative import package must a package or module." )
+
+        self._relative_import_package = relative_import_package
+        self._loaded_modules = None
+        self._lazy_classes = ()
+        self._import_arguments: Optional[ Tuple[ List[ str ], Dict[ str, Any ] ] ] = None
+        self._module_states: Dict[ str, FileState ] = {}
+        self._bundle: Optional[ PluginBundle ] = None
+        self._load_events: Optional[ List[ InstrumentationEvent ] ] = None
+        self._trace_memory: bool = False
+        self._is_warm_started: bool = False
+        # process ID, modules and registrations recorded by `prepare_for_fork`.
+        self._fork_state: Optional[ Tuple[ int, Dict[ str, ModuleType ], Dict[ Any, Any ] ] ] = None
+
+    def __del__( self ):
+        del self._loaded_modules
+
+    @property
+    def relative_import_package( self ) -> ModuleType:
+        """
+        The package to use as an anchor for imports.
+        """
+
+        return self._relative_import_package
+
+    @property
+    def _package_directory_path( self ) -> Path:
+        """
+        The path to search in for modules to load.
+        """
+
+        return Path( self.relative_import_package.__file__ ).parent
+
+    @property
+    def loaded_modules( self ) -> Tuple[ ModuleType ]:
+        """
+        The collection of modules previously loaded.
+        
+        Returns:
+        Iterable of modules which are loaded.
+        """
+
+        return self._loaded_modules
+
+    @property
+    def lazy_classes( self ) -> Tuple[ LazyClass ]:
+        """
+        The stand-ins registered by a lazy import.
+
+        Returns:
+        Iterable of the stand-ins, which is empty if the modules were not imported lazily.
+        """
+
+        return self._lazy_classes
+
+    @property
+    def bundle( self ) -> Optional[ PluginBundle ]:
+        """
+        The bundle the modules were loaded from, if any.
+        """
+
+        return self._bundle
+
+    @property
+    def load_events( self ) -> Tuple[ InstrumentationEvent, ... ]:
+        """
+        The events recorded while importing and reloading the modules; empty unless load costs are recorded.
+        """
+
+        return tuple( self._load_events ) if self._load_events is not None else ()
+
+    @property
+    def import_arguments( self ) -> Optional[ Tuple[ List[ str ], Dict[ str, Any ] ] ]:
+        """
+        The module file extensions and the keywords the modules were imported with, which reloads discover the modules with again; None if the modules are
+        not imported.
+        """
+
+        return self._import_arguments
+
+    @property
+    def is_warm_started( self ) -> bool:
+        """
+        Indicates if the modules were not imported because a current registry snapshot was loaded instead.
+        """
+
+        return self._is_warm_started
+
+    @property
+    def is_prepared_for_fork( self ) -> bool:
+        """
+        Indicates if `prepare_for_fork` was called, in this process or in a parent process this process was forked from.
+        """
+
+        return self._fork_state is not None
+
+    @property
+    def is_forked( self ) -> bool:
+        """
+        Indicates if this process was forked from the process which prepared the importer for forking.
+        """
+
+        return self._fork_state is not None and self._fork_state[ 0 ] != os.getpid()
+
+    @property
+    def has_loaded_modules( self ) -> bool:
+        """
+        Indicates if modules have been loaded on this importer yet.
+        
+        Returns:
+        `True` if modules are currently loaded, `False` otherwise.
+        """
+
+        return self.loaded_modules is not None
+
+    def import_modules( self, **kwargs: Dict[ str, Any ] ) -> Tuple[ ModuleType ]:
+        """
+        Loads modules as relative imports to the relative import package. Files starting '.' will be skipped.
+
+        Keywords:
+        `module_file_ext`: iterable of file extensions of the module files to load; defaults to `.py`.
+        `bundle`: `PluginBundle`, or path to a bundle file written by `plugin_bundle.build_bundle`, to load the precompiled modules from instead of the package
+            directory; defaults to None.
+        `map_bundle`: indicates if a bundle given as a path is memory-mapped rather than read into memory; defaults to `False`.
+        `check_bundle_sources`: indicates if a bundle given as a path checks the modules' source files, so missing and stale entries are imported from the
+            source files; defaults to `False`. See `PluginBundle`.
+        `record_load_costs`: indicates if the discovery, import attempts, registrations and later reloads are measured for `get_load_cost_report`; defaults
+            to `False`.
+        `trace_memory`: indicates if `tracemalloc` is started while load costs are recorded, so they include memory deltas; defaults to `False`.
+        `discovery_manifest`: `DiscoveryManifest`, or path to a manifest file, which records the discovered modules so warm starts only rescan changed
+            directories; defaults to None, indicating the package directory is fully scanned.
+        `discovery_workers`: number of threads used to list directories concurrently when searching recursively; defaults to 1.
+        `buffer_registrations`: indicates if the registrations made by `register_class` while the modules are imported are buffered and registered in bulk
+            once all of the modules are imported; defaults to None, indicating they are buffered only if the registration target is a copy-on-write
+            `PluginRegistry`, which would otherwise copy its state once per registered class.
+        `lazy`: indicates if the modules should not be executed; instead, `LazyClass` stand-ins are registered and each module is imported when its class is
+            first resolved; defaults to `False`.
+        `registration_target`: registration target the stand-ins are registered into; required when importing lazily.
+        `registration_target_lock`: lock controlling access to the registration target; defaults to None, indicating there is no lock.
+        `registration_decorators`: names of the registration decorators whose decorated classes are found by static analysis when importing lazily.
+        `registration_manifest`: path to a sidecar registration manifest listing the classes to register stand-ins for when importing lazily; used instead of
+            static analysis.
+        `registry_snapshot`: path of a warm start snapshot file. If the snapshot is current, i.e. no module file was added, removed or changed since it was
+            written, stand-ins for its registrations are registered into the registration target instead of discovering and importing the modules;
+            otherwise, the modules are imported and the snapshot is written with the plugins' registrations. A snapshot with files or directories which were
+            modified too recently to be trusted by modification time is rewritten after a warm start once they can be. Requires a registration target;
+            defaults to None.
+        Other keywords are passed to `dynamic_import.import_modules`.
+
+        Returns:
+        Iterable of modules which were loaded; empty when importing lazily or warm starting from a registry snapshot.
+
+        Notes:
+            - Stand-ins are registered with the classes' qualified names as their IDs unless a registration manifest gives other IDs; the IDs must match the
+              ones the registration decorators use.
+            - A registry snapshot does not record the plugin index, disabled filter, shard or sandbox the modules were imported with; each configuration
+              needs its own snapshot file.
+            - The plugin index, disabled filter and shard are also applied when importing lazily and when reloading changed modules.
+        """
+
+        module_file_ext = kwargs.get( "module_file_ext", None )
+        if module_file_ext is None:
+            module_file_ext = [ ".py" ]
+
+        if not self.has_loaded_modules:
+            keyword_args: Dict[ str, Any ] = kwargs.copy()
+            keyword_args[ "relative_import_package" ] = self.relative_import_package
+
+            bundle = kwargs.get( "bundle", None )
+            if bundle is not None and not isinstance( bundle, PluginBundle ):
+                bundle_class = MappedPluginBundle if bool( kwargs.get( "map_bundle", False ) ) else PluginBundle
+                bundle = bundle_class( bundle, check_sources = bool( kwargs.get( "check_bundle_sources", False ) ) )
+            self._bundle = bundle
+            source = bundle if bundle is not None else self._package_directory_path
+
+            registry_snapshot = kwargs.get( "registry_snapshot", None )
+            if registry_snapshot is not None:
+                if bundle is not None:
+                    raise ValueError( "Cannot use a registry snapshot with a bundle." )
+                elif kwargs.get( "registration_target", None ) is None:
+                    raise ValueError( "A registration target is required to use a registry snapshot." )
+
+            if bool( kwargs.get( "record_load_costs", False ) ):
+                self._load_events = []
+                self._trace_memory = bool( kwargs.get( "trace_memory", False ) )
+
+            with self._recording_load_events():
+                warm_start_snapshot = self._start_from_registry_snapshot( registry_snapshot, module_file_ext, **keyword_args ) if registry_snapshot is not None else None
+
+                if warm_start_snapshot is not None:
+                    self._loaded_modules = ()
+                elif bool( kwargs.get( "lazy", False ) ):
+                    self._lazy_classes = tuple( self._register_lazy_classes( module_file_ext, **keyword_args ) )
+                    self._loaded_modules = ()
+                elif self._should_buffer_registrations( **kwargs ):
+                    with buffered_registrations():
+                        self._loaded_modules = tuple( import_modules( source, *module_file_ext, **keyword_args ) )
+                else:
+                    self._loaded_modules = tuple( import_modules( source, *module_file_ext, **keyword_args ) )
+
+            self._import_arguments = ( module_file_ext, keyword_args )
+            self._record_module_states()
+
+            if registry_snapshot is not None:
+                if warm_start_snapshot is None:
+                    self._write_registry_snapshot( registry_snapshot, module_file_ext, **keyword_args )
+                elif count_untrusted_entries( warm_start_snapshot ) > 0:
+                    self._refresh_registry_snapshot( registry_snapshot, warm_start_snapshot, module_file_ext, **keyword_args )
+
+            return self.loaded_modules
+        else:
+            raise Exception( "Cannot load modules; modules were already loaded." )
+
+    @staticmethod
+    def _should_buffer_registrations( **kwargs: Dict[ str, Any ] ) -> bool:
+        buffer_registrations = kwargs.get( "buffer_registrations", None )
+        if buffer_registrations is not None:
+            return bool( buffer_registrations )
+
+        # buffered registrations are published as a single copy-on-write state rather than one per class.
+        registration_target = kwargs.get( "registration_target", None )
+        return isinstance( registration_target, PluginRegistry ) and registration_target.is_copy_on_write
+
+    async def import_modules_async( self, **kwargs: Dict[ str, Any ] ) -> Tuple[ ModuleType ]:
+        """
+        Loads modules like `import_modules`, running the discovery and the imports in an executor so the event loop is not blocked.
+
+        Keywords:
+        `executor`: `concurrent.futures.Executor` to run in; defaults to None, indicating the event loop's default executor.
+        Other keywords are passed to `import_modules`.
+
+        Returns:
+        Iterable of modules which were loaded; empty when importing lazily.
+
+        Notes:
+            - Cancelling the awaiting task does not interrupt an import which is already running.
+        """
+
+        keyword_args: Dict[ str, Any ] = kwargs.copy()
+        executor = keyword_args.pop( "executor", None )
+
+        return await asyncio.get_event_loop().run_in_executor( executor, functools.partial( self.import_modules, **keyword_args ) )
+
+    def _get_snapshot_parameters( self, module_file_ext: List[ str ], **kwargs: Dict[ str, Any ] ) -> Dict[ str, Any ]:
+        return {
+            "package": self.relative_import_package.__name__,
+            "module_file_ext": sorted( set( module_file_ext ) ),
+            "recursive": bool( kwargs.get( "recursive", False ) ),
+            "ignored_filenames": sorted( _resolve_ignored_filenames( kwargs.get( "ignored_filenames", None ) ) ),
+        }
+
+    def _start_from_registry_snapshot( self, snapshot_path: Union[ str, Path ], module_file_ext: List[ str ], **kwargs: Dict[ str, Any ] ) -> Optional[ WarmStartSnapshot ]:
+        """
+        Registers stand-ins for the registrations of the given snapshot if it is current.
+
+        Returns:
+        The snapshot if it was loaded, or None if the modules must be imported.
+        """
+
+        snapshot: Optional[ WarmStartSnapshot ] = read_warm_start_snapshot( snapshot_path )
+        if snapshot is None:
+            return None
+
+        discover_paths = lambda: ( candidate.path for candidate in discover_modules( self._package_directory_path, *module_file_ext, **kwargs ) )
+        if not is_snapshot_current( snapshot, self._get_snapshot_parameters( module_file_ext, **kwargs ), discover_paths ):
+            return None
+
+        self._lazy_classes = tuple( register_snapshot_classes( snapshot, kwargs[ "registration_target" ], registration_target_lock = kwargs.get( "registration_target_lock", None ) ) )
+        self._is_warm_started = True
+
+        return snapshot
+
+    def _write_registry_snapshot( self, snapshot_path: Union[ str, Path ], module_file_ext: List[ str ], **kwargs: Dict[ str, Any ] ):
+        """
+        Writes a snapshot of the registrations of the plugin modules in the registration target.
+        """
+
+        package_name: str = self.relative_import_package.__name__
+        registration_target = kwargs[ "registration_target" ]
+        get_tags = getattr( registration_target, "get_tags", None )
+        lock = kwargs.get( "registration_target_lock", None )
+
+        if lock is not None:
+            lock.acquire()
+
+        try:
+            registrations: List[ SnapshotRegistration ] = []
+
+            for registration_id, registered in list( registration_target.items() ):
+                if isinstance( registered, LazyClass ):
+                    module_name, qualname = registered.module_name, registered.qualname
+                else:
+                    module_name, qualname = getattr( registered, "__module__", "" ), getattr( registered, "__qualname__", "" )
+
+                if module_name.startswith( f"{ package_name }." ):
+                    tags = tuple( get_tags( registration_id ) ) if get_tags is not None else ()
+                    registrations.append( SnapshotRegistration( registration_id, module_name, qualname, tags ) )
+        finally:
+            if lock is not None:
+                lock.release()
+
+        directories, files = self._get_snapshot_sources( module_file_ext, {}, **kwargs )
+        write_warm_start_snapshot( snapshot_path, WarmStartSnapshot( self._get_snapshot_parameters( module_file_ext, **kwargs ), directories, files, tuple( registrations ) ) )
+
+    def _refresh_registry_snapshot( self, snapshot_path: Union[ str, Path ], snapshot: WarmStartSnapshot, module_file_ext: List[ str ], **kwargs: Dict[ str, Any ] ):
+        """
+        Rewrites the given snapshot, which was loaded by a warm start, with the current signatures and states of the package's directories and module files, if
+        this trusts more of them. Nothing is written if a module file was added, removed or changed since the snapshot was validated; the next import rewrites
+        it instead.
+        """
+
+        directories, files = self._get_snapshot_sources( module_file_ext, { state.path: state for state in snapshot.files }, **kwargs )
+
+        if { state.path: state.content_hash for state in files } != { state.path: state.content_hash for state in snapshot.files }:
+            return
+
+        refreshed_snapshot = WarmStartSnapshot( snapshot.parameters, directories, files, snapshot.registrations )
+        if count_untrusted_entries( refreshed_snapshot ) < count_untrusted_entries( snapshot ):
+            write_warm_start_snapshot( snapshot_path, refreshed_snapshot )
+
+    def _get_snapshot_sources( self, module_file_ext: List[ str ], previous_states: Dict[ str, FileState ], **kwargs: Dict[ str, Any ] ) -> Tuple[ Dict[ str, Optional[ Tuple[ int, int ] ] ], Tuple[ FileState, ... ] ]:
+        """
+        Gets the signatures of the directories searched for module files, and the states of the module files, reusing the content hashes of the given previous
+        states of unchanged files.
+        """
+
+        package_directory_path: str = os.fspath( self._package_directory_path )
+        if bool( kwargs.get( "recursive", False ) ):
+            directory_paths: List[ str ] = [ root for root, _, _ in os.walk( package_directory_path ) ]
+        else:
+            directory_paths = [ package_directory_path ]
+
+        # the directories are read before the files, so a file added in between makes the snapshot stale rather than incomplete.
+        directories = { path: get_directory_signature( path ) for path in directory_paths }
+        files: List[ FileState ] = []
+        for candidate in discover_modules( self._package_directory_path, *module_file_ext, **kwargs ):
+            try:
+                files.append( get_file_state( candidate.path, previous_states.get( os.fspath( candidate.path ), None ) ) )
+            except OSError:
+                pass
+
+        return directories, tuple( files )
+
+    def _register_lazy_classes( self, module_file_ext: List[ str ], **kwargs: Dict[ str, Any ] ) -> List[ LazyClass ]:
+        registration_target = kwargs.get( "registration_target", None )
+        if registration_target is None:
+            raise ValueError( "A registration target is required to import modules lazily." )
+
+        registration_manifest = kwargs.get( "registration_manifest", None )
+        registration_decorators = kwargs.get( "registration_decorators", None )
+
+        if registration_manifest is not None:
+            records: List[ RegistrationRecord ] = read_registration_manifest( registration_manifest )
+        elif self._bundle is not None:
+            raise ValueError( "A registration manifest is required to import modules lazily from a bundle." )
+        elif registration_decorators is not None:
+            if isinstance( registration_decorators, str ):
+                registration_decorators = [ registration_decorators ]
+
+            candidates: List[ ModuleCandidate ] = discover_modules( self._package_directory_path, *module_file_ext, **kwargs )
+
+            for candidate_filter in ( kwargs.get( "plugin_index", None ), kwargs.get( "disabled_filter", None ), kwargs.get( "shard", None ) ):
+                if candidate_filter is not None:
+                    candidates = candidate_filter.filter_candidates( candidates, self.relative_import_package.__name__ )
+
+            records = scan_registrations( candidates, registration_decorators )
+        else:
+            raise ValueError( "Either registration decorators or a registration manifest are required to import modules lazily." )
+
+        if self._bundle is not None:
+            # the stand-ins import their modules from the bundle when they are resolved.
+            self._bundle.install()
+
+        return register_lazy_classes( records, registration_target, self.relative_import_package.__name__, registration_target_lock = kwargs.get( "registration_target_lock", None ) )
+
+    def get_catalog( self, **kwargs: Dict[ str, Any ] ) -> List[ CatalogEntry ]:
+        """
+        Lists the plugin modules of the package directory and their statically extracted registrations, without importing any of them; the modules do not
+        need to be loaded.
+
+        Keywords:
+        `module_file_ext`: iterable of file extensions of the module files; defaults to `.py`.
+        Other keywords, such as `recursive`, `registration_decorators` and `cache_path`, are passed to `plugin_catalog.build_catalog`.
+
+        Returns:
+        List of the catalog entries, in discovery order, with absolute module names.
+        """
+
+        keyword_args: Dict[ str, Any ] = kwargs.copy()
+        module_file_ext = keyword_args.pop( "module_file_ext", None )
+        if module_file_ext is None:
+            module_file_ext = [ ".py" ]
+
+        keyword_args[ "relative_import_package" ] = self.relative_import_package
+
+        return build_catalog( self._package_directory_path, *module_file_ext, **keyword_args )
+
+    def reload_modules( self ) -> Tuple[ ModuleType ]:
+        """
+        Reloads modules previously loaded.
+        
+        Returns:
+        Iterable of modules which are loaded.
+        """
+
+        with self._recording_load_events():
+            self._loaded_modules = tuple( [ self._reload_module( module ) for module in self.loaded_modules ] )
+        self._record_module_states()
+
+        return self.loaded_modules
+
+    async def reload_modules_async( self, executor: Optional[ Executor ] = None ) -> Tuple[ ModuleType ]:
+        """
+        Reloads modules like `reload_modules`, in the given executor or the event loop's default executor, so the event loop is not blocked.
+        """
+
+        return await asyncio.get_event_loop().run_in_executor( executor, self.reload_modules )
+
+    async def reload_changed_modules_async( self, executor: Optional[ Executor ] = None, **kwargs: Dict[ str, Any ] ) -> ReloadResult:
+        """
+        Incrementally reloads modules like `reload_changed_modules`, in the given executor or the event loop's default executor, so the event loop is not
+        blocked. Keywords are passed to `reload_changed_modules`.
+        """
+
+        return await asyncio.get_event_loop().run_in_executor( executor, functools.partial( self.reload_changed_modules, **kwargs ) )
+
+    def reload_changed_modules( self, **kwargs: Dict[ str, Any ] ) -> ReloadResult:
+        """
+        Incrementally reloads the loaded modules. The package directory is discovered again with the keywords the modules were imported with; modules whose
+        file content changed are reloaded together with the loaded modules which import them, directly or indirectly, modules whose files were added are
+        imported, and modules whose files were removed are dropped from `sys.modules`. The classes of removed modules, and the classes reloaded modules no
+        longer register, are deregistered from the registration targets.
+
+        Keywords:
+        `registration_targets`: iterable of registration targets to deregister the classes from; defaults to the registration target the modules were
+            imported with, if any.
+        `registration_target_lock`: lock controlling access to the registration targets; held only while classes are deregistered, not while modules are
+            imported; defaults to the lock the modules were imported with, if any.
+
+        Returns:
+        The changes which were applied.
+
+        Notes:
+            - A file is only hashed when its modification time or size changed since the last load, and is only reloaded when its content hash changed.
+            - Modules are reloaded in the order of their static imports of each other, falling back to discovery order if they import each other in a cycle.
+            - If the modules were imported with a sandbox, added and changed modules are checked by it first; changed modules which exceed its limits are
+              dropped like removed modules, and added ones are not imported.
+            - Likewise, if the modules were imported with a plugin index, a disabled filter or a shard, changed modules which became shadowed, disabled or
+              moved to another shard are dropped, and added ones which are shadowed, disabled or belong to another shard are not imported.
+            - A class a reloaded module no longer registers is recognized by its registration still referring to the class of the previous import.
+        """
+
+        if not self.has_loaded_modules or self._import_arguments is None:
+            raise Exception( "Cannot reload modules; modules were not loaded." )
+        elif self._bundle is not None:
+            raise Exception( "Cannot reload modules incrementally; modules were loaded from a bundle." )
+
+        module_file_ext, keyword_args = self._import_arguments
+        relative_import_package_name: str = self.relative_import_package.__name__
+
+        registration_targets = kwargs.get( "registration_targets", None )
+        if registration_targets is None:
+            registration_targets = [ keyword_args[ "registration_target" ] ] if keyword_args.get( "registration_target", None ) is not None else []
+        registration_targets = list( registration_targets )
+        lock = kwargs.get( "registration_target_lock", keyword_args.get( "registration_target_lock", None ) )
+
+        candidates: List[ ModuleCandidate ] = discover_modules( self._package_directory_path, *module_file_ext, **keyword_args )
+        candidates_by_name: Dict[ str, ModuleCandidate ] = OrderedDict( ( get_absolute_module_name( c.module_name, relative_import_package_name ), c ) for c in candidates )
+        loaded_modules_by_name: Dict[ str, ModuleType ] = OrderedDict( ( module.__name__, module ) for module in self.loaded_modules )
+
+        added: List[ str ] = [ name for name in candidates_by_name if name not in loaded_modules_by_name ]
+        removed: List[ str ] = [ name for name in loaded_modules_by_name if name not in candidates_by_name ]
+        changed: List[ str ] = []
+
+        for name in loaded_modules_by_name:
+            if name in candidates_by_name:
+                previous_state: Optional[ FileState ] = self._module_states.get( name, None )
+
+                try:
+                    state = get_file_state( candidates_by_name[ name ].path, previous_state )
+                except OSError:
+                    # the file was removed after it was discovered.
+                    removed.append( name )
+                    del candidates_by_name[ name ]
+                else:
+                    if not state.has_same_content( previous_state ):
+                        changed.append( name )
+
+        def exclude( name: str ):
+            del candidates_by_name[ name ]
+
+            if name in loaded_modules_by_name:
+                changed.remove( name )
+                removed.append( name )
+            else:
+                added.remove( name )
+
+        for candidate_filter in ( keyword_args.get( "plugin_index", None ), keyword_args.get( "disabled_filter", None ), keyword_args.get( "shard", None ) ):
+            if candidate_filter is not None:
+                checked: List[ str ] = changed + added
+                kept: Set[ str ] = set( get_absolute_module_name( c.module_name, relative_import_package_name )
+                                        for c in candidate_filter.filter_candidates( [ candidates_by_name[ name ] for name in checked ], relative_import_package_name ) )
+                for name in checked:
+                    if name not in kept:
+                        exclude( name )
+
+        sandbox = keyword_args.get( "sandbox", None )
+        if sandbox is not None:
+            checked = changed + added
+            for name, result in zip( checked, sandbox.check( [ candidates_by_name[ name ] for name in checked ], relative_import_package_name ) ):
+                if not result.passed:
+                    exclude( name )
+
+        # every loaded module which imports a changed or removed module, directly or indirectly, is reloaded as well.
+        reverse_dependency_graph: Dict[ str, List[ str ] ] = {}
+        for name, dependencies in build_dependency_graph( candidates_by_name.values(), relative_import_package_name, removed ).items():
+            for dependency in dependencies:
+                reverse_dependency_graph.setdefault( dependency, [] ).append( name )
+
+        affected: Set[ str ] = set()
+        pending: List[ str ] = changed + removed
+        while len( pending ) > 0:
+            for dependent in reverse_dependency_graph.get( pending.pop(), [] ):
+                if dependent not in affected:
+                    affected.add( dependent )
+                    pending.append( dependent )
+
+        changed_set: Set[ str ] = set( changed )
+        dependents: List[ str ] = [ name for name in loaded_modules_by_name if name in affected and name in candidates_by_name and name not in changed_set ]
+
+        reloaded_names: Set[ str ] = changed_set.union( dependents )
+        removed_set: Set[ str ] = set( removed )
+        deregistered: List[ Any ] = []
+
+        # the registrations of the reloaded modules before the reload; those which still refer to the same objects afterwards were not registered again.
+        previous_registrations: Dict[ int, Dict[ Any, Any ] ] = {}
+        deregistered.extend( registration_id for registration_id, _ in _deregister_classes( registration_targets, lock, lambda target, registration_id, registered:
+                                                                                             _get_registered_module_name( registered ) in removed_set ) )
+        if len( reloaded_names ) > 0:
+            with _holding( lock ):
+                for registration_target in registration_targets:
+                    previous_registrations[ id( registration_target ) ] = { registration_id: registered for registration_id, registered in list( registration_target.items() )
+                                                                            if _get_registered_module_name( registered ) in reloaded_names }
+
+        for name in removed:
+            self._drop_module( loaded_modules_by_name.pop( name ) )
+        reloaded_candidates: List[ ModuleCandidate ] = [ c for name, c in candidates_by_name.items() if name in reloaded_names ]
+        try:
+            reloaded_candidates = sort_by_dependencies( reloaded_candidates, relative_import_package_name )
+        except ImportCycleError:
+            pass
+
+        with self._recording_load_events():
+            for candidate in reloaded_candidates:
+                name = get_absolute_module_name( candidate.module_name, relative_import_package_name )
+                loaded_modules_by_name[ name ] = self._reload_module( loaded_modules_by_name[ name ] )
+
+            if len( added ) > 0:
+                importlib.invalidate_caches()
+
+                added_candidates: List[ ModuleCandidate ] = [ candidates_by_name[ name ] for name in added ]
+                try:
+                    added_candidates = sort_by_dependencies( added_candidates, relative_import_package_name )
+                except ImportCycleError:
+                    pass
+
+                for module in _import_candidates( added_candidates, relative_import_package_name, f"the '{ self._package_directory_path }' directory tree" ):
+                    loaded_modules_by_name[ module.__name__ ] = module
+
+        self._loaded_modules = tuple( loaded_modules_by_name[ name ] for name in candidates_by_name if name in loaded_modules_by_name )
+        self._record_module_states()
+
+        if len( previous_registrations ) > 0:
+            deregistered.extend( registration_id for registration_id, _ in _deregister_classes( registration_targets, lock, lambda target, registration_id, registered:
+                                                                                                 previous_registrations[ id( target ) ].get( registration_id, None ) is registered ) )
+
+        return ReloadResult( tuple( added ), tuple( changed ), tuple( dependents ), tuple( removed ), len( self._loaded_modules ) - len( added ) - len( reloaded_names ),
+                             tuple( deregistered ) )
+
+    def prepare_for_fork( self, **kwargs: Dict[ str, Any ] ):
+        """
+        Prepares the process for forking worker processes which share the imported plugins. The modules are imported if they were not yet, lazy stand-ins are
+        resolved, the objects allocated so far are moved to the permanent generation of the garbage collector so collections in the children do not write to
+        the pages shared with the parent, and the given locks are replaced with released locks in every child.
+
+        Keywords:
+        `registration_target`: registration target the plugins registered into; its registrations are recorded for `verify_inherited_state`, and its
+            internal lock is reset in the children if it is a `PluginRegistry`; defaults to None.
+        `fork_locks`: iterable of `( owner, attribute_name )` pairs, such as a module and the name of its lock, of the locks to replace in the children;
+            defaults to none.
+        `resolve_lazy_classes`: indicates if the lazy stand-ins are resolved so the children do not import the modules; defaults to `True`.
+        `freeze_gc`: indicates if `gc.freeze` is called; defaults to `True`. `unload_modules` unfreezes the garbage collector again.
+        Other keywords are passed to `import_modules` if the modules were not yet imported.
+
+        Notes:
+            - `gc.freeze` requires Python 3.7 or later, and lock resets require `os.register_at_fork`; either step is skipped where it is not available.
+        """
+
+        if not self.has_loaded_modules:
+            self.import_modules( **kwargs )
+
+        if bool( kwargs.get( "resolve_lazy_classes", True ) ):
+            for lazy_class in self.lazy_classes:
+                lazy_class.resolve()
+
+        registration_target = kwargs.get( "registration_target", None )
+
+        for owner, attribute_name in kwargs.get( "fork_locks", None ) or ():
+            reset_lock_after_fork( owner, attribute_name )
+
+        # the engine's own locks, which another thread may hold while the process forks.
+        reset_lock_after_fork( instrumentation, "_listeners_lock" )
+        if isinstance( registration_target, PluginRegistry ):
+            reset_lock_after_fork( registration_target, "_lock" )
+        if self._bundle is not None:
+            reset_lock_after_fork( self._bundle, "_lock" )
+        for lazy_class in self.lazy_classes:
+            reset_lock_after_fork( lazy_class, "_resolve_lock" )
+
+        loaded_modules: Dict[ str, ModuleType ] = OrderedDict( ( module.__name__, module ) for module in self.loaded_modules )
+        for lazy_class in self.lazy_classes:
+            module = sys.modules.get( get_absolute_module_name( lazy_class.module_name, self.relative_import_package.__name__ ), None )
+            if module is not None:
+                loaded_modules[ module.__name__ ] = module
+
+        self._fork_state = ( os.getpid(), loaded_modules, dict( registration_target.items() ) if registration_target is not None else {} )
+
+        if bool( kwargs.get( "freeze_gc", True ) ) and hasattr( gc, "freeze" ):
+            gc.collect()
+            gc.freeze()
+
+    def verify_inherited_state( self, registration_target: Optional[ Dict[ Any, Any ] ] = None ):
+        """
+        Verifies that the modules and registrations recorded by `prepare_for_fork` are still the objects this process inherited, i.e. that no plugin was
+        imported or registered again since the process was prepared for forking.
+
+        Parameters:
+        `registration_target`: registration target to verify; defaults to None, indicating only the modules are verified.
+
+        Raises:
+        `Exception`: if the importer was not prepared for forking, or listing every module or registration which differs.
+        """
+
+        if self._fork_state is None:
+            raise Exception( "Cannot verify the inherited state; the importer was not prepared for forking." )
+
+        _, loaded_modules, registrations = self._fork_state
+        problems: List[ str ] = []
+
+        for name, module in loaded_modules.items():
+            if sys.modules.get( name, None ) is not module:
+                problems.append( f"module '{ name }' was imported again or removed" )
+
+        if registration_target is not None:
+            for registration_id, registered in registrations.items():
+                if registration_target.get( registration_id, None ) is not registered:
+                    problems.append( f"registration '{ registration_id }' was replaced or removed" )
+
+        if len( problems ) > 0:
+            raise Exception( f"The plugins were not inherited intact: { '; '.join( problems ) }." )
+
+    def unload_modules( self, **kwargs: Dict[ str, Any ] ) -> UnloadResult:
+        """
+        Unloads the plugin modules so their memory can be freed: the classes defined by the modules are deregistered from the given registration targets, the
+        modules and the subpackages containing them are removed from `sys.modules` and from their parent packages, and the `importlib` caches are cleared.
+        Afterwards, the importer can import the modules again.
+
+        Keywords:
+        `registration_targets`: iterable of registration targets to deregister the classes from; defaults to none.
+        `registration_target_lock`: lock controlling access to the registration targets; defaults to None, indicating there is no lock.
+        `verify`: indicates if the modules and classes are verified to be collected, reporting the referrers of those which leaked; defaults to `True`.
+        `referrer_limit`: maximum number of referrers reported per leaked object; defaults to 10.
+
+        Returns:
+        The modules and registrations removed, and the objects which leaked.
+
+        Notes:
+            - Objects which still refer to the modules or classes, such as registry snapshots, instances or lazy stand-ins held elsewhere, keep them alive;
+              they are reported as referrers.
+            - Objects frozen by `gc.freeze`, such as the plugins of an importer prepared with `prepare_for_fork`, are never collected, so the garbage collector
+              is unfrozen first if any object is frozen. In a forked worker, later collections then write to the pages it shares with its parent again.
+        """
+
+        if not self.has_loaded_modules:
+            raise Exception( "Cannot unload modules; modules were not loaded." )
+
+        package_name: str = self.relative_import_package.__name__
+        modules: Dict[ str, ModuleType ] = OrderedDict( ( module.__name__, module ) for module in self.loaded_modules )
+        for lazy_class in self.lazy_classes:
+            module = sys.modules.get( lazy_class.module_name, None )
+            if module is not None:
+                modules.setdefault( module.__name__, module )
+
+        # subpackages between the package and the modules, e.g. namespace packages of subdirectories, belong to the plugins too.
+        for name in list( modules ):
+            parent_name = name.rpartition( "." )[ 0 ]
+            while parent_name.startswith( f"{ package_name }." ) and parent_name not in modules:
+                if parent_name in sys.modules:
+                    modules[ parent_name ] = sys.modules[ parent_name ]
+                parent_name = parent_name.rpartition( "." )[ 0 ]
+
+        module_names: Set[ str ] = set( modules )
+        lazy_classes: Set[ int ] = set( id( lazy_class ) for lazy_class in self.lazy_classes )
+        lazy_class = module = registered = None
+        registration_ids: List[ Any ] = []
+        classes: Dict[ int, Type ] = {}
+
+        def is_plugin( registration_target: Dict[ Any, Any ], registration_id: Any, registered: Any ) -> bool:
+            return id( registered ) in lazy_classes or _get_registered_module_name( registered ) in module_names
+
+        for registration_id, registered in _deregister_classes( kwargs.get( "registration_targets", None ) or (), kwargs.get( "registration_target_lock", None ), is_plugin ):
+            registration_ids.append( registration_id )
+
+            if not isinstance( registered, LazyClass ):
+                classes[ id( registered ) ] = registered
+
+        # deepest modules first, so each module is removed from a parent which is still registered.
+        for name in sorted( modules, key = lambda name: name.count( "." ), reverse = True ):
+            self._drop_module( modules[ name ] )
+
+        if self._bundle is not None:
+            self._bundle.uninstall()
+
+        importlib.invalidate_caches()
+
+        self._loaded_modules = None
+        self._lazy_classes = ()
+        self._import_arguments = None
+        self._module_states = {}
+        self._fork_state = None
+        self._bundle = None
+        self._is_warm_started = False
+
+        if hasattr( gc, "get_freeze_count" ) and gc.get_freeze_count() > 0:
+            gc.unfreeze()
+
+        leaked: List[ LeakedObject ] = []
+
+        if bool( kwargs.get( "verify", True ) ):
+            references = [ ( name, "module", weakref.ref( module ) ) for name, module in modules.items() ]
+            references.extend( ( f"{ class_.__module__ }.{ class_.__qualname__ }", "class", weakref.ref( class_ ) ) for class_ in classes.values() )
+            referrer_limit: int = int( kwargs.get( "referrer_limit", 10 ) )
+            # the local references would keep the last objects alive.
+            modules = classes = lazy_class = module = registered = None
+
+            gc.collect()
+
+            for name, kind, reference in references:
+                referent = reference()
+                if referent is not None:
+                    referrers = [ referrer for referrer in gc.get_referrers( referent ) if not isinstance( referrer, types.FrameType ) ]
+                    leaked.append( LeakedObject( name, kind, tuple( _describe_referrer( referrer, referent ) for referrer in referrers[ :referrer_limit ] ) ) )
+                    del referent, referrers
+
+        return UnloadResult( tuple( sorted( module_names ) ), tuple( registration_ids ), tuple( leaked ) )
+
+    def get_load_cost_report( self ) -> List[ PluginLoadCost ]:
+        """
+        Gets the load costs of the plugin modules, from the events recorded since the modules were imported with `record_load_costs`.
+
+        Returns:
+        List of the load costs of the modules, ranked by total wall clock time, most expensive first.
+
+        Notes:
+            - Costs are inclusive; the cost of importing a module includes the modules it imports which were not yet imported.
+        """
+
+        if self._load_events is None:
+            raise Exception( "Cannot report load costs; the modules were not imported with load costs recorded." )
+
+        costs: Dict[ str, Dict[ str, Any ] ] = OrderedDict()
+
+        for event in self.load_events:
+            if event.kind not in ( IMPORT, RETRY, RELOAD ):
+                continue
+
+            cost = costs.setdefault( event.name, { "import_time": 0.0, "cpu_time": 0.0, "memory_delta": None, "failed_attempt_count": 0, "wasted_time": 0.0, "reload_count": 0, "reload_time": 0.0 } )
+            cost[ "cpu_time" ] += event.cpu_time
+
+            if event.memory_delta is not None:
+                cost[ "memory_delta" ] = ( cost[ "memory_delta" ] or 0 ) + event.memory_delta
+
+            if event.kind == RELOAD:
+                cost[ "reload_count" ] += 1
+                cost[ "reload_time" ] += event.wall_time
+            elif event.succeeded:
+                cost[ "import_time" ] += event.wall_time
+            else:
+                cost[ "failed_attempt_count" ] += 1
+                cost[ "wasted_time" ] += event.wall_time
+
+        report = [ PluginLoadCost( module_name, **cost ) for module_name, cost in costs.items() ]
+        report.sort( key = lambda cost: cost.total_time, reverse = True )
+
+        return report
+
+    @contextmanager
+    def _recording_load_events( self ) -> Iterator[ None ]:
+        if self._load_events is None:
+            yield
+            return
+
+        with instrument( trace_memory = self._trace_memory ) as recorder:
+            try:
+                yield
+            finally:
+                self._load_events.extend( recorder.events )
+
+    @staticmethod
+    def _reload_module( module: ModuleType ) -> ModuleType:
+        with measure( RELOAD, module.__name__ ):
+            module_path: Optional[ str ] = getattr( module, "__file__", None )
+            if module_path is None:
+                return importlib.reload( module )
+
+            return execute_recording_source( module_path, lambda: importlib.reload( module ) )
+
+    def _record_module_states( self ):
+        states: Dict[ str, FileState ] = {}
+
+        for module in self.loaded_modules:
+            module_path: Optional[ str ] = getattr( module, "__file__", None )
+
+            if module_path is not None:
+                try:
+                    states[ module.__name__ ] = get_file_state( module_path, self._module_states.get( module.__name__, None ) )
+                except OSError:
+                    pass
+
+        self._module_states = states
+
+    @staticmethod
+    def _drop_module( module: ModuleType ):
+        """
+        Removes the given module from `sys.modules` and from its parent package.
+        """
+
+        if sys.modules.get( module.__name__, None ) is module:
+            del sys.modules[ module.__name__ ]
+
+        parent_name, _, child_name = module.__name__.rpartition( "." )
+        parent = sys.modules.get( parent_name, None ) if parent_name else None
+        if parent is not None and getattr( parent, child_name, None ) is module:
+            delattr( parent, child_name )
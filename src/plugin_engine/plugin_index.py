@@ -0,0 +1,473 @@
+__version__ = r"1.0.0"
+
+from types import ModuleType
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Type, Union
+
+import importlib
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from .dynamic_import import ModuleCandidate, discover_modules
+from .lazy_registration import LazyClass, RegistrationRecord, _register_stand_ins, scan_registrations
+from .static_analysis import get_absolute_module_name
+
+PACKAGE_SOURCE: str = "package"
+ENTRY_POINT_SOURCE: str = "entry_point"
+
+class PluginSource( NamedTuple ):
+    """
+    A place plugins are discovered in.
+
+    Fields:
+    `kind`: `package` for the module files under an anchor package's directory, or `entry_point` for the entry points of an `importlib.metadata` group.
+    `name`: name of the anchor package, or of the entry point group.
+    `priority`: priority of the source's plugins when their registration IDs collide with another source's; higher wins.
+    """
+
+    kind: str
+    name: str
+    priority: int = 0
+
+def package_source( package: Union[ ModuleType, str ], priority: int = 0 ) -> PluginSource:
+    """
+    Creates a source for the plugin modules under the directory of the given anchor package, which is imported if it is given by name.
+    """
+
+    return PluginSource( PACKAGE_SOURCE, package.__name__ if isinstance( package, ModuleType ) else package, priority )
+
+def entry_point_source( group: str, priority: int = 0 ) -> PluginSource:
+    """
+    Creates a source for the classes advertised by the entry points of the given group, such as `command_executor.commands`. Each entry point's name is
+    the registration ID of the class its value, e.g. `package.module:ClassName`, refers to.
+    """
+
+    return PluginSource( ENTRY_POINT_SOURCE, group, priority )
+
+class IndexedPlugin( NamedTuple ):
+    """
+    A plugin class found in one of the sources of a plugin index, without importing its module.
+
+    Fields:
+    `registration_id`: ID the class is registered with.
+    `module_name`: absolute name of the class' module.
+    `qualname`: qualified name of the class.
+    `enabled`: indicates if the class is registered; None indicates it is only known once the module is imported.
+    `parent_class_names`: names of the class' bases, as written in the source; empty for entry points.
+    `source`: source the class was found in.
+    """
+
+    registration_id: Any
+    module_name: str
+    qualname: str
+    enabled: Optional[ bool ]
+    parent_class_names: Tuple[ str, ... ]
+    source: PluginSource
+
+    def to_record( self ) -> RegistrationRecord:
+        """
+        Converts the plugin to a registration record, e.g. to write a registration manifest.
+        """
+
+        return RegistrationRecord( self.registration_id, self.module_name, self.qualname, self.enabled, self.parent_class_names )
+
+class PluginCollision( NamedTuple ):
+    """
+    Plugin classes from different modules or sources which use the same registration ID.
+
+    Fields:
+    `registration_id`: the ID.
+    `plugin`: the plugin which is registered with the ID.
+    `shadowed`: the plugins which are not registered, highest priority first.
+    """
+
+    registration_id: Any
+    plugin: IndexedPlugin
+    shadowed: Tuple[ IndexedPlugin, ... ]
+
+def _get_distribution_fingerprint() -> List[ List[ Any ] ]:
+    """
+    Gets the modification times of the `sys.path` entries; installing or removing a distribution changes the modification time of the directory its
+    metadata is written to.
+    """
+
+    fingerprint: List[ List[ Any ] ] = []
+
+    for path in sys.path:
+        path = os.path.abspath( path ) if path else os.getcwd()
+
+        try:
+            fingerprint.append( [ path, os.stat( path ).st_mtime_ns ] )
+        except OSError:
+            fingerprint.append( [ path, None ] )
+
+    return fingerprint
+
+def _read_entry_points( groups: Iterable[ str ] ) -> Dict[ str, List[ Tuple[ str, str ] ] ]:
+    try:
+        import importlib.metadata as metadata
+    except ImportError:
+        try:
+            import importlib_metadata as metadata
+        except ImportError:
+            raise ImportError( "Entry point sources require Python 3.8 or later, or the 'importlib_metadata' package." )
+
+    all_entry_points = metadata.entry_points()
+    entry_points: Dict[ str, List[ Tuple[ str, str ] ] ] = {}
+
+    for group in groups:
+        if hasattr( all_entry_points, "select" ):
+            group_entry_points = all_entry_points.select( group = group )
+        else:
+            group_entry_points = all_entry_points.get( group, () )
+
+        # a distribution found earlier on `sys.path` takes precedence over others advertising the same name, as its modules would be imported.
+        by_name: Dict[ str, str ] = OrderedDict()
+        for entry_point in group_entry_points:
+            by_name.setdefault( entry_point.name, entry_point.value )
+
+        entry_points[ group ] = list( by_name.items() )
+
+    return entry_points
+
+class EntryPointCache( object ):
+    """
+    Cache of the entry points of the installed distributions. Reading the entry points scans the metadata of every distribution on `sys.path`; the cache
+    reads it once and reuses it while no `sys.path` entry changed, optionally across processes through a JSON file.
+    """
+
+    FORMAT_VERSION: int = 1
+
+    def __init__( self, cache_path: Union[ str, Path, None ] = None ):
+        """
+        Parameters:
+        `cache_path`: path of a JSON file the entry points are cached in; defaults to None, indicating they are only cached in memory.
+        """
+
+        self._cache_path: Optional[ Path ] = Path( cache_path ) if cache_path is not None else None
+        self._lock: threading.Lock = threading.Lock()
+        self._fingerprint: Optional[ List[ List[ Any ] ] ] = None
+        self._groups: Dict[ str, List[ Tuple[ str, str ] ] ] = {}
+        self._is_loaded: bool = False
+        self._read_count: int = 0
+
+    @property
+    def read_count( self ) -> int:
+        """
+        The number of times the distributions' metadata was read, i.e. the entry points were not served from the cache.
+        """
+
+        return self._read_count
+
+    def get_entry_points( self, group: str ) -> List[ Tuple[ str, str ] ]:
+        """
+        Gets the entry points of the given group.
+
+        Returns:
+        List of the names and values of the entry points, such as `( "Sum", "plugins.sum_command:SumCommand" )`.
+        """
+
+        fingerprint = _get_distribution_fingerprint()
+
+        with self._lock:
+            if not self._is_loaded:
+                self._load()
+
+            if self._fingerprint != fingerprint:
+                self._groups = {}
+                self._fingerprint = fingerprint
+
+            if group not in self._groups:
+                # every group read before is refreshed too, so the cache stays consistent with a single fingerprint.
+                self._groups.update( _read_entry_points( list( self._groups ) + [ group ] ) )
+                self._read_count += 1
+
+                if self._cache_path is not None:
+                    self._save()
+
+            return list( self._groups[ group ] )
+
+    def _load( self ):
+        self._is_loaded = True
+
+        if self._cache_path is None:
+            return
+
+        try:
+            with open( self._cache_path, "r", encoding = "utf-8" ) as file:
+                content = json.load( file )
+        except ( OSError, ValueError ):
+            return
+
+        if isinstance( content, dict ) and content.get( "version", None ) == self.FORMAT_VERSION:
+            self._fingerprint = content.get( "fingerprint", None )
+            self._groups = { group: [ tuple( entry_point ) for entry_point in entry_points ] for group, entry_points in content.get( "groups", {} ).items() }
+
+    def _save( self ):
+        content = {
+            "version": self.FORMAT_VERSION,
+            "fingerprint": self._fingerprint,
+            "groups": self._groups,
+        }
+
+        temporary_path = f"{ os.fspath( self._cache_path ) }.{ os.getpid() }.tmp"
+        try:
+            with open( temporary_path, "w", encoding = "utf-8" ) as file:
+                json.dump( content, file, indent = 1 )
+            os.replace( temporary_path, self._cache_path )
+        except OSError:
+            pass
+
+# shared by the indexes built without an explicit cache, so a process reads the entry points once.
+_default_entry_point_cache: EntryPointCache = EntryPointCache()
+
+class PluginIndex( object ):
+    """
+    Deduplicated index of the plugin classes of several sources, keyed by registration ID. When classes from different modules use the same ID, the class
+    from the source with the highest priority is indexed, falling back to the order of the sources and then to discovery order; the others are shadowed.
+    """
+
+    def __init__( self, sources: Iterable[ PluginSource ], plugins: Iterable[ IndexedPlugin ], collisions: Iterable[ PluginCollision ] ):
+        self._sources: Tuple[ PluginSource, ... ] = tuple( sources )
+        self._plugins: Dict[ Any, IndexedPlugin ] = OrderedDict( ( plugin.registration_id, plugin ) for plugin in plugins )
+        self._collisions: Tuple[ PluginCollision, ... ] = tuple( collisions )
+
+    @property
+    def sources( self ) -> Tuple[ PluginSource, ... ]:
+        """
+        The sources the index was built from.
+        """
+
+        return self._sources
+
+    @property
+    def plugins( self ) -> Tuple[ IndexedPlugin, ... ]:
+        """
+        The indexed plugins, highest priority first.
+        """
+
+        return tuple( self._plugins.values() )
+
+    @property
+    def collisions( self ) -> Tuple[ PluginCollision, ... ]:
+        """
+        The registration IDs used by more than one plugin, with the plugins they resolved to.
+        """
+
+        return self._collisions
+
+    @property
+    def module_names( self ) -> Tuple[ str, ... ]:
+        """
+        The absolute names of the modules defining the indexed plugins, highest priority first.
+        """
+
+        return tuple( OrderedDict.fromkeys( plugin.module_name for plugin in self._plugins.values() ) )
+
+    @property
+    def shadowed_module_names( self ) -> Tuple[ str, ... ]:
+        """
+        The absolute names of the modules defining shadowed plugins and no indexed plugin, which must not be imported, as their registration decorators
+        would register the shadowed classes with IDs which are already in use.
+        """
+
+        module_names = set( plugin.module_name for plugin in self._plugins.values() )
+        return tuple( OrderedDict.fromkeys( plugin.module_name for collision in self._collisions for plugin in collision.shadowed if plugin.module_name not in module_names ) )
+
+    def filter_candidates( self, candidates: Iterable[ ModuleCandidate ], relative_import_package_name: Optional[ str ] ) -> List[ ModuleCandidate ]:
+        """
+        Gets the given candidates whose modules are not shadowed, in order, so importing them does not register a shadowed plugin. Modules the index knows
+        nothing about, such as helpers, are kept.
+
+        Raises:
+        `ValueError`: if a candidate's module defines both an indexed and a shadowed plugin, so it can neither be imported nor skipped.
+        """
+
+        shadowed_module_names = set( self.shadowed_module_names )
+        mixed_module_names = set( plugin.module_name for collision in self._collisions for plugin in collision.shadowed ).difference( shadowed_module_names )
+        kept: List[ ModuleCandidate ] = []
+        conflicts: List[ str ] = []
+
+        for candidate in candidates:
+            module_name = get_absolute_module_name( candidate.module_name, relative_import_package_name )
+
+            if module_name in mixed_module_names:
+                conflicts.append( module_name )
+            elif module_name not in shadowed_module_names:
+                kept.append( candidate )
+
+        if len( conflicts ) > 0:
+            raise ValueError( f"The following modules define both indexed and shadowed plugins and cannot be imported: { ', '.join( conflicts ) }" )
+
+        return kept
+
+    def __len__( self ) -> int:
+        return len( self._plugins )
+
+    def __iter__( self ) -> Iterator[ Any ]:
+        return iter( self._plugins )
+
+    def __contains__( self, registration_id: Any ) -> bool:
+        return registration_id in self._plugins
+
+    def __getitem__( self, registration_id: Any ) -> IndexedPlugin:
+        return self._plugins[ registration_id ]
+
+    def register_lazy_classes( self, registration_target: Dict[ Any, Type ], **kwargs: Dict[ str, Any ] ) -> List[ LazyClass ]:
+        """
+        Registers stand-ins for the indexed plugins into the given registration target; each plugin's module is imported when its class is first resolved.
+
+        Keywords:
+        `registration_target_lock`: lock controlling access to the registration target; defaults to None, indicating there is no lock.
+
+        Returns:
+        List of the registered stand-ins.
+
+        Notes:
+            - A module which defines both an indexed and a shadowed plugin cannot be imported, as its registration decorator would register the shadowed
+              class with an ID which is already in use.
+        """
+
+        if registration_target is None:
+            raise ValueError( "Registration target dictionary cannot be None." )
+
+        lock = kwargs.get( "registration_target_lock", None )
+        lazy_classes: List[ LazyClass ] = [
+            LazyClass( plugin.registration_id, plugin.module_name, plugin.qualname, registration_target = registration_target, registration_target_lock = lock,
+                       parent_class_names = plugin.parent_class_names, requires_registration = plugin.source.kind != ENTRY_POINT_SOURCE )
+            for plugin in self._plugins.values()
+        ]
+
+        _register_stand_ins( lazy_classes, registration_target, lock )
+
+        return lazy_classes
+
+    def import_modules( self, registration_target: Dict[ Any, Type ], **kwargs: Dict[ str, Any ] ) -> List[ ModuleType ]:
+        """
+        Registers stand-ins for the indexed plugins like `register_lazy_classes`, then resolves them, importing the modules of the indexed plugins and
+        registering their classes. Modules whose plugins were all shadowed are not imported.
+
+        Returns:
+        List of the imported modules, highest priority first.
+        """
+
+        for lazy_class in self.register_lazy_classes( registration_target, **kwargs ):
+            lazy_class.resolve()
+
+        if len( self._plugins ) > 0:
+            importlib.invalidate_caches()
+
+        return [ sys.modules[ name ] for name in self.module_names ]
+
+def _discover_package_plugins( source: PluginSource, module_file_ext: List[ str ], decorator_names: List[ str ], **kwargs: Dict[ str, Any ] ) -> List[ IndexedPlugin ]:
+    package = importlib.import_module( source.name )
+    package_path: Optional[ str ] = getattr( package, "__file__", None )
+    if package_path is None:
+        raise ValueError( f"'{ source.name }' anchor package has no directory to discover plugins in." )
+
+    candidates = discover_modules( Path( package_path ).parent, *module_file_ext, **kwargs )
+
+    return [ IndexedPlugin( record.registration_id, get_absolute_module_name( record.module_name, source.name ), record.qualname, record.enabled,
+                            record.parent_class_names, source ) for record in scan_registrations( candidates, decorator_names ) ]
+
+def _discover_entry_point_plugins( source: PluginSource, entry_point_cache: EntryPointCache ) -> List[ IndexedPlugin ]:
+    plugins: List[ IndexedPlugin ] = []
+
+    for name, value in entry_point_cache.get_entry_points( source.name ):
+        module_name, _, qualname = value.partition( ":" )
+        # extras, e.g. `package.module:ClassName [extra]`, do not affect which class is referred to.
+        qualname = qualname.split( "[", 1 )[ 0 ].strip()
+        module_name = module_name.strip()
+
+        if not module_name or not qualname:
+            raise ValueError( f"'{ name }' entry point of the '{ source.name }' group does not refer to a class: '{ value }'" )
+
+        plugins.append( IndexedPlugin( name, module_name, qualname, True, (), source ) )
+
+    return plugins
+
+def build_plugin_index( sources: Iterable[ PluginSource ], **kwargs: Dict[ str, Any ] ) -> PluginIndex:
+    """
+    Discovers the plugin classes of the given sources without importing their modules, and merges them into one index.
+
+    Parameters:
+    `sources`: sources to discover plugins in, created with `package_source` and `entry_point_source`; earlier sources win ID collisions between sources of
+        the same priority.
+
+    Keywords:
+    `registration_decorators`: names of the registration decorators whose decorated classes are found by static analysis in package sources; required if
+        there are package sources.
+    `module_file_ext`: iterable of file extensions of the module files of package sources; defaults to `.py`.
+    `entry_point_cache`: `EntryPointCache` the entry points are read through; defaults to a cache shared by the process.
+    `on_collision`: `priority` to resolve ID collisions by priority, or `error` to raise an exception instead; defaults to `priority`.
+    Other keywords, such as `recursive`, are passed to `dynamic_import.discover_modules` for package sources.
+
+    Returns:
+    The index.
+
+    Raises:
+    `ValueError`: if a source is invalid, or if collisions are errors and there is one.
+
+    Notes:
+        - A class reachable through several sources, e.g. through a nested anchor package or through an entry point referring to a module of an anchor
+          package, is indexed once, with the highest priority source; this is not a collision.
+        - Statically disabled classes are not indexed, so they do not shadow enabled classes.
+    """
+
+    sources = list( sources )
+    module_file_ext = kwargs.get( "module_file_ext", None )
+    if module_file_ext is None:
+        module_file_ext = [ ".py" ]
+    module_file_ext = list( module_file_ext )
+
+    decorator_names = kwargs.get( "registration_decorators", None )
+    if isinstance( decorator_names, str ):
+        decorator_names = [ decorator_names ]
+
+    on_collision: str = kwargs.get( "on_collision", "priority" )
+    if on_collision not in ( "priority", "error" ):
+        raise ValueError( f"Invalid collision handling: { on_collision }" )
+
+    entry_point_cache: Optional[ EntryPointCache ] = kwargs.get( "entry_point_cache", None )
+    if entry_point_cache is None:
+        entry_point_cache = _default_entry_point_cache
+
+    discovery_kwargs: Dict[ str, Any ] = { name: value for name, value in kwargs.items() if name not in ( "registration_decorators", "module_file_ext", "entry_point_cache", "on_collision" ) }
+
+    discovered: List[ IndexedPlugin ] = []
+    for source in sources:
+        if source.kind == PACKAGE_SOURCE:
+            if decorator_names is None:
+                raise ValueError( "Registration decorators are required to discover the plugins of package sources." )
+
+            discovered.extend( _discover_package_plugins( source, module_file_ext, list( decorator_names ), **discovery_kwargs ) )
+        elif source.kind == ENTRY_POINT_SOURCE:
+            discovered.extend( _discover_entry_point_plugins( source, entry_point_cache ) )
+        else:
+            raise ValueError( f"Invalid plugin source kind: { source.kind }" )
+
+    # stable, so plugins of the same priority keep source and discovery order.
+    discovered.sort( key = lambda plugin: -plugin.source.priority )
+
+    plugins: Dict[ Any, IndexedPlugin ] = OrderedDict()
+    shadowed: Dict[ Any, List[ IndexedPlugin ] ] = OrderedDict()
+
+    for plugin in discovered:
+        if plugin.enabled is False:
+            continue
+
+        indexed = plugins.get( plugin.registration_id, None )
+        if indexed is None:
+            plugins[ plugin.registration_id ] = plugin
+        elif indexed.module_name != plugin.module_name or indexed.qualname != plugin.qualname:
+            shadowed.setdefault( plugin.registration_id, [] ).append( plugin )
+
+    collisions: List[ PluginCollision ] = [ PluginCollision( registration_id, plugins[ registration_id ], tuple( plugins_ ) ) for registration_id, plugins_ in shadowed.items() ]
+
+    if on_collision == "error" and len( collisions ) > 0:
+        descriptions = [ f"'{ c.registration_id }' ({ ', '.join( f'{ p.module_name }.{ p.qualname }' for p in ( c.plugin, ) + c.shadowed ) })" for c in collisions ]
+        raise ValueError( f"The following registration IDs are used by more than one plugin: { '; '.join( descriptions ) }" )
+
+    return PluginIndex( sources, plugins.values(), collisions )
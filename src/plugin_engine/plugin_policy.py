@@ -0,0 +1,256 @@
+__version__ = r"1.0.0"
+
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple, Union
+
+import fnmatch
+import json
+import sys
+import threading
+from pathlib import Path
+from .dynamic_import import ModuleCandidate
+from .plugin_catalog import CatalogEntry, describe_candidates
+from .static_analysis import get_absolute_module_name
+
+if TYPE_CHECKING:
+    from .plugin_importer import PluginLoadCost
+
+STATIC_REASON: str = "static"
+POLICY_REASON: str = "policy"
+
+class PluginPolicy( object ):
+    """
+    Deployment policy which disables plugins without changing their source, e.g. per tenant. Patterns are `fnmatch` patterns matched against absolute module
+    names and registration IDs; a plugin matching an enabled pattern is not disabled by the policy, even if it also matches a disabled pattern.
+    """
+
+    def __init__( self, disabled: Iterable[ str ] = (), enabled: Iterable[ str ] = () ):
+        """
+        Parameters:
+        `disabled`: patterns of the modules and registration IDs which are disabled.
+        `enabled`: patterns of the modules and registration IDs which are exempt from the disabled patterns.
+
+        Notes:
+            - A policy cannot enable a class which is registered with `enabled = False`, as its registration decorator does not register it.
+        """
+
+        self._disabled: Tuple[ str, ... ] = tuple( disabled )
+        self._enabled: Tuple[ str, ... ] = tuple( enabled )
+
+    @property
+    def disabled( self ) -> Tuple[ str, ... ]:
+        """
+        The patterns of the modules and registration IDs which are disabled.
+        """
+
+        return self._disabled
+
+    @property
+    def enabled( self ) -> Tuple[ str, ... ]:
+        """
+        The patterns of the modules and registration IDs which are exempt from the disabled patterns.
+        """
+
+        return self._enabled
+
+    def is_disabled( self, name: str ) -> bool:
+        """
+        Indicates if the given absolute module name or registration ID is disabled by the policy.
+        """
+
+        return any( fnmatch.fnmatchcase( name, pattern ) for pattern in self._disabled ) and not any( fnmatch.fnmatchcase( name, pattern ) for pattern in self._enabled )
+
+def read_plugin_policy( policy_path: Union[ str, Path ] ) -> PluginPolicy:
+    """
+    Reads a plugin policy file.
+
+    Parameters:
+    `policy_path`: path of the policy file; a JSON object whose optional `disabled` and `enabled` members are lists of patterns.
+
+    Raises:
+    `ValueError`: if the file is not a valid policy.
+    """
+
+    with open( policy_path, "r", encoding = "utf-8" ) as policy_file:
+        content = json.load( policy_file )
+
+    if not isinstance( content, dict ):
+        raise ValueError( f"Invalid plugin policy '{ policy_path }': not an object." )
+
+    patterns: Dict[ str, List[ str ] ] = {}
+    for member in ( "disabled", "enabled" ):
+        patterns[ member ] = content.get( member, [] )
+
+        if not isinstance( patterns[ member ], list ) or not all( isinstance( pattern, str ) for pattern in patterns[ member ] ):
+            raise ValueError( f"Invalid plugin policy '{ policy_path }': '{ member }' is not a list of patterns." )
+
+    return PluginPolicy( patterns[ "disabled" ], patterns[ "enabled" ] )
+
+class SkippedModule( NamedTuple ):
+    """
+    A plugin module which was not imported because it would not have registered anything.
+
+    Fields:
+    `module_name`: absolute name of the module.
+    `reason`: `static` if every class the module registers is registered with `enabled = False`, or `policy` if the policy disabled the module or the rest
+        of its classes.
+    `registration_ids`: IDs of the classes the module registers, found by static analysis.
+    """
+
+    module_name: str
+    reason: str
+    registration_ids: Tuple[ str, ... ]
+
+class SkipReport( NamedTuple ):
+    """
+    The import time avoided by skipping disabled plugin modules, estimated from the load costs of a previous run which imported them.
+
+    Fields:
+    `skipped`: the skipped modules.
+    `avoided_time`: wall clock time the previous run spent importing the skipped modules, in seconds.
+    `unmeasured`: names of the skipped modules which have no previous load cost, whose avoided time is unknown.
+    `imported_anyway`: names of the skipped modules which were imported regardless, e.g. by a module which imports them; their time was not avoided.
+    """
+
+    skipped: Tuple[ SkippedModule, ... ]
+    avoided_time: float
+    unmeasured: Tuple[ str, ... ]
+    imported_anyway: Tuple[ str, ... ]
+
+class DisabledPluginFilter( object ):
+    """
+    Recognizes disabled plugin modules by static analysis of their registration decorator calls and by an optional policy, so they are not imported. A
+    module is skipped only if it registers at least one class and every one of its classes is disabled; modules which register nothing, such as helpers, and
+    modules which cannot be parsed are always imported.
+    """
+
+    def __init__( self, **kwargs: Dict[ str, Any ] ):
+        """
+        Keywords:
+        `registration_decorators`: names of the registration decorators whose `enabled` keyword is inspected; required.
+        `policy`: `PluginPolicy`, or path to a policy file, disabling further modules and registration IDs; defaults to None, indicating only statically
+            disabled modules are skipped.
+        `cache_path`: path of a JSON file the static analysis is cached in, as by `plugin_catalog.build_catalog`; defaults to None.
+
+        Notes:
+            - Registration IDs are the classes' qualified names, matching the default IDs of `register_class`.
+        """
+
+        decorator_names = kwargs.get( "registration_decorators", None )
+        if decorator_names is None:
+            raise ValueError( "Registration decorators are required to recognize disabled plugins." )
+        elif isinstance( decorator_names, str ):
+            decorator_names = [ decorator_names ]
+
+        policy = kwargs.get( "policy", None )
+        if policy is not None and not isinstance( policy, PluginPolicy ):
+            policy = read_plugin_policy( policy )
+
+        self._decorator_names: List[ str ] = list( decorator_names )
+        self._policy: Optional[ PluginPolicy ] = policy
+        self._cache_path = kwargs.get( "cache_path", None )
+        self._lock: threading.Lock = threading.Lock()
+        self._skipped: Dict[ str, SkippedModule ] = {}
+
+    @property
+    def policy( self ) -> Optional[ PluginPolicy ]:
+        """
+        The policy, if any.
+        """
+
+        return self._policy
+
+    @property
+    def skipped( self ) -> Tuple[ SkippedModule, ... ]:
+        """
+        The modules skipped by the latest filtering of each module.
+        """
+
+        with self._lock:
+            return tuple( self._skipped.values() )
+
+    def get_skip_reason( self, entry: CatalogEntry ) -> Optional[ str ]:
+        """
+        Gets the reason the module of the given catalog entry is skipped.
+
+        Returns:
+        `static` or `policy`, or None if the module is imported.
+        """
+
+        if not entry.is_parsed or len( entry.registrations ) == 0:
+            return None
+        elif entry.is_disabled:
+            return STATIC_REASON
+        elif self._policy is None:
+            return None
+        elif self._policy.is_disabled( entry.module_name ):
+            return POLICY_REASON
+        elif all( registration.enabled is False or self._policy.is_disabled( registration.qualname ) for registration in entry.registrations ):
+            return POLICY_REASON
+        else:
+            return None
+
+    def filter_candidates( self, candidates: Iterable[ ModuleCandidate ], relative_import_package_name: Optional[ str ] ) -> List[ ModuleCandidate ]:
+        """
+        Gets the given candidates which are not disabled, in order, recording the skipped ones.
+        """
+
+        candidates_by_name: Dict[ str, ModuleCandidate ] = { get_absolute_module_name( c.module_name, relative_import_package_name ): c for c in candidates }
+        kept: List[ ModuleCandidate ] = []
+        skipped: Dict[ str, Optional[ SkippedModule ] ] = {}
+
+        for entry in describe_candidates( candidates_by_name.values(), relative_import_package_name, self._decorator_names, self._cache_path ):
+            reason = self.get_skip_reason( entry )
+
+            if reason is None:
+                kept.append( candidates_by_name[ entry.module_name ] )
+                skipped[ entry.module_name ] = None
+            else:
+                skipped[ entry.module_name ] = SkippedModule( entry.module_name, reason, tuple( registration.qualname for registration in entry.registrations ) )
+
+        with self._lock:
+            for module_name, skipped_module in skipped.items():
+                if skipped_module is None:
+                    self._skipped.pop( module_name, None )
+                else:
+                    self._skipped[ module_name ] = skipped_module
+
+        return kept
+
+    def get_report( self, previous_load_costs: Union[ Iterable[ "PluginLoadCost" ], Mapping[ str, float ], str, Path, None ] = None ) -> SkipReport:
+        """
+        Gets the import time avoided by skipping the disabled modules.
+
+        Parameters:
+        `previous_load_costs`: load costs of a previous run which imported the modules: a `PluginImporter.get_load_cost_report` result, a path to a file
+            written by `plugin_importer.write_load_cost_report`, or a dictionary of absolute module names to import times in seconds; defaults to None,
+            indicating no module was measured.
+
+        Notes:
+            - Import times are inclusive, so a skipped module's time includes the modules only it imported, such as heavy third-party dependencies.
+        """
+
+        if isinstance( previous_load_costs, ( str, Path ) ):
+            from .plugin_importer import read_load_cost_report
+            previous_load_costs = read_load_cost_report( previous_load_costs )
+
+        if previous_load_costs is None:
+            import_times: Mapping[ str, float ] = {}
+        elif isinstance( previous_load_costs, Mapping ):
+            import_times = previous_load_costs
+        else:
+            import_times = { cost.module_name: cost.import_time + cost.wasted_time for cost in previous_load_costs }
+
+        skipped = self.skipped
+        avoided_time = 0.0
+        unmeasured: List[ str ] = []
+        imported_anyway: List[ str ] = []
+
+        for skipped_module in skipped:
+            if skipped_module.module_name in sys.modules:
+                imported_anyway.append( skipped_module.module_name )
+            elif skipped_module.module_name in import_times:
+                avoided_time += import_times[ skipped_module.module_name ]
+            else:
+                unmeasured.append( skipped_module.module_name )
+
+        return SkipReport( skipped, avoided_time, tuple( unmeasured ), tuple( imported_anyway ) )
@@ -0,0 +1,380 @@
+__version__ = r"1.0.0"
+
+from collections.abc import Mapping, MutableMapping
+from typing import Any, Callable, Dict, FrozenSet, Hashable, Iterable, Iterator, List, Optional, Set, Tuple, Type
+
+import threading
+
+_PARENT_CLASS_INDEX: str = "parent_class"
+_MODULE_INDEX: str = "module"
+_NAME_INDEX: str = "name"
+_TAG_INDEX: str = "tag"
+
+class _RegistryState( object ):
+    """
+    The registered classes and their indexes. A state published by a copy-on-write registry is never mutated again.
+    """
+
+    __slots__ = ( "classes", "tags", "indexes", "_owned_index_entries" )
+
+    def __init__( self ):
+        self.classes: Dict[ Any, Type ] = {}
+        self.tags: Dict[ Any, FrozenSet[ Hashable ] ] = {}
+        self.indexes: Dict[ str, Dict[ Hashable, Dict[ Any, None ] ] ] = { _PARENT_CLASS_INDEX: {}, _MODULE_INDEX: {}, _NAME_INDEX: {}, _TAG_INDEX: {} }
+        # index entries shared with another state are copied before they are first changed; None indicates every entry is owned.
+        self._owned_index_entries: Optional[ Set[ Tuple[ str, Hashable ] ] ] = None
+
+    def copy( self, share_index_entries: bool = True ) -> "_RegistryState":
+        """
+        Creates a copy whose changes do not affect this state.
+
+        Parameters:
+        `share_index_entries`: indicates if the index entries are shared with the copy until the copy changes them; must be `False` if this state is changed
+            in place afterwards.
+        """
+
+        state = _RegistryState()
+        state.classes = dict( self.classes )
+        state.tags = dict( self.tags )
+
+        if share_index_entries:
+            state.indexes = { index_name: dict( index ) for index_name, index in self.indexes.items() }
+            state._owned_index_entries = set()
+        else:
+            state.indexes = { index_name: { key: dict( registration_ids ) for key, registration_ids in index.items() } for index_name, index in self.indexes.items() }
+
+        return state
+
+    def add( self, registration_id: Any, class_: Type, tags: FrozenSet[ Hashable ] ):
+        if registration_id in self.classes:
+            self.remove( registration_id )
+
+        self.classes[ registration_id ] = class_
+        self.tags[ registration_id ] = tags
+
+        for index_name, key in self._get_index_keys( registration_id ):
+            self._get_index_entry_for_update( index_name, key )[ registration_id ] = None
+
+    def remove( self, registration_id: Any ):
+        for index_name, key in self._get_index_keys( registration_id ):
+            registration_ids = self._get_index_entry_for_update( index_name, key )
+            registration_ids.pop( registration_id, None )
+
+            if len( registration_ids ) == 0:
+                del self.indexes[ index_name ][ key ]
+
+                # the key may be a class, which must not be kept alive once it is deregistered.
+                if self._owned_index_entries is not None:
+                    self._owned_index_entries.discard( ( index_name, key ) )
+
+        del self.classes[ registration_id ]
+        del self.tags[ registration_id ]
+
+    def get_indexed( self, index_name: str, key: Hashable ) -> Dict[ Any, Type ]:
+        return { registration_id: self.classes[ registration_id ] for registration_id in self.indexes[ index_name ].get( key, () ) }
+
+    def _get_index_entry_for_update( self, index_name: str, key: Hashable ) -> Dict[ Any, None ]:
+        index = self.indexes[ index_name ]
+        registration_ids = index.get( key, None )
+
+        if registration_ids is None:
+            registration_ids = index[ key ] = {}
+            if self._owned_index_entries is not None:
+                self._owned_index_entries.add( ( index_name, key ) )
+        elif self._owned_index_entries is not None and ( index_name, key ) not in self._owned_index_entries:
+            registration_ids = index[ key ] = dict( registration_ids )
+            self._owned_index_entries.add( ( index_name, key ) )
+
+        return registration_ids
+
+    def _get_index_keys( self, registration_id: Any ) -> List[ Tuple[ str, Hashable ] ]:
+        class_ = self.classes[ registration_id ]
+        keys: List[ Tuple[ str, Hashable ] ] = []
+
+        if isinstance( class_, type ):
+            for parent_class in class_.__mro__:
+                if parent_class is not object:
+                    keys.append( ( _PARENT_CLASS_INDEX, parent_class ) )
+
+            keys.append( ( _MODULE_INDEX, class_.__module__ ) )
+            keys.append( ( _NAME_INDEX, class_.__name__ ) )
+        else:
+            # stand-ins are indexed by the module and name of the class they stand in for.
+            module_name = getattr( class_, "module_name", None )
+            qualname = getattr( class_, "qualname", None )
+
+            if module_name is not None:
+                keys.append( ( _MODULE_INDEX, module_name ) )
+            if qualname is not None:
+                keys.append( ( _NAME_INDEX, qualname.rsplit( ".", 1 )[ -1 ] ) )
+
+        for tag in self.tags[ registration_id ]:
+            keys.append( ( _TAG_INDEX, tag ) )
+
+        return keys
+
+class RegistrySnapshot( Mapping ):
+    """
+    Immutable view of a registry at a point in time, supporting the same indexed lookups as the registry.
+    """
+
+    def __init__( self, state: _RegistryState ):
+        self._state: _RegistryState = state
+
+    def __getitem__( self, registration_id: Any ) -> Type:
+        return self._state.classes[ registration_id ]
+
+    def __iter__( self ) -> Iterator[ Any ]:
+        return iter( self._state.classes )
+
+    def __len__( self ) -> int:
+        return len( self._state.classes )
+
+    def __contains__( self, registration_id: Any ) -> bool:
+        return registration_id in self._state.classes
+
+    def __repr__( self ) -> str:
+        return f"{ type( self ).__name__ }({ self._state.classes!r})"
+
+    def get_tags( self, registration_id: Any ) -> FrozenSet[ Hashable ]:
+        """
+        Gets the tags of the class registered with the given ID.
+        """
+
+        return self._state.tags[ registration_id ]
+
+    def get_by_parent_class( self, parent_class: Type ) -> Dict[ Any, Type ]:
+        """
+        Gets the registered classes which have the given class along their MRO, including the given class itself.
+
+        Returns:
+        Dictionary of the matching registration IDs to classes, in registration order.
+        """
+
+        return self._state.get_indexed( _PARENT_CLASS_INDEX, parent_class )
+
+    def get_by_module( self, module_name: str ) -> Dict[ Any, Type ]:
+        """
+        Gets the registered classes defined in the module with the given name.
+
+        Returns:
+        Dictionary of the matching registration IDs to classes, in registration order.
+        """
+
+        return self._state.get_indexed( _MODULE_INDEX, module_name )
+
+    def get_by_name( self, name: str ) -> Dict[ Any, Type ]:
+        """
+        Gets the registered classes with the given class name.
+
+        Returns:
+        Dictionary of the matching registration IDs to classes, in registration order.
+        """
+
+        return self._state.get_indexed( _NAME_INDEX, name )
+
+    def get_by_tag( self, tag: Hashable ) -> Dict[ Any, Type ]:
+        """
+        Gets the registered classes which have the given tag.
+
+        Returns:
+        Dictionary of the matching registration IDs to classes, in registration order.
+        """
+
+        return self._state.get_indexed( _TAG_INDEX, tag )
+
+class PluginRegistry( MutableMapping ):
+    """
+    Registration target which maps registration IDs to classes and keeps secondary indexes of the registered classes by each class along their MRO, by
+    module, by class name and by user-supplied tags. Index lookups cost O(result) rather than O(registry).
+
+    The registry can be used anywhere a registration target dictionary is accepted; `register_class` additionally records the tags given to it.
+
+    In copy-on-write mode, each change builds a new immutable state which is published with a single reference assignment; readers never take a lock, and
+    `snapshot` costs O(1). Otherwise, changes are made in place and index lookups and snapshots take the registry's lock.
+
+    Notes:
+        - `LazyClass` stand-ins are indexed by module and class name, and are indexed by parent class once they are replaced by the class they stand in for.
+    """
+
+    def __init__( self, classes: Optional[ Mapping[ Any, Type ] ] = None, **kwargs: Dict[ str, Any ] ):
+        """
+        Parameters:
+        `classes`: mapping of registration IDs to classes to initially register; defaults to None, indicating the registry starts empty.
+
+        Keywords:
+        `copy_on_write`: indicates if changes are published as new immutable states so reads are lock-free; defaults to `False`.
+        """
+
+        self._copy_on_write: bool = bool( kwargs.get( "copy_on_write", False ) )
+        self._state: _RegistryState = _RegistryState()
+        self._lock: threading.RLock = threading.RLock()
+
+        if classes is not None:
+            def add_classes( state: _RegistryState ):
+                for registration_id, class_ in classes.items():
+                    state.add( registration_id, _verify_class( class_ ), frozenset() )
+
+            self._update( add_classes )
+
+    @property
+    def is_copy_on_write( self ) -> bool:
+        """
+        Indicates if changes are published as new immutable states.
+        """
+
+        return self._copy_on_write
+
+    def __getitem__( self, registration_id: Any ) -> Type:
+        return self._state.classes[ registration_id ]
+
+    def __setitem__( self, registration_id: Any, class_: Type ):
+        self._update( lambda state: state.add( registration_id, _verify_class( class_ ), state.tags.get( registration_id, frozenset() ) ) )
+
+    def __delitem__( self, registration_id: Any ):
+        def remove( state: _RegistryState ):
+            if registration_id not in state.classes:
+                raise KeyError( registration_id )
+
+            state.remove( registration_id )
+
+        self._update( remove )
+
+    def __iter__( self ) -> Iterator[ Any ]:
+        # iterating a copy-on-write state is safe as the state is never changed; otherwise, the keys are copied.
+        state = self._state
+        return iter( state.classes ) if self.is_copy_on_write else iter( list( state.classes ) )
+
+    def __len__( self ) -> int:
+        return len( self._state.classes )
+
+    def __contains__( self, registration_id: Any ) -> bool:
+        return registration_id in self._state.classes
+
+    def __repr__( self ) -> str:
+        return f"{ type( self ).__name__ }({ self._state.classes!r})"
+
+    def snapshot( self ) -> RegistrySnapshot:
+        """
+        Gets an immutable view of the registry as of now.
+        """
+
+        if self.is_copy_on_write:
+            return RegistrySnapshot( self._state )
+        else:
+            with self._lock:
+                state = self._state.copy( share_index_entries = False )
+
+            return RegistrySnapshot( state )
+
+    def register( self, registration_id: Any, class_: Type, tags: Iterable[ Hashable ] = () ):
+        """
+        Registers the given class with the given ID, replacing the class and tags previously registered with the ID.
+
+        Parameters:
+        `registration_id`: ID to register the class with.
+        `class_`: class to register.
+        `tags`: tags or capabilities of the class.
+        """
+
+        tags = frozenset( tags )
+        self._update( lambda state: state.add( registration_id, _verify_class( class_ ), tags ) )
+
+    def register_many( self, registrations: Iterable[ Tuple[ Any, Type, Optional[ Iterable[ Hashable ] ] ] ] ):
+        """
+        Registers the given classes as a single change; in copy-on-write mode, a single new state is published for all of them.
+
+        Parameters:
+        `registrations`: iterable of tuples of a registration ID, a class and its tags; tags of None keep the tags previously registered with the ID.
+        """
+
+        registrations = [ ( registration_id, _verify_class( class_ ), None if tags is None else frozenset( tags ) ) for registration_id, class_, tags in registrations ]
+
+        def add_classes( state: _RegistryState ):
+            for registration_id, class_, tags in registrations:
+                state.add( registration_id, class_, state.tags.get( registration_id, frozenset() ) if tags is None else tags )
+
+        self._update( add_classes )
+
+    def get_tags( self, registration_id: Any ) -> FrozenSet[ Hashable ]:
+        """
+        Gets the tags of the class registered with the given ID.
+        """
+
+        return self._state.tags[ registration_id ]
+
+    def set_tags( self, registration_id: Any, tags: Iterable[ Hashable ] ):
+        """
+        Replaces the tags of the class registered with the given ID.
+        """
+
+        tags = frozenset( tags )
+        self._update( lambda state: state.add( registration_id, state.classes[ registration_id ], tags ) )
+
+    def get_by_parent_class( self, parent_class: Type ) -> Dict[ Any, Type ]:
+        """
+        Gets the registered classes which have the given class along their MRO, including the given class itself.
+
+        Returns:
+        Dictionary of the matching registration IDs to classes, in registration order.
+        """
+
+        return self._get_indexed( _PARENT_CLASS_INDEX, parent_class )
+
+    def get_by_module( self, module_name: str ) -> Dict[ Any, Type ]:
+        """
+        Gets the registered classes defined in the module with the given name.
+
+        Returns:
+        Dictionary of the matching registration IDs to classes, in registration order.
+        """
+
+        return self._get_indexed( _MODULE_INDEX, module_name )
+
+    def get_by_name( self, name: str ) -> Dict[ Any, Type ]:
+        """
+        Gets the registered classes with the given class name.
+
+        Returns:
+        Dictionary of the matching registration IDs to classes, in registration order.
+        """
+
+        return self._get_indexed( _NAME_INDEX, name )
+
+    def get_by_tag( self, tag: Hashable ) -> Dict[ Any, Type ]:
+        """
+        Gets the registered classes which have the given tag.
+
+        Returns:
+        Dictionary of the matching registration IDs to classes, in registration order.
+        """
+
+        return self._get_indexed( _TAG_INDEX, tag )
+
+    def _get_indexed( self, index_name: str, key: Hashable ) -> Dict[ Any, Type ]:
+        if self.is_copy_on_write:
+            return self._state.get_indexed( index_name, key )
+        else:
+            with self._lock:
+                return self._state.get_indexed( index_name, key )
+
+    def _update( self, callback: Callable[ [ _RegistryState ], Any ] ):
+        """
+        Applies the given change to the registry's state. In copy-on-write mode the change is applied to a copy, which is published only if the change
+        succeeds, so a failed change leaves the registry unchanged.
+        """
+
+        with self._lock:
+            if self.is_copy_on_write:
+                state = self._state.copy()
+                callback( state )
+                # a single reference assignment publishes the new state atomically.
+                self._state = state
+            else:
+                callback( self._state )
+
+def _verify_class( class_: Type ) -> Type:
+    if class_ is None:
+        raise ValueError( "Class to register cannot be None." )
+
+    return class_
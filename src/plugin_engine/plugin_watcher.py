@@ -0,0 +1,346 @@
+__version__ = r"1.0.0"
+
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, Type
+
+import ctypes
+import ctypes.util
+import os
+import os.path
+import select
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+from .dynamic_import import _resolve_ignored_filenames, _scan_directory, _walk_candidates
+from .plugin_importer import PluginImporter, ReloadResult
+
+_IN_MODIFY: int = 0x00000002
+_IN_ATTRIB: int = 0x00000004
+_IN_CLOSE_WRITE: int = 0x00000008
+_IN_MOVED_FROM: int = 0x00000040
+_IN_MOVED_TO: int = 0x00000080
+_IN_CREATE: int = 0x00000100
+_IN_DELETE: int = 0x00000200
+_IN_DELETE_SELF: int = 0x00000400
+_IN_MOVE_SELF: int = 0x00000800
+_IN_ISDIR: int = 0x40000000
+_IN_NONBLOCK: int = 0o4000
+_IN_CLOEXEC: int = 0o2000000
+_INOTIFY_MASK: int = _IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE | _IN_DELETE_SELF | _IN_MOVE_SELF
+_INOTIFY_EVENT_HEADER = struct.Struct( "iIII" )
+
+class _PollingChangeSource( object ):
+    """
+    Detects changes by comparing the modification times and sizes of the module files, and the modification times of every directory searched for them,
+    between polls.
+    """
+
+    def __init__( self, directory_path: str, discovery_arguments: Tuple[ List[ str ], Dict[ str, Any ] ], stop_event: threading.Event ):
+        self._directory_path = directory_path
+        self._discovery_arguments = discovery_arguments
+        self._stop_event = stop_event
+        self._snapshot = self._take_snapshot()
+
+    def _take_snapshot( self ) -> Dict[ str, Tuple[ int, int ] ]:
+        module_file_ext, keyword_args = self._discovery_arguments
+        ignored_filenames = _resolve_ignored_filenames( keyword_args.get( "ignored_filenames", None ) )
+        walked_directories: List[ str ] = []
+
+        def list_directory( directory: str ) -> Tuple[ List[ str ], List[ str ] ]:
+            walked_directories.append( directory )
+            filenames, subdirectories = _scan_directory( directory, module_file_ext, ignored_filenames )
+            return filenames, [ subdirectory for subdirectory in subdirectories if subdirectory != "__pycache__" ]
+
+        candidate_paths: List[ str ] = [ os.fspath( candidate.path ) for candidate in _walk_candidates( Path( self._directory_path ), bool( keyword_args.get( "recursive", False ) ), list_directory ) ]
+        snapshot: Dict[ str, Tuple[ int, int ] ] = {}
+
+        # every walked directory is compared, including those without module files, which change when a module file or directory is added to them.
+        for path in walked_directories + candidate_paths:
+            try:
+                stat_result = os.stat( path )
+            except OSError:
+                continue
+
+            snapshot[ path ] = ( stat_result.st_mtime_ns, stat_result.st_size )
+
+        return snapshot
+
+    def wait_for_change( self, timeout: float ) -> bool:
+        if self._stop_event.wait( timeout ):
+            return False
+
+        snapshot = self._take_snapshot()
+        has_changed = snapshot != self._snapshot
+        self._snapshot = snapshot
+
+        return has_changed
+
+    def close( self ):
+        pass
+
+class _InotifyChangeSource( object ):
+    """
+    Detects changes using Linux inotify watches on the plugin directories.
+    """
+
+    def __init__( self, directory_path: str, recursive: bool, target_file_extensions: List[ str ] ):
+        library_name = ctypes.util.find_library( "c" )
+        self._libc = ctypes.CDLL( library_name if library_name is not None else "libc.so.6", use_errno = True )
+
+        for function_name in ( "inotify_init1", "inotify_add_watch" ):
+            if not hasattr( self._libc, function_name ):
+                raise OSError( f"inotify is not available; '{ function_name }' was not found." )
+
+        self._libc.inotify_add_watch.argtypes = [ ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32 ]
+
+        self._file_descriptor: int = self._libc.inotify_init1( _IN_NONBLOCK | _IN_CLOEXEC )
+        if self._file_descriptor < 0:
+            error_number = ctypes.get_errno()
+            raise OSError( error_number, os.strerror( error_number ) )
+
+        self._recursive: bool = recursive
+        self._target_file_extensions: List[ str ] = list( target_file_extensions )
+        self._watched_directories: Dict[ int, str ] = {}
+        self._poller = select.poll()
+        self._poller.register( self._file_descriptor, select.POLLIN )
+
+        try:
+            self._add_watches( directory_path )
+        except OSError:
+            self.close()
+            raise
+
+    def _add_watches( self, directory_path: str ):
+        pending_directories: List[ str ] = [ directory_path ]
+
+        while len( pending_directories ) > 0:
+            directory = pending_directories.pop()
+
+            watch_descriptor = self._libc.inotify_add_watch( self._file_descriptor, os.fsencode( directory ), _INOTIFY_MASK )
+            if watch_descriptor < 0:
+                error_number = ctypes.get_errno()
+                raise OSError( error_number, os.strerror( error_number ), directory )
+
+            self._watched_directories[ watch_descriptor ] = directory
+
+            if self._recursive:
+                try:
+                    with os.scandir( directory ) as entries:
+                        pending_directories.extend( entry.path for entry in entries if entry.is_dir( follow_symlinks = False ) and entry.name != "__pycache__" )
+                except OSError:
+                    pass
+
+    def wait_for_change( self, timeout: float ) -> bool:
+        if len( self._poller.poll( int( timeout * 1000 ) ) ) == 0:
+            return False
+
+        has_changed = False
+
+        while True:
+            try:
+                buffer = os.read( self._file_descriptor, 64 * 1024 )
+            except BlockingIOError:
+                break
+
+            offset = 0
+            while offset < len( buffer ):
+                watch_descriptor, mask, _, name_length = _INOTIFY_EVENT_HEADER.unpack_from( buffer, offset )
+                name = buffer[ offset + _INOTIFY_EVENT_HEADER.size : offset + _INOTIFY_EVENT_HEADER.size + name_length ].rstrip( b"\0" )
+                offset += _INOTIFY_EVENT_HEADER.size + name_length
+
+                name = os.fsdecode( name )
+
+                if mask & _IN_ISDIR:
+                    if name != "__pycache__":
+                        has_changed = True
+
+                        if self._recursive and mask & ( _IN_CREATE | _IN_MOVED_TO ) and watch_descriptor in self._watched_directories:
+                            try:
+                                self._add_watches( os.path.join( self._watched_directories[ watch_descriptor ], name ) )
+                            except OSError:
+                                pass
+                elif len( name ) == 0 or os.path.splitext( name )[ 1 ] in self._target_file_extensions:
+                    # events without a name are about the watched directory itself.
+                    has_changed = True
+
+        return has_changed
+
+    def close( self ):
+        if self._file_descriptor >= 0:
+            self._poller.unregister( self._file_descriptor )
+            os.close( self._file_descriptor )
+            self._file_descriptor = -1
+
+class PluginWatcher( object ):
+    """
+    Watches the package directory of a plugin importer in a background thread and incrementally reloads the plugins when their files change. Bursts of
+    changes are debounced and applied as one batch. After each batch, a snapshot of the registration target is published with a single reference assignment,
+    so readers of `registry` never observe a partially reloaded registry.
+
+    Notes:
+        - Only `registry` is consistent. The registration target itself is changed in place, one module at a time, while a batch is applied; readers of the
+          registration target may observe a partially reloaded set of plugins, and should read `registry` instead.
+        - The classes of removed modules, and the classes reloaded modules no longer register, are deregistered from the registration target.
+    """
+
+    def __init__( self, plugin_importer: PluginImporter, registration_target: Dict[ Any, Type ], **kwargs: Dict[ str, Any ] ):
+        """
+        Parameters:
+        `plugin_importer`: importer whose modules were already imported.
+        `registration_target`: registration target the plugins register into; changed in place while a batch is applied.
+
+        Keywords:
+        `registration_target_lock`: lock controlling access to the registration target; held while classes are deregistered and while the registry snapshot
+            is taken, but not while modules are imported, so plugins may register with the same lock; defaults to None, indicating there is no lock.
+        `poll_interval`: number of seconds between checks for changes when polling; also bounds how long stopping the watcher takes; defaults to 1.
+        `debounce_interval`: number of seconds without further changes after which a batch of changes is applied; defaults to 0.5.
+        `max_batch_delay`: maximum number of seconds a batch is delayed by continuous changes; defaults to 10.
+        `use_inotify`: indicates if inotify should be used when it is available; defaults to `True`. Stat polling is used otherwise.
+        `reload_callback`: callable invoked with the `ReloadResult` of each applied batch; defaults to None.
+        `error_callback`: callable invoked with the exception raised by a batch which failed to apply; defaults to None. The previous registry snapshot stays
+            published and the batch is retried on the next change.
+        """
+
+        if not isinstance( plugin_importer, PluginImporter ):
+            raise ValueError( "The plugin importer must be a PluginImporter instance." )
+        elif not plugin_importer.has_loaded_modules or plugin_importer.import_arguments is None:
+            raise ValueError( "The plugin importer must have imported its modules before it is watched." )
+        elif registration_target is None:
+            raise ValueError( "Registration target dictionary cannot be None." )
+
+        self._plugin_importer: PluginImporter = plugin_importer
+        self._registration_target: Dict[ Any, Type ] = registration_target
+        self._registration_target_lock = kwargs.get( "registration_target_lock", None )
+        self._poll_interval: float = float( kwargs.get( "poll_interval", 1.0 ) )
+        self._debounce_interval: float = float( kwargs.get( "debounce_interval", 0.5 ) )
+        self._max_batch_delay: float = float( kwargs.get( "max_batch_delay", 10.0 ) )
+        self._use_inotify: bool = bool( kwargs.get( "use_inotify", True ) )
+        self._reload_callback: Optional[ Callable[ [ ReloadResult ], Any ] ] = kwargs.get( "reload_callback", None )
+        self._error_callback: Optional[ Callable[ [ Exception ], Any ] ] = kwargs.get( "error_callback", None )
+
+        self._registry: Mapping[ Any, Type ] = self._take_registry_snapshot()
+        self._stop_event: threading.Event = threading.Event()
+        self._thread: Optional[ threading.Thread ] = None
+        self._uses_inotify: bool = False
+
+    @property
+    def registry( self ) -> Mapping[ Any, Type ]:
+        """
+        Read-only snapshot of the registration target as of the last applied batch; unlike the registration target, it never reflects a partially applied
+        batch.
+        """
+
+        return self._registry
+
+    @property
+    def is_running( self ) -> bool:
+        """
+        Indicates if the watcher thread is running.
+        """
+
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def uses_inotify( self ) -> bool:
+        """
+        Indicates if the running watcher detects changes with inotify rather than stat polling.
+        """
+
+        return self._uses_inotify
+
+    def start( self ):
+        """
+        Starts watching in a background daemon thread.
+        """
+
+        if self.is_running:
+            raise Exception( "Cannot start watching; the watcher is already running." )
+
+        change_source = self._create_change_source()
+
+        self._stop_event.clear()
+        self._thread = threading.Thread( target = self._run, args = ( change_source, ), name = "plugin-watcher", daemon = True )
+        self._thread.start()
+
+    def stop( self, timeout: Optional[ float ] = None ):
+        """
+        Stops watching and waits for the watcher thread to finish.
+        """
+
+        self._stop_event.set()
+
+        if self._thread is not None:
+            self._thread.join( timeout )
+            self._thread = None
+
+    def apply_changes( self ) -> ReloadResult:
+        """
+        Applies the pending changes immediately on the calling thread and publishes a new registry snapshot.
+
+        Returns:
+        The changes which were applied.
+        """
+
+        result = self._plugin_importer.reload_changed_modules( registration_targets = [ self._registration_target ], registration_target_lock = self._registration_target_lock )
+
+        # a single reference assignment publishes the snapshot atomically.
+        self._registry = self._take_registry_snapshot()
+
+        return result
+
+    def _take_registry_snapshot( self ) -> Mapping[ Any, Type ]:
+        lock = self._registration_target_lock
+
+        if lock is not None:
+            lock.acquire()
+
+        try:
+            return MappingProxyType( dict( self._registration_target ) )
+        finally:
+            if lock is not None:
+                lock.release()
+
+    def _create_change_source( self ):
+        directory_path = os.path.dirname( self._plugin_importer.relative_import_package.__file__ )
+        discovery_arguments = self._plugin_importer.import_arguments
+
+        self._uses_inotify = False
+
+        if self._use_inotify and sys.platform.startswith( "linux" ):
+            try:
+                change_source = _InotifyChangeSource( directory_path, bool( discovery_arguments[ 1 ].get( "recursive", False ) ), discovery_arguments[ 0 ] )
+            except OSError:
+                pass
+            else:
+                self._uses_inotify = True
+                return change_source
+
+        return _PollingChangeSource( directory_path, discovery_arguments, self._stop_event )
+
+    def _run( self, change_source ):
+        try:
+            while not self._stop_event.is_set():
+                if not change_source.wait_for_change( self._poll_interval ):
+                    continue
+
+                # debounce: wait until the changes settle, bounded by the maximum batch delay.
+                batch_start = time.monotonic()
+                while not self._stop_event.is_set() and time.monotonic() - batch_start < self._max_batch_delay:
+                    if not change_source.wait_for_change( self._debounce_interval ):
+                        break
+
+                if self._stop_event.is_set():
+                    break
+
+                try:
+                    result = self.apply_changes()
+                except Exception as e:
+                    if self._error_callback is not None:
+                        self._error_callback( e )
+                else:
+                    if self._reload_callback is not None and result.has_changes:
+                        self._reload_callback( result )
+        finally:
+            change_source.close()
@@ -0,0 +1,167 @@
+__version__ = r"1.0.0"
+
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+import contextlib
+import io
+import itertools
+import traceback
+
+class ExecutionResult( NamedTuple ):
+    """
+    The outcome of executing a registered class in a worker process.
+
+    Fields:
+    `registration_id`: ID the class is registered with.
+    `args`: positional arguments the class was executed with.
+    `value`: value returned by the execution; None if it failed.
+    `output`: text the execution wrote to `sys.stdout`; empty if output is not captured.
+    `error`: formatted exception raised by the execution; None if it succeeded.
+    """
+
+    registration_id: Any
+    args: Tuple[ Any, ... ]
+    value: Any
+    output: str
+    error: Optional[ str ]
+
+    @property
+    def succeeded( self ) -> bool:
+        """
+        Indicates if the execution completed without raising an exception.
+        """
+
+        return self.error is None
+
+# the registry of a worker process, loaded once by the pool's initializer.
+_worker_registry: Optional[ Mapping[ Any, Any ] ] = None
+
+def _initialize_worker( registry_loader: Callable[ [], Mapping[ Any, Any ] ] ):
+    global _worker_registry
+
+    _worker_registry = registry_loader()
+
+def _execute_batch( calls: List[ Tuple[ Any, Tuple[ Any, ... ], Dict[ str, Any ] ] ], instance_kwargs: Dict[ str, Any ], method_name: str, capture_output: bool ) -> List[ ExecutionResult ]:
+    results: List[ ExecutionResult ] = []
+
+    for registration_id, args, kwargs in calls:
+        output = io.StringIO()
+
+        try:
+            with contextlib.redirect_stdout( output ) if capture_output else contextlib.ExitStack():
+                instance = _worker_registry[ registration_id ]( **instance_kwargs )
+                value = getattr( instance, method_name )( *args, **kwargs )
+        except Exception:
+            results.append( ExecutionResult( registration_id, args, None, output.getvalue(), traceback.format_exc() ) )
+        else:
+            results.append( ExecutionResult( registration_id, args, value, output.getvalue(), None ) )
+
+    return results
+
+class PluginProcessPool( object ):
+    """
+    Executes registered classes in a pool of worker processes. Each worker loads the registry once when it starts, so calls only send registration IDs and
+    arguments, never classes; the results must be picklable.
+    """
+
+    def __init__( self, registry_loader: Callable[ [], Mapping[ Any, Any ] ], **kwargs: Dict[ str, Any ] ):
+        """
+        Parameters:
+        `registry_loader`: picklable callable, such as a module-level function, returning the registry of classes; called once in each worker. Workers
+            forked from a process whose plugins are imported, e.g. prepared with `PluginImporter.prepare_for_fork`, inherit the plugins instead of importing
+            them.
+
+        Keywords:
+        `worker_count`: number of worker processes; defaults to the number of processors.
+        `mp_context`: multiprocessing context the workers are started with; defaults to the default context.
+        `instance_kwargs`: keywords each class is instantiated with; defaults to none.
+        `method_name`: name of the method called on each instance; defaults to `execute`.
+        `capture_output`: indicates if the text each execution writes to `sys.stdout` is captured into its result; defaults to `True`.
+        """
+
+        if registry_loader is None:
+            raise ValueError( "Registry loader cannot be None." )
+
+        self._instance_kwargs: Dict[ str, Any ] = dict( kwargs.get( "instance_kwargs", None ) or {} )
+        self._method_name: str = kwargs.get( "method_name", "execute" )
+        self._capture_output: bool = bool( kwargs.get( "capture_output", True ) )
+        self._executor: ProcessPoolExecutor = ProcessPoolExecutor( max_workers = kwargs.get( "worker_count", None ), mp_context = kwargs.get( "mp_context", None ),
+                                                                   initializer = _initialize_worker, initargs = ( registry_loader, ) )
+
+    def __enter__( self ) -> "PluginProcessPool":
+        return self
+
+    def __exit__( self, exc_type, exc_value, exc_traceback ):
+        self.shutdown()
+
+    def submit( self, registration_id: Any, *args: Iterable[ Any ], **kwargs: Dict[ str, Any ] ) -> "Future[ ExecutionResult ]":
+        """
+        Executes the class registered with the given ID with the given arguments in a worker.
+
+        Returns:
+        Future of the result.
+        """
+
+        batch_future = self._submit_batch( [ ( registration_id, tuple( args ), kwargs ) ] )
+        result_future: Future = Future()
+
+        def set_result( completed: Future ):
+            if completed.exception() is not None:
+                result_future.set_exception( completed.exception() )
+            else:
+                result_future.set_result( completed.result()[ 0 ] )
+
+        batch_future.add_done_callback( set_result )
+
+        return result_future
+
+    def execute_many( self, calls: Iterable[ Sequence[ Any ] ], **kwargs: Dict[ str, Any ] ) -> Iterator[ ExecutionResult ]:
+        """
+        Executes many calls in the workers. Calls can be sent in batches so each round trip to a worker carries several calls; the calls of a batch run one
+        after another in a single worker.
+
+        Parameters:
+        `calls`: iterable of `( registration_id, args )` or `( registration_id, args, kwargs )` sequences.
+
+        Keywords:
+        `batch_size`: maximum number of calls sent to a worker at once; defaults to 1, indicating every call may run in parallel. Larger batches save round
+            trips for many short calls, but a long call delays the rest of its batch.
+        `ordered`: indicates if the results are yielded in the order of the calls; defaults to `True`. Otherwise the results of each batch are yielded as
+            soon as the batch completes.
+
+        Returns:
+        Iterator of the results.
+
+        Raises:
+        `BrokenProcessPool`: if a worker process terminated abruptly.
+        """
+
+        batch_size: int = int( kwargs.get( "batch_size", 1 ) )
+        if batch_size < 1:
+            raise ValueError( f"Invalid batch size: { batch_size }" )
+
+        normalized_calls = ( ( call[ 0 ], tuple( call[ 1 ] ), dict( call[ 2 ] ) if len( call ) > 2 else {} ) for call in calls )
+        futures: List[ Future ] = []
+
+        while True:
+            batch = list( itertools.islice( normalized_calls, batch_size ) )
+            if len( batch ) == 0:
+                break
+
+            futures.append( self._submit_batch( batch ) )
+
+        # every batch is submitted before the first result is awaited.
+        completed_futures = futures if bool( kwargs.get( "ordered", True ) ) else as_completed( futures )
+
+        return ( result for future in completed_futures for result in future.result() )
+
+    def shutdown( self, wait: bool = True ):
+        """
+        Stops the workers once the submitted calls complete.
+        """
+
+        self._executor.shutdown( wait = wait )
+
+    def _submit_batch( self, batch: List[ Tuple[ Any, Tuple[ Any, ... ], Dict[ str, Any ] ] ] ) -> Future:
+        return self._executor.submit( _execute_batch, batch, self._instance_kwargs, self._method_name, self._capture_output )
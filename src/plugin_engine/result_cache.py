@@ -0,0 +1,349 @@
+__version__ = r"1.0.0"
+
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Iterator, Mapping, NamedTuple, Optional, Tuple, Type
+
+import hashlib
+import io
+import itertools
+import json
+import os
+import pickle
+import sys
+import threading
+import weakref
+from pathlib import Path
+from .file_state import FileState, get_source_state
+from .lazy_registration import LazyClass
+from .output_capture import capture_output
+
+CACHEABLE_TAG: str = "cacheable"
+
+class CacheStatistics( NamedTuple ):
+    """
+    The counters of a result cache.
+
+    Fields:
+    `hits`: number of lookups served from memory or disk.
+    `disk_hits`: number of the hits served from disk.
+    `misses`: number of lookups which found no result.
+    `evictions`: number of results evicted from memory.
+    `spills`: number of the evicted results written to disk.
+    `entry_count`: number of results in memory.
+    `byte_count`: pickled size of the results in memory, in bytes.
+    `disk_entry_count`: number of results on disk.
+    `disk_byte_count`: size of the results on disk, in bytes.
+    """
+
+    hits: int
+    disk_hits: int
+    misses: int
+    evictions: int
+    spills: int
+    entry_count: int
+    byte_count: int
+    disk_entry_count: int
+    disk_byte_count: int
+
+class CachedResult( NamedTuple ):
+    """
+    The cached outcome of executing a registered class.
+
+    Fields:
+    `value`: value returned by the execution.
+    `output`: text the execution wrote to `sys.stdout`.
+    `error_output`: text the execution wrote to `sys.stderr`.
+    """
+
+    value: Any
+    output: str
+    error_output: str = ""
+
+class _Unnormalizable( Exception ):
+    pass
+
+def _normalize( value: Any ) -> Any:
+    """
+    Converts the given argument to a JSON-serializable form which distinguishes types that compare equal, e.g. `1`, `1.0` and `True`.
+    """
+
+    if value is None or isinstance( value, str ):
+        return value
+    elif isinstance( value, ( bool, int, float ) ):
+        return [ type( value ).__name__, repr( value ) ]
+    elif isinstance( value, bytes ):
+        return [ "bytes", value.hex() ]
+    elif isinstance( value, ( list, tuple ) ):
+        return [ type( value ).__name__, [ _normalize( item ) for item in value ] ]
+    elif isinstance( value, ( set, frozenset ) ):
+        return [ type( value ).__name__, sorted( json.dumps( _normalize( item ) ) for item in value ) ]
+    elif isinstance( value, dict ):
+        return [ "dict", sorted( [ json.dumps( _normalize( key ) ), _normalize( item ) ] for key, item in value.items() ) ]
+    else:
+        raise _Unnormalizable( type( value ).__qualname__ )
+
+class ResultCache( object ):
+    """
+    Bounded LRU cache of the results of registered classes which opted in by being registered with the `cacheable` tag. Results are keyed by registration
+    ID, a hash of the source the class' module was executed from, so reloading a changed module invalidates its results, and the normalized arguments.
+    Results evicted from memory can spill to a directory on disk.
+
+    Notes:
+        - The source hash is only known for modules imported or reloaded by the plugin engine whose files have not changed since; the results of other
+          classes are keyed by their module object instead, so they are only reused within the process and until the module is reloaded.
+        - Spilled results are unpickled when they are read back, which can execute arbitrary code; the spill directory must only be writable by trusted
+          users, like the plugin directories themselves.
+    """
+
+    def __init__( self, **kwargs: Dict[ str, Any ] ):
+        """
+        Keywords:
+        `max_entries`: maximum number of results kept in memory; defaults to 1024.
+        `max_bytes`: maximum pickled size of the results kept in memory, in bytes; defaults to 64 MiB.
+        `spill_directory`: directory evicted results are written to and read back from, and which results spilled by previous processes are reused from;
+            must be trusted, as its files are unpickled; defaults to None, indicating evicted results are discarded.
+        `max_disk_bytes`: maximum size of the results on disk, in bytes; the oldest are deleted first; defaults to 1 GiB.
+        """
+
+        self._max_entries: int = int( kwargs.get( "max_entries", 1024 ) )
+        self._max_bytes: int = int( kwargs.get( "max_bytes", 64 * 1024 * 1024 ) )
+        self._max_disk_bytes: int = int( kwargs.get( "max_disk_bytes", 1024 * 1024 * 1024 ) )
+
+        spill_directory = kwargs.get( "spill_directory", None )
+        self._spill_directory: Optional[ Path ] = Path( spill_directory ) if spill_directory is not None else None
+
+        self._lock: threading.RLock = threading.RLock()
+        # keys to pickled results, least recently used first.
+        self._entries: "OrderedDict[ str, bytes ]" = OrderedDict()
+        self._byte_count: int = 0
+        # keys to the sizes of the results on disk, oldest first.
+        self._disk_entries: "OrderedDict[ str, int ]" = OrderedDict()
+        self._disk_byte_count: int = 0
+        self._class_tokens: "weakref.WeakKeyDictionary[ Type, int ]" = weakref.WeakKeyDictionary()
+        self._class_token_counter: Iterator[ int ] = itertools.count()
+        self._hits: int = 0
+        self._disk_hits: int = 0
+        self._misses: int = 0
+        self._evictions: int = 0
+        self._spills: int = 0
+
+        if self._spill_directory is not None:
+            self._spill_directory.mkdir( parents = True, exist_ok = True )
+
+            # results spilled by previous processes are reused; their keys include the source hashes.
+            for path in sorted( self._spill_directory.glob( "*.pickle" ), key = lambda path: path.stat().st_mtime_ns ):
+                size = path.stat().st_size
+                self._disk_entries[ path.stem ] = size
+                self._disk_byte_count += size
+
+    @property
+    def statistics( self ) -> CacheStatistics:
+        """
+        The current counters of the cache.
+        """
+
+        with self._lock:
+            return CacheStatistics( self._hits, self._disk_hits, self._misses, self._evictions, self._spills, len( self._entries ), self._byte_count,
+                                    len( self._disk_entries ), self._disk_byte_count )
+
+    @staticmethod
+    def is_cacheable( registry: Mapping[ Any, Type ], registration_id: Any ) -> bool:
+        """
+        Indicates if the class registered with the given ID in the given registry opted in to caching with the `cacheable` tag.
+        """
+
+        get_tags = getattr( registry, "get_tags", None )
+        return get_tags is not None and CACHEABLE_TAG in get_tags( registration_id )
+
+    def get_key( self, registration_id: Any, class_: Type, args: Iterable[ Any ], kwargs: Optional[ Dict[ str, Any ] ] = None ) -> Optional[ str ]:
+        """
+        Gets the cache key of executing the given class with the given arguments.
+
+        Returns:
+        The key, or None if an argument cannot be normalized, in which case the result is not cached.
+        """
+
+        try:
+            normalized = [ _normalize( registration_id ), self._get_source_hash( class_ ), _normalize( tuple( args ) ), _normalize( dict( kwargs or {} ) ) ]
+        except _Unnormalizable:
+            return None
+
+        return hashlib.sha256( json.dumps( normalized, separators = ( ",", ":" ) ).encode( "utf-8" ) ).hexdigest()
+
+    def get( self, key: str ) -> Tuple[ bool, Any ]:
+        """
+        Looks up the result with the given key, counting a hit or a miss.
+
+        Returns:
+        Whether the result was found, and the result.
+        """
+
+        with self._lock:
+            data = self._entries.get( key, None )
+
+            if data is not None:
+                self._entries.move_to_end( key )
+                self._hits += 1
+                return True, pickle.loads( data )
+
+            if key in self._disk_entries:
+                try:
+                    data = self._get_spill_path( key ).read_bytes()
+                except OSError:
+                    self._remove_disk_entry( key )
+                else:
+                    self._hits += 1
+                    self._disk_hits += 1
+                    self._remove_disk_entry( key )
+                    self._store( key, data )
+                    return True, pickle.loads( data )
+
+            self._misses += 1
+            return False, None
+
+    def put( self, key: str, result: Any ) -> bool:
+        """
+        Stores the given result with the given key, evicting the least recently used results as needed.
+
+        Returns:
+        `True` if the result was stored, `False` if it cannot be pickled, in which case it is not cached.
+        """
+
+        try:
+            data = pickle.dumps( result, protocol = pickle.HIGHEST_PROTOCOL )
+        except Exception:
+            # pickling arbitrary objects can raise about anything, e.g. `TypeError` or `AttributeError` for local classes.
+            return False
+
+        with self._lock:
+            self._store( key, data )
+
+        return True
+
+    def clear( self ):
+        """
+        Removes every result from memory and disk; the counters are kept.
+        """
+
+        with self._lock:
+            self._entries.clear()
+            self._byte_count = 0
+
+            for key in list( self._disk_entries ):
+                self._remove_disk_entry( key )
+
+    def execute( self, registry: Mapping[ Any, Type ], registration_id: Any, *args: Iterable[ Any ], **kwargs: Dict[ str, Any ] ) -> Any:
+        """
+        Executes the class registered with the given ID with the given arguments, serving the result and the text it wrote to `sys.stdout` and `sys.stderr`
+        from the cache when the class is cacheable.
+
+        Keywords:
+        `instance_kwargs`: keywords the class is instantiated with; part of the key; defaults to none.
+        `method_name`: name of the method called on the instance; defaults to `execute`.
+        Other keywords are passed to the method and are part of the key.
+
+        Returns:
+        The value returned by the method.
+
+        Notes:
+            - Only the calling thread's output is captured, so executions on other threads are neither captured nor affected.
+            - If the execution raises an exception, the text it wrote is still written out, and nothing is cached. Neither is a value which cannot be pickled.
+        """
+
+        keyword_args: Dict[ str, Any ] = kwargs.copy()
+        instance_kwargs: Dict[ str, Any ] = dict( keyword_args.pop( "instance_kwargs", None ) or {} )
+        method_name: str = keyword_args.pop( "method_name", "execute" )
+        class_ = registry[ registration_id ]
+        if isinstance( class_, LazyClass ):
+            # the source hash is the one of the module the stand-in refers to, which is imported anyway to execute the class.
+            class_ = class_.resolve()
+
+        key: Optional[ str ] = None
+        if self.is_cacheable( registry, registration_id ):
+            key = self.get_key( registration_id, class_, args, { "instance": instance_kwargs, "method": method_name, "call": keyword_args } )
+
+        if key is None:
+            return getattr( class_( **instance_kwargs ), method_name )( *args, **keyword_args )
+
+        found, result = self.get( key )
+        if found:
+            sys.stdout.write( result.output )
+            sys.stderr.write( result.error_output )
+            return result.value
+
+        stdout_buffer, stderr_buffer = io.StringIO(), io.StringIO()
+        try:
+            with capture_output() as ( stdout_buffer, stderr_buffer ):
+                value = getattr( class_( **instance_kwargs ), method_name )( *args, **keyword_args )
+        finally:
+            sys.stdout.write( stdout_buffer.getvalue() )
+            sys.stderr.write( stderr_buffer.getvalue() )
+
+        self.put( key, CachedResult( value, stdout_buffer.getvalue(), stderr_buffer.getvalue() ) )
+
+        return value
+
+    def _get_source_hash( self, class_: Type ) -> str:
+        module = sys.modules.get( getattr( class_, "__module__", None ), None )
+        state: Optional[ FileState ] = get_source_state( module ) if module is not None else None
+
+        if state is not None:
+            return state.content_hash
+
+        # the executed source is unknown, e.g. the module was loaded from a bundle or its file was edited but not yet reloaded; the class object identifies the
+        # executed code within this process, and reloading the module creates a new one. Unlike `id`, a token is never reused by a later class.
+        with self._lock:
+            token = self._class_tokens.get( class_, None )
+            if token is None:
+                token = self._class_tokens[ class_ ] = next( self._class_token_counter )
+
+        return f"{ getattr( class_, '__module__', '' ) }:{ os.getpid() }:{ id( self ) }:{ token }"
+
+    def _get_spill_path( self, key: str ) -> Path:
+        return self._spill_directory / f"{ key }.pickle"
+
+    def _store( self, key: str, data: bytes ):
+        if key in self._entries:
+            self._byte_count -= len( self._entries.pop( key ) )
+
+        self._entries[ key ] = data
+        self._byte_count += len( data )
+
+        while len( self._entries ) > 0 and ( len( self._entries ) > self._max_entries or self._byte_count > self._max_bytes ):
+            evicted_key, evicted_data = self._entries.popitem( last = False )
+            self._byte_count -= len( evicted_data )
+            self._evictions += 1
+
+            if self._spill_directory is not None and len( evicted_data ) <= self._max_disk_bytes:
+                self._spill( evicted_key, evicted_data )
+
+    def _spill( self, key: str, data: bytes ):
+        path = self._get_spill_path( key )
+        temporary_path = path.with_suffix( f".{ os.getpid() }.tmp" )
+
+        try:
+            temporary_path.write_bytes( data )
+            os.replace( temporary_path, path )
+        except OSError:
+            return
+
+        self._remove_disk_entry( key, delete = False )
+        self._disk_entries[ key ] = len( data )
+        self._disk_byte_count += len( data )
+        self._spills += 1
+
+        while self._disk_byte_count > self._max_disk_bytes:
+            self._remove_disk_entry( next( iter( self._disk_entries ) ) )
+
+    def _remove_disk_entry( self, key: str, delete: bool = True ):
+        size = self._disk_entries.pop( key, None )
+        if size is None:
+            return
+
+        self._disk_byte_count -= size
+
+        if delete:
+            try:
+                os.remove( self._get_spill_path( key ) )
+            except OSError:
+                pass
@@ -0,0 +1,282 @@
+__version__ = r"1.0.0"
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import importlib
+import importlib.util
+import json
+import os
+import os.path
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from .dynamic_import import ModuleCandidate
+from .file_state import hash_file
+from .static_analysis import get_absolute_module_name
+
+CACHE_FORMAT_VERSION: int = 1
+
+class SandboxResult( NamedTuple ):
+    """
+    The outcome of importing a plugin module in a sandbox subprocess.
+
+    Fields:
+    `module_name`: absolute name of the module.
+    `content_hash`: SHA-256 hex digest of the module file the result is for.
+    `passed`: indicates if the import stayed within the budget; modules which did not are quarantined.
+    `wall_time`: wall clock time of the import, in seconds.
+    `cpu_time`: CPU time of the import, in seconds.
+    `peak_memory`: peak resident memory of the subprocess after the import, in bytes; None if it is unknown.
+    `registrations`: names of the registrations the import made.
+    `error`: description of why the import failed or exceeded the budget; None if it succeeded. An import which failed within the budget, e.g. because it
+        depends on a module which is imported first in-process, still passes.
+    """
+
+    module_name: str
+    content_hash: str
+    passed: bool
+    wall_time: float
+    cpu_time: float
+    peak_memory: Optional[ int ]
+    registrations: Tuple[ str, ... ]
+    error: Optional[ str ]
+
+class ImportSandbox( object ):
+    """
+    Imports each candidate plugin module in a throwaway subprocess with CPU time and memory limits before it is imported in-process, and quarantines the
+    modules which exceed the budget. Results are cached by file content hash, so unchanged modules are not imported in a subprocess again.
+    """
+
+    def __init__( self, **kwargs: Dict[ str, Any ] ):
+        """
+        Keywords:
+        `cpu_time_limit`: CPU time limit of an import, in seconds; defaults to 10.
+        `memory_limit`: address space limit of a subprocess, in bytes; defaults to 1 GiB.
+        `timeout`: wall clock time limit of an import, in seconds, which also bounds imports that hang without using CPU time; defaults to 30.
+        `cache_path`: path of a JSON file the results are cached in; defaults to None, indicating results are only cached by this sandbox.
+        `workers`: number of subprocesses run at once; defaults to 1.
+
+        Notes:
+            - CPU time and memory limits require the `resource` module; where it is unavailable, only the wall clock time limit applies.
+            - A cached result is reused while the module's own file is unchanged, even if the modules it imports changed.
+        """
+
+        self._cpu_time_limit: int = int( kwargs.get( "cpu_time_limit", 10 ) )
+        self._memory_limit: int = int( kwargs.get( "memory_limit", 1024 * 1024 * 1024 ) )
+        self._timeout: float = float( kwargs.get( "timeout", 30 ) )
+        self._workers: int = max( 1, int( kwargs.get( "workers", 1 ) ) )
+
+        cache_path = kwargs.get( "cache_path", None )
+        self._cache_path: Optional[ Path ] = Path( cache_path ) if cache_path is not None else None
+        self._lock: threading.Lock = threading.Lock()
+        self._results: Dict[ str, SandboxResult ] = {}
+        self._sandboxed_count: int = 0
+
+        if self._cache_path is not None:
+            self._load_cache()
+
+    @property
+    def results( self ) -> Dict[ str, SandboxResult ]:
+        """
+        The latest result of each checked module, keyed by absolute module name.
+        """
+
+        with self._lock:
+            return dict( self._results )
+
+    @property
+    def quarantined( self ) -> Tuple[ SandboxResult, ... ]:
+        """
+        The results of the checked modules which exceeded the budget.
+        """
+
+        with self._lock:
+            return tuple( result for result in self._results.values() if not result.passed )
+
+    @property
+    def sandboxed_count( self ) -> int:
+        """
+        The number of imports run in a subprocess, i.e. which were not served from the cache.
+        """
+
+        return self._sandboxed_count
+
+    def check( self, candidates: Iterable[ ModuleCandidate ], relative_import_package_name: Optional[ str ] ) -> List[ SandboxResult ]:
+        """
+        Imports each of the given candidates in a subprocess, unless a result for its current file content is cached.
+
+        Returns:
+        List of the results, in candidate order.
+        """
+
+        candidates = list( candidates )
+        names: List[ str ] = [ get_absolute_module_name( c.module_name, relative_import_package_name ) for c in candidates ]
+        hashes: List[ str ] = [ hash_file( c.path ) for c in candidates ]
+        results: List[ Optional[ SandboxResult ] ] = []
+        pending: List[ int ] = []
+
+        with self._lock:
+            for index, name in enumerate( names ):
+                cached: Optional[ SandboxResult ] = self._results.get( name, None )
+                if cached is not None and cached.content_hash == hashes[ index ]:
+                    results.append( cached )
+                else:
+                    results.append( None )
+                    pending.append( index )
+
+        if len( pending ) > 0:
+            with ThreadPoolExecutor( max_workers = self._workers ) as executor:
+                for index, result in zip( pending, executor.map( lambda i: self._run( names[ i ], hashes[ i ] ), pending ) ):
+                    results[ index ] = result
+
+            with self._lock:
+                self._sandboxed_count += len( pending )
+                for index in pending:
+                    self._results[ names[ index ] ] = results[ index ]
+
+            if self._cache_path is not None:
+                self._save_cache()
+
+        return results
+
+    def filter_candidates( self, candidates: Iterable[ ModuleCandidate ], relative_import_package_name: Optional[ str ] ) -> List[ ModuleCandidate ]:
+        """
+        Checks the given candidates and gets those which passed, in order.
+        """
+
+        candidates = list( candidates )
+        return [ candidate for candidate, result in zip( candidates, self.check( candidates, relative_import_package_name ) ) if result.passed ]
+
+    def _run( self, module_name: str, content_hash: str ) -> SandboxResult:
+        file_descriptor, result_path = tempfile.mkstemp( prefix = "plugin-sandbox-", suffix = ".json" )
+        os.close( file_descriptor )
+
+        environment = dict( os.environ )
+        # the subprocess finds the plugins and the plugin engine where this process does.
+        environment[ "PYTHONPATH" ] = os.pathsep.join( os.path.abspath( path ) if path else os.getcwd() for path in sys.path )
+
+        arguments = [ sys.executable, "-m", __name__, module_name, result_path, str( self._cpu_time_limit ), str( self._memory_limit ) ]
+        start = time.perf_counter()
+
+        try:
+            try:
+                completed = subprocess.run( arguments, env = environment, stdin = subprocess.DEVNULL, stdout = subprocess.DEVNULL, stderr = subprocess.PIPE,
+                                            timeout = self._timeout )
+            except subprocess.TimeoutExpired:
+                return SandboxResult( module_name, content_hash, False, time.perf_counter() - start, 0.0, None, (), f"Import timed out after { self._timeout } seconds." )
+
+            try:
+                with open( result_path, "r" ) as file:
+                    report = json.load( file )
+            except ( OSError, ValueError ):
+                report = None
+        finally:
+            try:
+                os.remove( result_path )
+            except OSError:
+                pass
+
+        if report is None:
+            if completed.returncode < 0:
+                error = f"Import was terminated by signal { -completed.returncode }."
+            else:
+                error = f"Import exited with status { completed.returncode }: { completed.stderr.decode( errors = 'replace' ).strip()[ -500: ] }"
+
+            return SandboxResult( module_name, content_hash, False, time.perf_counter() - start, 0.0, None, (), error )
+
+        return SandboxResult( module_name, content_hash, not report[ "exceeded" ], report[ "wall_time" ], report[ "cpu_time" ], report[ "peak_memory" ],
+                              tuple( report[ "registrations" ] ), report[ "error" ] )
+
+    def _cache_parameters( self ) -> Dict[ str, Any ]:
+        return {
+            "magic": importlib.util.MAGIC_NUMBER.hex(),
+            "cpu_time_limit": self._cpu_time_limit,
+            "memory_limit": self._memory_limit,
+            "timeout": self._timeout,
+        }
+
+    def _load_cache( self ):
+        try:
+            with open( self._cache_path, "r" ) as file:
+                cache = json.load( file )
+        except ( OSError, ValueError ):
+            return
+
+        # results measured with other limits or by another Python version are not reused.
+        if not isinstance( cache, dict ) or cache.get( "version", None ) != CACHE_FORMAT_VERSION or cache.get( "parameters", None ) != self._cache_parameters():
+            return
+
+        for fields in cache.get( "results", [] ):
+            fields[ "registrations" ] = tuple( fields[ "registrations" ] )
+            self._results[ fields[ "module_name" ] ] = SandboxResult( **fields )
+
+    def _save_cache( self ):
+        with self._lock:
+            cache = {
+                "version": CACHE_FORMAT_VERSION,
+                "parameters": self._cache_parameters(),
+                "results": [ result._asdict() for result in self._results.values() ],
+            }
+
+        temporary_path = f"{ self._cache_path }.{ os.getpid() }.tmp"
+        with open( temporary_path, "w" ) as file:
+            json.dump( cache, file, indent = 1 )
+
+        os.replace( temporary_path, self._cache_path )
+
+def _import_in_sandbox( module_name: str, result_path: str, cpu_time_limit: int, memory_limit: int ):
+    """
+    Entry point of the sandbox subprocess: applies the limits, imports the module and writes a report.
+    """
+
+    try:
+        import resource
+    except ImportError:
+        resource = None
+
+    if resource is not None:
+        resource.setrlimit( resource.RLIMIT_CPU, ( cpu_time_limit, cpu_time_limit + 1 ) )
+        resource.setrlimit( resource.RLIMIT_AS, ( memory_limit, memory_limit ) )
+
+    from . import instrumentation
+
+    registrations: List[ str ] = []
+    instrumentation.add_listener( lambda event: registrations.append( event.name ) if event.kind == instrumentation.REGISTRATION and event.succeeded else None )
+
+    error: Optional[ str ] = None
+    exceeded = False
+    start_cpu_time = time.process_time()
+    start_wall_time = time.perf_counter()
+
+    try:
+        importlib.import_module( module_name )
+    except MemoryError:
+        error = "Import exceeded the memory limit."
+        exceeded = True
+    except BaseException as e:
+        error = f"{ type( e ).__name__ }: { e }"
+
+    wall_time = time.perf_counter() - start_wall_time
+    cpu_time = time.process_time() - start_cpu_time
+
+    peak_memory: Optional[ int ] = None
+    if resource is not None:
+        # kilobytes on Linux, bytes on macOS.
+        peak_memory = resource.getrusage( resource.RUSAGE_SELF ).ru_maxrss * ( 1 if sys.platform == "darwin" else 1024 )
+
+    with open( result_path, "w" ) as file:
+        json.dump( {
+            "exceeded": exceeded,
+            "wall_time": wall_time,
+            "cpu_time": cpu_time,
+            "peak_memory": peak_memory,
+            "registrations": registrations,
+            "error": error,
+        }, file )
+
+if __name__ == "__main__":
+    _import_in_sandbox( sys.argv[ 1 ], sys.argv[ 2 ], int( sys.argv[ 3 ] ), int( sys.argv[ 4 ] ) )
@@ -0,0 +1,242 @@
+__version__ = r"1.0.0"
+
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+import bisect
+import fnmatch
+import hashlib
+import threading
+from pathlib import Path
+from .dynamic_import import ModuleCandidate
+from .plugin_catalog import CatalogEntry, describe_candidates
+from .static_analysis import get_absolute_module_name
+
+MODULE_KEY: str = "module"
+REGISTRATION_ID_KEY: str = "registration_id"
+
+def _hash( key: str ) -> int:
+    # stable across processes, unlike `hash`, so every worker computes the same assignment.
+    return int.from_bytes( hashlib.sha256( key.encode( "utf-8" ) ).digest()[ :8 ], "big" )
+
+class ShardSpec( object ):
+    """
+    Specification of how plugin modules are divided between shards, e.g. one shard per worker process. Modules are assigned by consistent hashing, so
+    changing the shard count only moves about `1 / shard_count` of the modules, unless they match the patterns of an explicit group.
+    """
+
+    def __init__( self, shard_count: int, **kwargs: Dict[ str, Any ] ):
+        """
+        Parameters:
+        `shard_count`: number of shards.
+
+        Keywords:
+        `key`: `module` to hash the absolute module names, or `registration_id` to hash the ID of the first class each module registers, falling back to the
+            module name for modules which register nothing; defaults to `module`.
+        `groups`: dictionary of shard indices to iterables of `fnmatch` patterns of the absolute module names and registration IDs explicitly assigned to the
+            shards; the first matching group wins; defaults to none.
+        `virtual_nodes`: number of points each shard has on the hash ring; more points spread the modules more evenly; defaults to 64.
+        """
+
+        if int( shard_count ) < 1:
+            raise ValueError( f"Invalid shard count: { shard_count }" )
+
+        self._shard_count: int = int( shard_count )
+
+        self._key: str = kwargs.get( "key", MODULE_KEY )
+        if self._key not in ( MODULE_KEY, REGISTRATION_ID_KEY ):
+            raise ValueError( f"Invalid shard key: { self._key }" )
+
+        self._groups: List[ Tuple[ int, Tuple[ str, ... ] ] ] = []
+        for shard_index, patterns in ( kwargs.get( "groups", None ) or {} ).items():
+            if not 0 <= shard_index < self._shard_count:
+                raise ValueError( f"Invalid shard index of a group: { shard_index }" )
+
+            self._groups.append( ( shard_index, ( patterns, ) if isinstance( patterns, str ) else tuple( patterns ) ) )
+
+        virtual_nodes: int = int( kwargs.get( "virtual_nodes", 64 ) )
+        if virtual_nodes < 1:
+            raise ValueError( f"Invalid virtual node count: { virtual_nodes }" )
+
+        ring = sorted( ( _hash( f"shard-{ shard_index }-{ node }" ), shard_index ) for shard_index in range( self._shard_count ) for node in range( virtual_nodes ) )
+        self._ring_hashes: List[ int ] = [ point for point, _ in ring ]
+        self._ring_shards: List[ int ] = [ shard_index for _, shard_index in ring ]
+
+    @property
+    def shard_count( self ) -> int:
+        """
+        The number of shards.
+        """
+
+        return self._shard_count
+
+    @property
+    def key( self ) -> str:
+        """
+        What modules are hashed by: `module` or `registration_id`.
+        """
+
+        return self._key
+
+    def get_hashed_shard( self, key: str ) -> int:
+        """
+        Gets the shard the given key is assigned to on the hash ring.
+        """
+
+        index = bisect.bisect_left( self._ring_hashes, _hash( key ) )
+        return self._ring_shards[ index if index < len( self._ring_shards ) else 0 ]
+
+    def get_shard( self, entry: CatalogEntry ) -> int:
+        """
+        Gets the shard the module of the given catalog entry is assigned to.
+        """
+
+        names: List[ str ] = [ entry.module_name ] + [ registration.qualname for registration in entry.registrations ]
+
+        for shard_index, patterns in self._groups:
+            if any( fnmatch.fnmatchcase( name, pattern ) for name in names for pattern in patterns ):
+                return shard_index
+
+        if self._key == REGISTRATION_ID_KEY and len( entry.registrations ) > 0:
+            return self.get_hashed_shard( entry.registrations[ 0 ].qualname )
+        else:
+            return self.get_hashed_shard( entry.module_name )
+
+class ShardRouter( object ):
+    """
+    Maps registration IDs to the shards which import and register their classes.
+    """
+
+    def __init__( self, shard_count: int, shards: Mapping[ Any, int ] ):
+        """
+        Parameters:
+        `shard_count`: number of shards.
+        `shards`: dictionary of registration IDs to the indices of the shards owning them.
+        """
+
+        self._shard_count: int = shard_count
+        self._shards: Dict[ Any, int ] = dict( shards )
+
+    @property
+    def shard_count( self ) -> int:
+        """
+        The number of shards.
+        """
+
+        return self._shard_count
+
+    @property
+    def registration_ids( self ) -> Tuple[ Any, ... ]:
+        """
+        The routed registration IDs.
+        """
+
+        return tuple( self._shards )
+
+    def get_shard( self, registration_id: Any ) -> int:
+        """
+        Gets the index of the shard owning the class registered with the given ID.
+
+        Raises:
+        `KeyError`: if no module of the catalog registers a class with the ID.
+        """
+
+        try:
+            return self._shards[ registration_id ]
+        except KeyError:
+            raise KeyError( f"No plugin module registers a class with ID '{ registration_id }'." )
+
+    def get_registration_ids( self, shard_index: int ) -> Tuple[ Any, ... ]:
+        """
+        Gets the IDs of the classes the given shard owns.
+        """
+
+        return tuple( registration_id for registration_id, index in self._shards.items() if index == shard_index )
+
+class PluginShard( object ):
+    """
+    One shard of the plugin modules, such as the share of one worker process. Every module is still discovered and analyzed statically, so the shard's
+    router can map every registration ID to its shard, but only the shard's own modules are imported.
+    """
+
+    def __init__( self, spec: ShardSpec, shard_index: int, **kwargs: Dict[ str, Any ] ):
+        """
+        Parameters:
+        `spec`: specification of how the modules are divided; must be the same in every worker.
+        `shard_index`: index of this shard.
+
+        Keywords:
+        `registration_decorators`: names of the registration decorators whose decorated classes are found by static analysis; required.
+        `cache_path`: path of a JSON file the static analysis is cached in, as by `plugin_catalog.build_catalog`; defaults to None.
+
+        Notes:
+            - Registration IDs are the classes' qualified names, matching the default IDs of `register_class`.
+            - Modules which register nothing statically are assigned by module name, so a module which registers classes dynamically is still imported by
+              exactly one shard; the router cannot route its classes.
+        """
+
+        if spec is None:
+            raise ValueError( "Shard specification cannot be None." )
+        elif not 0 <= shard_index < spec.shard_count:
+            raise ValueError( f"Invalid shard index: { shard_index }" )
+
+        decorator_names = kwargs.get( "registration_decorators", None )
+        if decorator_names is None:
+            raise ValueError( "Registration decorators are required to shard plugins." )
+        elif isinstance( decorator_names, str ):
+            decorator_names = [ decorator_names ]
+
+        self._spec: ShardSpec = spec
+        self._shard_index: int = shard_index
+        self._decorator_names: List[ str ] = list( decorator_names )
+        self._cache_path: Union[ str, Path, None ] = kwargs.get( "cache_path", None )
+        self._lock: threading.Lock = threading.Lock()
+        self._shards: Dict[ Any, int ] = {}
+
+    @property
+    def spec( self ) -> ShardSpec:
+        """
+        The specification of how the modules are divided.
+        """
+
+        return self._spec
+
+    @property
+    def shard_index( self ) -> int:
+        """
+        The index of this shard.
+        """
+
+        return self._shard_index
+
+    @property
+    def router( self ) -> ShardRouter:
+        """
+        The router of the registration IDs found by the latest filtering.
+        """
+
+        with self._lock:
+            return ShardRouter( self._spec.shard_count, self._shards )
+
+    def filter_candidates( self, candidates: Iterable[ ModuleCandidate ], relative_import_package_name: Optional[ str ] ) -> List[ ModuleCandidate ]:
+        """
+        Gets the given candidates which belong to this shard, in order, recording the shard of every registration ID for the router.
+        """
+
+        candidates_by_name: Dict[ str, ModuleCandidate ] = { get_absolute_module_name( c.module_name, relative_import_package_name ): c for c in candidates }
+        kept: List[ ModuleCandidate ] = []
+        shards: Dict[ Any, int ] = {}
+
+        for entry in describe_candidates( candidates_by_name.values(), relative_import_package_name, self._decorator_names, self._cache_path ):
+            shard_index = self._spec.get_shard( entry )
+
+            if shard_index == self._shard_index:
+                kept.append( candidates_by_name[ entry.module_name ] )
+
+            for registration in entry.registrations:
+                if registration.enabled is not False:
+                    shards.setdefault( registration.qualname, shard_index )
+
+        with self._lock:
+            self._shards.update( shards )
+
+        return kept
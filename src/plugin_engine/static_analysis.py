@@ -0,0 +1,315 @@
+__version__ = r"1.0.0"
+
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple, Union
+
+import ast
+import itertools
+from pathlib import Path
+
+if TYPE_CHECKING:
+    from .dynamic_import import ModuleCandidate
+
+class ImportCycleError( ImportError ):
+    """
+    Raised when module files statically import each other in a cycle.
+    """
+
+    def __init__( self, cycle: List[ str ] ):
+        super().__init__( f"The following modules import each other in a cycle: { ' -> '.join( cycle ) }" )
+        self.cycle = cycle
+
+def get_absolute_module_name( module_name: str, relative_import_package_name: Optional[ str ] ) -> str:
+    """
+    Gets the absolute name of the given module name.
+
+    Parameters:
+    `module_name`: module name, which is relative if it starts with a period.
+    `relative_import_package_name`: package the module name is relative to; None indicates the module name is absolute.
+    """
+
+    if module_name.startswith( "." ):
+        if relative_import_package_name is None:
+            module_name = module_name.lstrip( "." )
+        else:
+            module_name = f"{ relative_import_package_name }{ module_name }"
+
+    return module_name
+
+def parse_module( source_path: Union[ str, Path ] ) -> Optional[ ast.Module ]:
+    """
+    Parses the given source file without executing it.
+
+    Returns:
+    The parsed module, or None if the file cannot be read or parsed.
+    """
+
+    try:
+        with open( source_path, "rb" ) as source_file:
+            source = source_file.read()
+
+        return ast.parse( source, filename = str( source_path ) )
+    except ( OSError, SyntaxError, ValueError ):
+        return None
+
+def _is_type_checking_test( test: ast.expr ) -> bool:
+    """
+    Indicates if the given condition is `TYPE_CHECKING` or `typing.TYPE_CHECKING`, which is false at runtime.
+    """
+
+    if isinstance( test, ast.Name ):
+        return test.id == "TYPE_CHECKING"
+    elif isinstance( test, ast.Attribute ):
+        return test.attr == "TYPE_CHECKING" and isinstance( test.value, ast.Name ) and test.value.id in ( "typing", "typing_extensions" )
+    else:
+        return False
+
+def _iter_import_time_statements( statements: Iterable[ ast.stmt ] ) -> Iterator[ ast.stmt ]:
+    """
+    Iterates the statements executed when the module is imported; function bodies and `if TYPE_CHECKING:` bodies are skipped as they are not executed at
+    import time.
+    """
+
+    for statement in statements:
+        yield statement
+
+        if isinstance( statement, ( ast.FunctionDef, ast.AsyncFunctionDef ) ):
+            continue
+        elif isinstance( statement, ast.If ) and _is_type_checking_test( statement.test ):
+            # typing-only imports may import each other in a cycle.
+            yield from _iter_import_time_statements( statement.orelse )
+            continue
+
+        for field_name in ( "body", "orelse", "finalbody" ):
+            yield from _iter_import_time_statements( getattr( statement, field_name, [] ) )
+
+        for handler in getattr( statement, "handlers", [] ):
+            yield from _iter_import_time_statements( handler.body )
+
+def get_module_imports( module_tree: ast.Module, module_name: str, is_package: bool = False ) -> Set[ str ]:
+    """
+    Gets the absolute names of the modules the given module imports when it is executed. Both a `from` import's module and each of its imported names are
+    included, as an imported name may be a submodule.
+
+    Parameters:
+    `module_tree`: parsed module.
+    `module_name`: absolute name of the module.
+    `is_package`: indicates if the module is a package's `__init__` module.
+    """
+
+    package_parts: List[ str ] = module_name.split( "." )
+    if not is_package:
+        package_parts = package_parts[ :-1 ]
+
+    imports: Set[ str ] = set()
+
+    for statement in _iter_import_time_statements( module_tree.body ):
+        if isinstance( statement, ast.Import ):
+            for alias in statement.names:
+                imports.add( alias.name )
+        elif isinstance( statement, ast.ImportFrom ):
+            if statement.level > 0:
+                if statement.level - 1 > len( package_parts ):
+                    continue
+
+                base_parts = package_parts[ :len( package_parts ) - ( statement.level - 1 ) ]
+                if statement.module is not None:
+                    base_parts = base_parts + statement.module.split( "." )
+                base_name = ".".join( base_parts )
+            else:
+                base_name = statement.module
+
+            if base_name:
+                imports.add( base_name )
+
+                for alias in statement.names:
+                    if alias.name != "*":
+                        imports.add( f"{ base_name }.{ alias.name }" )
+
+    # importing a submodule imports each of its parent packages first.
+    for name in list( imports ):
+        parts = name.split( "." )
+        for index in range( 1, len( parts ) ):
+            imports.add( ".".join( parts[ :index ] ) )
+
+    return imports
+
+def build_dependency_graph( candidates: Iterable[ "ModuleCandidate" ], relative_import_package_name: Optional[ str ], additional_module_names: Iterable[ str ] = () ) -> Dict[ str, List[ str ] ]:
+    """
+    Builds the graph of the static imports between the given module candidates. Imports of modules which are not candidates are not included.
+
+    Parameters:
+    `candidates`: module candidates to build the graph of.
+    `relative_import_package_name`: package the candidate module names are relative to.
+    `additional_module_names`: absolute names of modules which have no candidate, such as modules whose files were removed, whose imports by the candidates are
+        included.
+
+    Returns:
+    Dictionary keyed by absolute module name whose values are the absolute names of the candidates the module imports, in discovery order.
+    """
+
+    candidates = list( candidates )
+    module_names: List[ str ] = [ get_absolute_module_name( candidate.module_name, relative_import_package_name ) for candidate in candidates ]
+    discovery_indices: Dict[ str, int ] = { name: index for index, name in enumerate( itertools.chain( module_names, additional_module_names ) ) }
+
+    graph: Dict[ str, List[ str ] ] = {}
+
+    for module_name, candidate in zip( module_names, candidates ):
+        module_tree = parse_module( candidate.path )
+
+        if module_tree is not None:
+            imports = get_module_imports( module_tree, module_name )
+            dependencies = imports.intersection( discovery_indices )
+            dependencies.discard( module_name )
+            graph[ module_name ] = sorted( dependencies, key = discovery_indices.__getitem__ )
+        else:
+            graph[ module_name ] = []
+
+    return graph
+
+def sort_by_dependencies( candidates: Iterable[ "ModuleCandidate" ], relative_import_package_name: Optional[ str ] ) -> List[ "ModuleCandidate" ]:
+    """
+    Orders the given module candidates so each candidate comes after the candidates it statically imports. Candidates without an ordering constraint between
+    them keep their discovery order.
+
+    Parameters:
+    `candidates`: module candidates to order.
+    `relative_import_package_name`: package the candidate module names are relative to.
+
+    Returns:
+    List of the candidates in import order.
+
+    Raises:
+    `ImportCycleError`: if candidates import each other in a cycle.
+    """
+
+    candidates = list( candidates )
+    graph = build_dependency_graph( candidates, relative_import_package_name )
+    candidates_by_name: Dict[ str, "ModuleCandidate" ] = { get_absolute_module_name( c.module_name, relative_import_package_name ): c for c in candidates }
+
+    ordered: List[ "ModuleCandidate" ] = []
+    visited: Set[ str ] = set()
+
+    for root_name in candidates_by_name:
+        if root_name in visited:
+            continue
+
+        # iterative depth-first traversal; the path holds the modules currently being visited so a back edge identifies a cycle.
+        path: List[ str ] = [ root_name ]
+        path_set: Set[ str ] = { root_name }
+        pending_dependencies: List[ Iterator[ str ] ] = [ iter( graph[ root_name ] ) ]
+
+        while len( path ) > 0:
+            dependency = next( pending_dependencies[ -1 ], None )
+
+            if dependency is None:
+                module_name = path.pop()
+                path_set.remove( module_name )
+                pending_dependencies.pop()
+
+                visited.add( module_name )
+                ordered.append( candidates_by_name[ module_name ] )
+            elif dependency in path_set:
+                raise ImportCycleError( path[ path.index( dependency ): ] + [ dependency ] )
+            elif dependency not in visited:
+                path.append( dependency )
+                path_set.add( dependency )
+                pending_dependencies.append( iter( graph[ dependency ] ) )
+
+    return ordered
+
+class StaticRegistration( NamedTuple ):
+    """
+    A decorated class registration found by static analysis of a module file.
+
+    Fields:
+    `qualname`: qualified name of the decorated class.
+    `decorator_name`: name of the registration decorator.
+    `keywords`: literal keyword arguments of the decorator call.
+    `dynamic_keyword_names`: names of the keyword arguments of the decorator call whose values are not literals.
+    `parent_class_names`: dotted names of the class' bases, as written in the source.
+    `line_number`: line number of the class definition.
+    """
+
+    qualname: str
+    decorator_name: str
+    keywords: Dict[ str, Any ]
+    dynamic_keyword_names: Tuple[ str, ... ]
+    parent_class_names: Tuple[ str, ... ]
+    line_number: int
+
+    @property
+    def enabled( self ) -> Optional[ bool ]:
+        """
+        The statically known `enabled` keyword argument; `True` if not given, or None if it is not a literal.
+        """
+
+        if "enabled" in self.keywords:
+            return bool( self.keywords[ "enabled" ] )
+        elif "enabled" in self.dynamic_keyword_names:
+            return None
+        else:
+            return True
+
+def _get_dotted_name( node: ast.expr ) -> Optional[ str ]:
+    if isinstance( node, ast.Name ):
+        return node.id
+    elif isinstance( node, ast.Attribute ):
+        value_name = _get_dotted_name( node.value )
+        return None if value_name is None else f"{ value_name }.{ node.attr }"
+    else:
+        return None
+
+def _iter_class_definitions( statements: Iterable[ ast.stmt ], qualname_prefix: str = "" ) -> Iterator[ Tuple[ str, ast.ClassDef ] ]:
+    for statement in statements:
+        if isinstance( statement, ast.ClassDef ):
+            qualname = f"{ qualname_prefix }{ statement.name }"
+            yield qualname, statement
+            yield from _iter_class_definitions( statement.body, f"{ qualname }." )
+        elif not isinstance( statement, ( ast.FunctionDef, ast.AsyncFunctionDef ) ):
+            for field_name in ( "body", "orelse", "finalbody" ):
+                yield from _iter_class_definitions( getattr( statement, field_name, [] ), qualname_prefix )
+
+            for handler in getattr( statement, "handlers", [] ):
+                yield from _iter_class_definitions( handler.body, qualname_prefix )
+
+def get_class_registrations( module_tree: ast.Module, decorator_names: Iterable[ str ] ) -> List[ StaticRegistration ]:
+    """
+    Gets the classes of the given module which are decorated with one of the given registration decorators, without executing the module.
+
+    Parameters:
+    `module_tree`: parsed module.
+    `decorator_names`: names of the registration decorators; a decorator matches if its name, or the last part of its dotted name, is one of the names.
+
+    Returns:
+    List of the registrations, in source order.
+    """
+
+    decorator_names = set( decorator_names )
+    registrations: List[ StaticRegistration ] = []
+
+    for qualname, class_definition in _iter_class_definitions( module_tree.body ):
+        for decorator in class_definition.decorator_list:
+            decorator_call = decorator if isinstance( decorator, ast.Call ) else None
+            decorator_name = _get_dotted_name( decorator_call.func if decorator_call is not None else decorator )
+
+            if decorator_name is None or ( decorator_name not in decorator_names and decorator_name.rsplit( ".", 1 )[ -1 ] not in decorator_names ):
+                continue
+
+            keywords: Dict[ str, Any ] = {}
+            dynamic_keywords: List[ str ] = []
+
+            if decorator_call is not None:
+                for keyword in decorator_call.keywords:
+                    if keyword.arg is None:
+                        continue
+
+                    try:
+                        keywords[ keyword.arg ] = ast.literal_eval( keyword.value )
+                    except ( ValueError, TypeError, SyntaxError ):
+                        dynamic_keywords.append( keyword.arg )
+
+            parent_class_names = tuple( name for name in map( _get_dotted_name, class_definition.bases ) if name is not None )
+
+            registrations.append( StaticRegistration( qualname, decorator_name, keywords, tuple( dynamic_keywords ), parent_class_names, class_definition.lineno ) )
+
+    return registrations
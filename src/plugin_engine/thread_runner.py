@@ -0,0 +1,89 @@
+__version__ = r"1.0.0"
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Type
+
+import sys
+import threading
+from .output_capture import capture_output
+
+def execute_concurrently( registered_classes: Mapping[ Any, Type ], args: Sequence[ Any ], **kwargs: Dict[ str, Any ] ) -> List[ Tuple[ Any, Any ] ]:
+    """
+    Executes every registered class with the given arguments concurrently on a thread pool. Each execution writes into its own buffers, which are written
+    out in registration order with one write per stream once the executions finish.
+
+    Parameters:
+    `registered_classes`: mapping of registration IDs to the classes to execute, such as a registry snapshot.
+    `args`: positional arguments of each execution.
+
+    Keywords:
+    `worker_count`: number of threads; defaults to the `ThreadPoolExecutor` default.
+    `instance_kwargs`: keywords each class is instantiated with; defaults to none.
+    `method_name`: name of the method called on each instance; defaults to `execute`.
+    `short_circuit`: indicates if an execution returning `False` stops further execution, as if the classes ran one after another; defaults to `True`.
+        Executions after it in registration order which have not started are skipped, and the output of those which already ran is discarded.
+
+    Returns:
+    List of the registration ID and result of each execution in registration order; the result is None for skipped executions.
+
+    Raises:
+    The first exception raised by an execution, in registration order, after the output of the executions before it is written out.
+    """
+
+    instance_kwargs: Dict[ str, Any ] = dict( kwargs.get( "instance_kwargs", None ) or {} )
+    method_name: str = kwargs.get( "method_name", "execute" )
+    short_circuit: bool = bool( kwargs.get( "short_circuit", True ) )
+    registration_ids: List[ Any ] = list( registered_classes )
+
+    # index of the first execution, in registration order, which returned `False` or raised.
+    stop_index: List[ int ] = [ len( registration_ids ) ]
+    stop_lock = threading.Lock()
+
+    def execute( index: int ) -> Tuple[ Any, Optional[ BaseException ], str, str ]:
+        if index > stop_index[ 0 ]:
+            return None, None, "", ""
+
+        with capture_output() as ( stdout_buffer, stderr_buffer ):
+            try:
+                result = getattr( registered_classes[ registration_ids[ index ] ]( **instance_kwargs ), method_name )( *args )
+            except BaseException as e:
+                with stop_lock:
+                    stop_index[ 0 ] = min( stop_index[ 0 ], index )
+
+                return None, e, stdout_buffer.getvalue(), stderr_buffer.getvalue()
+
+        if short_circuit and result is False:
+            with stop_lock:
+                stop_index[ 0 ] = min( stop_index[ 0 ], index )
+
+        return result, None, stdout_buffer.getvalue(), stderr_buffer.getvalue()
+
+    with ThreadPoolExecutor( max_workers = kwargs.get( "worker_count", None ) ) as executor:
+        outcomes = list( executor.map( execute, range( len( registration_ids ) ) ) )
+
+    results: List[ Tuple[ Any, Any ] ] = []
+    stdout_parts: List[ str ] = []
+    stderr_parts: List[ str ] = []
+    error: Optional[ BaseException ] = None
+
+    for index, ( result, exception, stdout_text, stderr_text ) in enumerate( outcomes ):
+        if index > stop_index[ 0 ]:
+            result = None
+        else:
+            stdout_parts.append( stdout_text )
+            stderr_parts.append( stderr_text )
+
+            if exception is not None and error is None:
+                error = exception
+
+        results.append( ( registration_ids[ index ], result ) )
+
+    sys.stdout.write( "".join( stdout_parts ) )
+    sys.stdout.flush()
+    sys.stderr.write( "".join( stderr_parts ) )
+    sys.stderr.flush()
+
+    if error is not None:
+        raise error
+
+    return results
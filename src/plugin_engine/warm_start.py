@@ -0,0 +1,201 @@
+__version__ = r"1.0.0"
+
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple, Type, Union
+
+import ast
+import json
+import os
+import time
+from pathlib import Path
+from .file_state import FileState, get_file_state
+from .lazy_registration import LazyClass, _register_stand_ins
+
+SNAPSHOT_FORMAT_VERSION: int = 1
+
+# Files and directories modified within this many nanoseconds of the snapshot are not trusted by modification time alone; a change made in the same timestamp
+# granule would otherwise go unnoticed.
+_RACY_INTERVAL_NS: int = 2 * 1000 * 1000 * 1000
+
+class SnapshotRegistration( NamedTuple ):
+    """
+    A registration recorded by a warm start snapshot.
+
+    Fields:
+    `registration_id`: ID the class is registered with.
+    `module_name`: absolute name of the class' module.
+    `qualname`: qualified name of the class.
+    `tags`: tags the class is registered with in a `PluginRegistry`.
+    """
+
+    registration_id: Any
+    module_name: str
+    qualname: str
+    tags: Tuple[ Any, ... ] = ()
+
+class WarmStartSnapshot( NamedTuple ):
+    """
+    The registrations made by importing a plugin package, with the state of the package's module files and directories they were made from.
+
+    Fields:
+    `parameters`: discovery parameters the snapshot was written with.
+    `directories`: signatures of the directories which were searched for module files, keyed by path; a signature is None if it was not trusted.
+    `files`: states of the discovered module files.
+    `registrations`: registrations made by the modules.
+    """
+
+    parameters: Dict[ str, Any ]
+    directories: Dict[ str, Optional[ Tuple[ int, int ] ] ]
+    files: Tuple[ FileState, ... ]
+    registrations: Tuple[ SnapshotRegistration, ... ]
+
+def get_directory_signature( directory_path: Union[ str, Path ] ) -> Optional[ Tuple[ int, int ] ]:
+    """
+    Gets the modification time and inode of the given directory, which change when a file is added to, removed from or renamed in it.
+
+    Returns:
+    The signature, or None if the directory cannot be read.
+    """
+
+    try:
+        stat_result = os.stat( directory_path )
+    except OSError:
+        return None
+    else:
+        return ( stat_result.st_mtime_ns, stat_result.st_ino )
+
+def _is_trusted( mtime_ns: int, now_ns: int ) -> bool:
+    return mtime_ns >= 0 and now_ns - mtime_ns >= _RACY_INTERVAL_NS
+
+def count_untrusted_entries( snapshot: WarmStartSnapshot ) -> int:
+    """
+    Counts the directories and module files of the given snapshot which are not trusted by modification time: those it recorded as untrusted, and those
+    modified too recently to be trusted if it were written now. Validating the snapshot lists every directory if any directory is untrusted, and hashes the
+    untrusted files.
+    """
+
+    now_ns = int( time.time() * 1e9 )
+
+    return ( sum( 1 for signature in snapshot.directories.values() if signature is None or not _is_trusted( signature[ 0 ], now_ns ) )
+             + sum( 1 for state in snapshot.files if not _is_trusted( state.mtime_ns, now_ns ) ) )
+
+def _literal_repr( value: Any ) -> str:
+    representation = repr( value )
+
+    try:
+        is_literal = ast.literal_eval( representation ) == value
+    except ( ValueError, TypeError, SyntaxError, MemoryError, RecursionError ):
+        is_literal = False
+
+    if not is_literal:
+        raise ValueError( f"'{ representation }' cannot be recorded in a warm start snapshot; registration IDs and tags must be literals." )
+
+    return representation
+
+def write_warm_start_snapshot( snapshot_path: Union[ str, Path ], snapshot: WarmStartSnapshot ):
+    """
+    Writes the given snapshot to a compact JSON file, replacing it atomically. Directories and files modified within two seconds of the write are recorded as
+    untrusted, so they are listed or hashed when the snapshot is validated.
+
+    Raises:
+    `ValueError`: if a registration ID or tag is not a literal, such as a string or a number.
+    """
+
+    now_ns = int( time.time() * 1e9 )
+
+    content = {
+        "version": SNAPSHOT_FORMAT_VERSION,
+        "parameters": snapshot.parameters,
+        "directories": { path: ( list( signature ) if signature is not None and _is_trusted( signature[ 0 ], now_ns ) else None ) for path, signature in snapshot.directories.items() },
+        # a racy modification time is recorded as unknown, so the file is hashed when the snapshot is validated.
+        "files": [ [ state.path, state.mtime_ns if _is_trusted( state.mtime_ns, now_ns ) else -1, state.size, state.content_hash ] for state in snapshot.files ],
+        "registrations": [ [ _literal_repr( registration.registration_id ), registration.module_name, registration.qualname, _literal_repr( tuple( registration.tags ) ) ]
+                           for registration in snapshot.registrations ],
+    }
+
+    snapshot_path = Path( snapshot_path )
+    snapshot_path.parent.mkdir( parents = True, exist_ok = True )
+    temporary_path = snapshot_path.with_name( f"{ snapshot_path.name }.{ os.getpid() }.tmp" )
+    with open( temporary_path, "w", encoding = "utf-8" ) as snapshot_file:
+        json.dump( content, snapshot_file, separators = ( ",", ":" ) )
+    os.replace( temporary_path, snapshot_path )
+
+def read_warm_start_snapshot( snapshot_path: Union[ str, Path ] ) -> Optional[ WarmStartSnapshot ]:
+    """
+    Reads a snapshot written by `write_warm_start_snapshot`.
+
+    Returns:
+    The snapshot, or None if the file is missing, unreadable or incompatible.
+    """
+
+    try:
+        with open( snapshot_path, "r", encoding = "utf-8" ) as snapshot_file:
+            content = json.load( snapshot_file )
+    except ( OSError, ValueError ):
+        return None
+
+    if not isinstance( content, dict ) or content.get( "version", None ) != SNAPSHOT_FORMAT_VERSION:
+        return None
+
+    try:
+        return WarmStartSnapshot(
+            content[ "parameters" ],
+            { path: ( tuple( signature ) if signature is not None else None ) for path, signature in content[ "directories" ].items() },
+            tuple( FileState( path, mtime_ns, size, content_hash ) for path, mtime_ns, size, content_hash in content[ "files" ] ),
+            tuple( SnapshotRegistration( ast.literal_eval( registration_id ), module_name, qualname, ast.literal_eval( tags ) )
+                   for registration_id, module_name, qualname, tags in content[ "registrations" ] ),
+        )
+    except ( KeyError, TypeError, ValueError, SyntaxError ):
+        return None
+
+def is_snapshot_current( snapshot: WarmStartSnapshot, parameters: Dict[ str, Any ], discover_paths: Callable[ [], Iterable[ str ] ] ) -> bool:
+    """
+    Indicates if the given snapshot still describes the plugin package: it was written with the given parameters, no module file was added or removed, and
+    the content hash of every module file is unchanged.
+
+    Parameters:
+    `snapshot`: snapshot to validate.
+    `parameters`: discovery parameters of the current import.
+    `discover_paths`: callable discovering the paths of the current module files; only called if a directory signature changed or was not trusted.
+
+    Notes:
+        - A file is only hashed when its modification time or size differs from the snapshot's.
+    """
+
+    if snapshot.parameters != parameters:
+        return False
+
+    if any( signature is None or get_directory_signature( path ) != signature for path, signature in snapshot.directories.items() ):
+        # a directory changed, e.g. a non-module file was added; the snapshot is still current if the module files are the same.
+        if set( map( os.fspath, discover_paths() ) ) != set( state.path for state in snapshot.files ):
+            return False
+
+    for state in snapshot.files:
+        try:
+            if not get_file_state( state.path, state ).has_same_content( state ):
+                return False
+        except OSError:
+            return False
+
+    return True
+
+def register_snapshot_classes( snapshot: WarmStartSnapshot, registration_target: Dict[ Any, Type ], **kwargs: Dict[ str, Any ] ) -> List[ LazyClass ]:
+    """
+    Registers stand-ins for the registrations of the given snapshot into the given registration target, with their tags.
+
+    Keywords:
+    `registration_target_lock`: lock controlling access to the registration target; defaults to None, indicating there is no lock.
+
+    Returns:
+    List of the registered stand-ins.
+    """
+
+    if registration_target is None:
+        raise ValueError( "Registration target dictionary cannot be None." )
+
+    lock = kwargs.get( "registration_target_lock", None )
+    lazy_classes: List[ LazyClass ] = [ LazyClass( registration.registration_id, registration.module_name, registration.qualname, registration_target = registration_target,
+                                                   registration_target_lock = lock ) for registration in snapshot.registrations ]
+
+    _register_stand_ins( lazy_classes, registration_target, lock, { registration.registration_id: registration.tags for registration in snapshot.registrations } )
+
+    return lazy_classes
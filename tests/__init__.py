@@ -0,0 +1,3 @@
+"""
+Tests of the plugin engine, run from the repository root with `python -m pytest`.
+"""
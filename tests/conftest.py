@@ -0,0 +1,61 @@
+import importlib
+import itertools
+import os
+import sys
+import textwrap
+from pathlib import Path
+from types import ModuleType
+from typing import Optional
+
+import pytest
+
+_package_numbers = itertools.count()
+
+class PluginPackage( object ):
+    """
+    Generated package whose plugin modules register their classes into the package's `registry` dictionary.
+    """
+
+    def __init__( self, root: Path ):
+        self.name: str = f"generated_plugins_{ os.getpid() }_{ next( _package_numbers ) }"
+        self.directory: Path = root / self.name
+        self.directory.mkdir()
+        ( self.directory / "__init__.py" ).write_text( "registry = {}\n", encoding = "utf-8" )
+
+    def write( self, relative_path: str, source: str ) -> Path:
+        """
+        Writes a file of the package, creating its directories.
+        """
+
+        path = self.directory / relative_path
+        path.parent.mkdir( parents = True, exist_ok = True )
+        path.write_text( textwrap.dedent( source ), encoding = "utf-8" )
+        return path
+
+    def write_plugin( self, relative_path: str, class_name: str, body: str = "pass", imports: str = "" ) -> Path:
+        """
+        Writes a plugin module which registers one class with the class name as its ID.
+        """
+
+        return self.write( relative_path, f"from plugin_engine.class_registration import register_class\nfrom { self.name } import registry\n{ imports }\n\n"
+                                          f"class { class_name }( object ):\n    { body }\n\nregister_class( { class_name }, registry )\n" )
+
+    def import_package( self ) -> ModuleType:
+        importlib.invalidate_caches()
+        return importlib.import_module( self.name )
+
+    @property
+    def registry( self ) -> Optional[ dict ]:
+        package = sys.modules.get( self.name, None )
+        return package.registry if package is not None else None
+
+@pytest.fixture
+def plugin_package( tmp_path, monkeypatch ) -> PluginPackage:
+    monkeypatch.syspath_prepend( str( tmp_path ) )
+    package = PluginPackage( tmp_path )
+
+    yield package
+
+    for name in list( sys.modules ):
+        if name == package.name or name.startswith( f"{ package.name }." ):
+            del sys.modules[ name ]
@@ -0,0 +1,108 @@
+import threading
+
+import pytest
+from plugin_engine.class_registration import RegistrationError, buffered_registrations, register_class, register_classes
+from plugin_engine.plugin_registry import PluginRegistry
+
+class _Plugin( object ):
+    pass
+
+class _First( _Plugin ):
+    pass
+
+class _Second( _Plugin ):
+    pass
+
+class _Unrelated( object ):
+    pass
+
+def test_register_classes_registers_every_class():
+    registration_target = {}
+
+    registered = register_classes( [ _First, _Second ], registration_target, _Plugin )
+
+    assert registered == [ _First, _Second ]
+    assert registration_target == { "_First": _First, "_Second": _Second }
+
+def test_register_classes_reports_every_error_and_registers_nothing():
+    registration_target = { "_First": _Unrelated }
+
+    with pytest.raises( RegistrationError ) as error_info:
+        register_classes( [ _First, _Second, _Unrelated ], registration_target, _Plugin )
+
+    assert len( error_info.value.errors ) == 2
+    assert registration_target == { "_First": _Unrelated }
+
+def test_register_classes_skips_disabled_and_quiet_mismatches():
+    registration_target = {}
+
+    registered = register_classes( [ _First, ( _Second, { "enabled": False } ), ( _Unrelated, { "quiet_ancestory_mismatch": True } ) ], registration_target, _Plugin )
+
+    assert registered == [ _First ]
+    assert list( registration_target ) == [ "_First" ]
+
+def test_register_classes_records_tags_in_plugin_registry():
+    registry = PluginRegistry()
+
+    register_classes( [ ( _First, { "tags": [ "fast" ] } ), _Second ], registry, _Plugin )
+
+    assert registry.get_by_tag( "fast" ) == { "_First": _First }
+
+def test_register_classes_acquires_lock():
+    lock = threading.Lock()
+    registration_target = {}
+
+    register_classes( [ _First ], registration_target, registration_target_lock = lock )
+
+    assert "_First" in registration_target
+    assert not lock.locked()
+
+def test_buffered_registrations_commit_on_exit():
+    registration_target = {}
+
+    with buffered_registrations() as registration_buffer:
+        assert register_class( _First, registration_target, _Plugin )
+        assert register_class( _Second, registration_target, _Plugin )
+        assert len( registration_buffer ) == 2
+        assert registration_target == {}
+
+    assert registration_target == { "_First": _First, "_Second": _Second }
+
+def test_buffered_registrations_raise_registration_error_on_exit():
+    registration_target = {}
+
+    with pytest.raises( RegistrationError ):
+        with buffered_registrations():
+            register_class( _First, registration_target, _Plugin )
+            register_class( _Unrelated, registration_target, _Plugin )
+
+    assert registration_target == {}
+
+def test_buffered_registrations_discarded_on_exception():
+    registration_target = { "_First": _Unrelated }
+
+    # the buffered registrations would fail validation; the original exception must not be replaced by a `RegistrationError`.
+    with pytest.raises( ImportError ):
+        with buffered_registrations():
+            register_class( _First, registration_target, _Plugin )
+            register_class( _Second, registration_target, _Plugin )
+            raise ImportError( "plugin failed to import" )
+
+    assert registration_target == { "_First": _Unrelated }
+
+    # a later registration is not buffered.
+    register_class( _Second, registration_target, _Plugin )
+    assert registration_target[ "_Second" ] is _Second
+
+def test_nested_buffered_registrations_commit_separately():
+    registration_target = {}
+
+    with buffered_registrations():
+        register_class( _First, registration_target )
+
+        with buffered_registrations():
+            register_class( _Second, registration_target )
+
+        assert registration_target == { "_Second": _Second }
+
+    assert registration_target == { "_First": _First, "_Second": _Second }
@@ -0,0 +1,24 @@
+from plugin_engine.dynamic_import import discover_modules
+
+def _write_tree( plugin_package ):
+    for path in ( "a.py", "b.py", "ignored.txt", ".hidden.py", "group/c.py", "group/inner/d.py", "group/inner/e.py", "other/f.py", "other/empty/README" ):
+        plugin_package.write( path, "" )
+
+def test_concurrent_discovery_matches_serial_discovery( plugin_package ):
+    _write_tree( plugin_package )
+
+    serial = discover_modules( plugin_package.directory, ".py", recursive = True )
+    concurrent = discover_modules( plugin_package.directory, ".py", recursive = True, discovery_workers = 4 )
+
+    assert concurrent == serial
+    assert sorted( candidate.module_name for candidate in serial ) == [ ".a", ".b", ".group.c", ".group.inner.d", ".group.inner.e", ".other.f" ]
+
+def test_concurrent_discovery_is_stable_across_runs( plugin_package ):
+    _write_tree( plugin_package )
+    for index in range( 20 ):
+        plugin_package.write( f"group/many_{ index }/plugin.py", "" )
+
+    runs = [ discover_modules( plugin_package.directory, ".py", recursive = True, discovery_workers = 8 ) for _ in range( 5 ) ]
+
+    assert all( run == runs[ 0 ] for run in runs )
+    assert runs[ 0 ] == discover_modules( plugin_package.directory, ".py", recursive = True )
@@ -0,0 +1,77 @@
+import os
+import time
+
+from plugin_engine.discovery_manifest import DiscoveryManifest
+from plugin_engine.dynamic_import import discover_modules
+
+def _age( directory, seconds: float = 60 ):
+    # backdates the directories, so their signatures are trusted.
+    timestamp = time.time() - seconds
+    for root, _, _ in os.walk( directory ):
+        os.utime( root, ( timestamp, timestamp ) )
+
+def _discover( plugin_package, manifest_path ):
+    manifest = DiscoveryManifest( manifest_path )
+    candidates = discover_modules( plugin_package.directory, ".py", recursive = True, discovery_manifest = manifest )
+    return sorted( candidate.module_name for candidate in candidates ), manifest
+
+def _write_tree( plugin_package ):
+    plugin_package.write( "a.py", "" )
+    plugin_package.write( "group/b.py", "" )
+    _age( plugin_package.directory )
+
+def test_unchanged_directories_are_reused( plugin_package, tmp_path ):
+    _write_tree( plugin_package )
+    first, first_manifest = _discover( plugin_package, tmp_path / "manifest.json" )
+
+    second, second_manifest = _discover( plugin_package, tmp_path / "manifest.json" )
+
+    assert first == second == [ ".a", ".group.b" ]
+    assert first_manifest.reused_directory_count == 0
+    assert second_manifest.scanned_directory_count == 0
+    assert second_manifest.reused_directory_count == first_manifest.scanned_directory_count
+
+def test_added_and_removed_files_are_rescanned( plugin_package, tmp_path ):
+    _write_tree( plugin_package )
+    _discover( plugin_package, tmp_path / "manifest.json" )
+    plugin_package.write( "group/c.py", "" )
+    ( plugin_package.directory / "a.py" ).unlink()
+
+    candidates, manifest = _discover( plugin_package, tmp_path / "manifest.json" )
+
+    assert candidates == [ ".group.b", ".group.c" ]
+    assert manifest.scanned_directory_count == 2
+
+def test_recently_modified_directories_are_rescanned( plugin_package, tmp_path ):
+    plugin_package.write( "a.py", "" )
+    _discover( plugin_package, tmp_path / "manifest.json" )
+
+    # within the racy interval, a change in the same timestamp granule would not change the signature, so the directory is listed again.
+    candidates, manifest = _discover( plugin_package, tmp_path / "manifest.json" )
+
+    assert candidates == [ ".a" ]
+    assert manifest.reused_directory_count == 0
+    assert manifest.scanned_directory_count == 1
+
+def test_corrupt_or_missing_manifest_is_rebuilt( plugin_package, tmp_path ):
+    _write_tree( plugin_package )
+    manifest_path = tmp_path / "manifest.json"
+
+    assert not DiscoveryManifest( tmp_path / "missing.json" ).load()
+
+    manifest_path.write_text( "{ not json", encoding = "utf-8" )
+    candidates, manifest = _discover( plugin_package, manifest_path )
+
+    assert candidates == [ ".a", ".group.b" ]
+    assert manifest.reused_directory_count == 0
+    assert DiscoveryManifest( manifest_path ).load()
+
+def test_changed_parameters_discard_listings( plugin_package, tmp_path ):
+    _write_tree( plugin_package )
+    _discover( plugin_package, tmp_path / "manifest.json" )
+    manifest = DiscoveryManifest( tmp_path / "manifest.json" )
+
+    candidates = discover_modules( plugin_package.directory, ".py", recursive = True, ignored_filenames = [ "__init__.py", "a.py" ], discovery_manifest = manifest )
+
+    assert [ candidate.module_name for candidate in candidates ] == [ ".group.b" ]
+    assert manifest.reused_directory_count == 0
@@ -0,0 +1,95 @@
+import gc
+import os
+import threading
+import weakref
+
+import pytest
+from plugin_engine import fork_support
+from plugin_engine.fork_support import forget_lock_after_fork, get_locks_held_at_fork, reset_lock_after_fork
+from plugin_engine.plugin_importer import PluginImporter
+
+pytestmark = pytest.mark.skipif( not hasattr( os, "register_at_fork" ), reason = "fork hooks require os.register_at_fork" )
+
+class _Owner( object ):
+    def __init__( self ):
+        self.lock = threading.Lock()
+
+@pytest.fixture
+def unfrozen_gc():
+    yield
+
+    if hasattr( gc, "unfreeze" ):
+        gc.unfreeze()
+
+def _is_registered( owner, attribute_name: str ) -> bool:
+    return ( id( owner ), attribute_name ) in fork_support._fork_locks
+
+def test_registered_owner_is_not_kept_alive():
+    owner = _Owner()
+    reset_lock_after_fork( owner, "lock" )
+    reference = weakref.ref( owner )
+
+    del owner
+    gc.collect()
+
+    assert reference() is None
+
+def test_forget_lock_after_fork():
+    owner = _Owner()
+    reset_lock_after_fork( owner, "lock" )
+
+    forget_lock_after_fork( owner, "lock" )
+
+    assert not _is_registered( owner, "lock" )
+
+def test_held_lock_is_replaced_in_child():
+    owner = _Owner()
+    reset_lock_after_fork( owner, "lock" )
+    read_descriptor, write_descriptor = os.pipe()
+
+    with owner.lock:
+        process_id = os.fork()
+
+        if process_id == 0:
+            # the child cannot acquire the inherited lock, which the parent's thread holds, unless it was replaced.
+            is_released = owner.lock.acquire( False )
+            os.write( write_descriptor, b"1" if is_released and any( "lock" in description for description in get_locks_held_at_fork() ) else b"0" )
+            os._exit( 0 )
+
+    os.close( write_descriptor )
+    result = os.read( read_descriptor, 1 )
+    os.close( read_descriptor )
+    os.waitpid( process_id, 0 )
+    forget_lock_after_fork( owner, "lock" )
+
+    assert result == b"1"
+    assert get_locks_held_at_fork() == ()
+
+def test_unload_after_lazy_import_and_prepare_for_fork_is_clean( plugin_package, unfrozen_gc ):
+    plugin_package.write( "__init__.py", """
+        from plugin_engine.class_registration import register_class
+        from plugin_engine.plugin_registry import PluginRegistry
+
+        registry = PluginRegistry()
+
+        def register_plugin( class_ ):
+            register_class( class_, registry )
+            return class_
+        """ )
+    for class_name in ( "First", "Second" ):
+        plugin_package.write( f"{ class_name.lower() }.py", f"""
+            from { plugin_package.name } import register_plugin
+
+            @register_plugin
+            class { class_name }( object ):
+                pass
+            """ )
+    package = plugin_package.import_package()
+    plugin_importer = PluginImporter( package )
+    plugin_importer.import_modules( lazy = True, registration_target = package.registry, registration_decorators = [ "register_plugin" ] )
+    plugin_importer.prepare_for_fork( registration_target = package.registry )
+
+    result = plugin_importer.unload_modules( registration_targets = [ package.registry ] )
+
+    assert sorted( result.registration_ids ) == [ "First", "Second" ]
+    assert result.is_clean, result.leaked
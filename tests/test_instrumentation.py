@@ -0,0 +1,66 @@
+import tracemalloc
+
+import pytest
+from plugin_engine import instrumentation
+from plugin_engine.instrumentation import DISCOVERY, IMPORT, REGISTRATION, EventRecorder, add_listener, instrument, measure, remove_listener
+from plugin_engine.plugin_importer import PluginImporter
+
+def test_measure_does_nothing_without_listeners():
+    assert not instrumentation.is_enabled()
+
+    with measure( IMPORT, "unmeasured" ):
+        pass
+
+def test_measure_emits_failed_step():
+    recorder = EventRecorder()
+    add_listener( recorder )
+    try:
+        with pytest.raises( ValueError ):
+            with measure( IMPORT, "failing" ):
+                raise ValueError( "broken" )
+    finally:
+        remove_listener( recorder )
+
+    ( event, ) = recorder.events
+    assert ( event.kind, event.name, event.succeeded, event.error ) == ( IMPORT, "failing", False, "ValueError: broken" )
+    assert event.wall_time >= 0 and event.memory_delta is None
+
+def test_removed_listener_stops_receiving_events():
+    recorder = EventRecorder()
+    add_listener( recorder )
+
+    with measure( IMPORT, "first" ):
+        pass
+
+    remove_listener( recorder )
+    remove_listener( recorder )
+
+    with measure( IMPORT, "second" ):
+        pass
+
+    assert [ event.name for event in recorder.events ] == [ "first" ]
+    assert not instrumentation.is_enabled()
+
+def test_import_records_discovery_import_and_registration_events( plugin_package ):
+    plugin_package.write_plugin( "first.py", "First" )
+    plugin_package.write_plugin( "second.py", "Second" )
+
+    with instrument() as recorder:
+        PluginImporter( plugin_package.import_package() ).import_modules()
+
+    assert [ event.name for event in recorder.events if event.kind == DISCOVERY ] == [ str( plugin_package.directory ) ]
+    assert sorted( event.name for event in recorder.events if event.kind == IMPORT ) == [ f"{ plugin_package.name }.first", f"{ plugin_package.name }.second" ]
+    assert sorted( event.name for event in recorder.events if event.kind == REGISTRATION ) == [ "First", "Second" ]
+    assert all( event.succeeded and event.memory_delta is None for event in recorder.events )
+    assert not instrumentation.is_enabled()
+
+def test_instrument_traces_memory( plugin_package ):
+    plugin_package.write_plugin( "first.py", "First", body = "DATA = [ bytes( 1024 ) for _ in range( 100 ) ]" )
+
+    with instrument( trace_memory = True ) as recorder:
+        assert tracemalloc.is_tracing()
+        PluginImporter( plugin_package.import_package() ).import_modules()
+
+    assert not tracemalloc.is_tracing()
+    ( event, ) = [ event for event in recorder.events if event.kind == IMPORT ]
+    assert event.memory_delta > 100 * 1024
@@ -0,0 +1,116 @@
+import ast
+import sys
+import textwrap
+
+import pytest
+from plugin_engine.lazy_registration import LazyClass
+from plugin_engine.plugin_importer import PluginImporter
+from plugin_engine.static_analysis import get_class_registrations
+
+_PACKAGE_SOURCE = """
+    from plugin_engine.class_registration import register_class
+
+    registry = {}
+
+    def register_plugin( class_ = None, **kwargs ):
+        def register( class_ ):
+            register_class( class_, registry, **kwargs )
+            return class_
+
+        return register( class_ ) if class_ is not None else register
+    """
+
+def _import_lazily( plugin_package ):
+    plugin_package.write( "__init__.py", _PACKAGE_SOURCE )
+    package = plugin_package.import_package()
+    plugin_importer = PluginImporter( package )
+    plugin_importer.import_modules( lazy = True, registration_target = package.registry, registration_decorators = [ "register_plugin" ] )
+    return plugin_importer, package.registry
+
+def test_get_class_registrations_finds_decorated_classes():
+    module_tree = ast.parse( textwrap.dedent( """
+        @register_plugin
+        class First( Base ):
+            @plugins.register_plugin( enabled = False )
+            class Nested( object ):
+                pass
+
+        @register_plugin( enabled = IS_ENABLED )
+        class Dynamic( object ):
+            pass
+
+        @other_decorator
+        class Undecorated( object ):
+            pass
+        """ ) )
+
+    registrations = get_class_registrations( module_tree, [ "register_plugin" ] )
+
+    assert [ ( registration.qualname, registration.enabled ) for registration in registrations ] == [ ( "First", True ), ( "First.Nested", False ), ( "Dynamic", None ) ]
+    assert registrations[ 0 ].parent_class_names == ( "Base", )
+
+def test_stand_in_resolves_on_first_use( plugin_package ):
+    plugin_package.write( "first.py", f"""
+        from { plugin_package.name } import register_plugin
+
+        @register_plugin
+        class First( object ):
+            value = 1
+        """ )
+    _, registry = _import_lazily( plugin_package )
+    stand_in = registry[ "First" ]
+
+    assert isinstance( stand_in, LazyClass ) and not stand_in.is_resolved
+    assert f"{ plugin_package.name }.first" not in sys.modules
+
+    instance = stand_in()
+
+    assert stand_in.is_resolved
+    assert type( instance ) is stand_in.resolve() is registry[ "First" ]
+    assert stand_in.value == 1
+    assert not isinstance( registry[ "First" ], LazyClass )
+
+def test_stand_in_is_replaced_when_module_is_imported( plugin_package ):
+    plugin_package.write( "first.py", f"""
+        from { plugin_package.name } import register_plugin
+
+        @register_plugin
+        class First( object ):
+            pass
+        """ )
+    _, registry = _import_lazily( plugin_package )
+    stand_in = registry[ "First" ]
+
+    module = __import__( f"{ plugin_package.name }.first", fromlist = [ "First" ] )
+
+    assert registry[ "First" ] is module.First
+    assert stand_in.is_resolved and stand_in.resolve() is module.First
+
+def test_resolve_raises_when_module_does_not_register_class( plugin_package ):
+    plugin_package.write( "missing.py", """
+        def register_plugin( class_ ):
+            return class_
+
+        @register_plugin
+        class Missing( object ):
+            pass
+        """ )
+    _, registry = _import_lazily( plugin_package )
+    stand_in = registry[ "Missing" ]
+
+    with pytest.raises( ImportError, match = "did not register" ):
+        stand_in.resolve()
+
+    assert "Missing" not in registry
+
+def test_statically_disabled_classes_get_no_stand_in( plugin_package ):
+    plugin_package.write( "disabled.py", f"""
+        from { plugin_package.name } import register_plugin
+
+        @register_plugin( enabled = False )
+        class Disabled( object ):
+            pass
+        """ )
+    _, registry = _import_lazily( plugin_package )
+
+    assert "Disabled" not in registry
@@ -0,0 +1,69 @@
+import io
+import sys
+import threading
+
+from plugin_engine.output_capture import capture_output
+
+def test_capture_output_captures_only_calling_thread():
+    started = threading.Event()
+    captured = threading.Event()
+    other_output = io.StringIO()
+
+    def write_from_other_thread():
+        started.wait()
+        # the proxy writes into the original stream of a thread without a buffer.
+        print( "other", file = sys.stdout )
+        captured.set()
+
+    original_stdout = sys.stdout
+    sys.stdout = other_output
+    try:
+        thread = threading.Thread( target = write_from_other_thread )
+        thread.start()
+
+        with capture_output() as ( stdout_buffer, stderr_buffer ):
+            started.set()
+            captured.wait()
+            print( "own" )
+            print( "error", file = sys.stderr )
+
+        thread.join()
+    finally:
+        sys.stdout = original_stdout
+
+    assert stdout_buffer.getvalue() == "own\n"
+    assert stderr_buffer.getvalue() == "error\n"
+    assert other_output.getvalue() == "other\n"
+
+def test_nested_capture_output_restores_outer_buffer():
+    with capture_output() as ( outer_buffer, _ ):
+        print( "outer" )
+
+        with capture_output() as ( inner_buffer, _ ):
+            print( "inner" )
+
+        print( "outer again" )
+
+    assert inner_buffer.getvalue() == "inner\n"
+    assert outer_buffer.getvalue() == "outer\nouter again\n"
+
+def test_capture_output_restores_streams():
+    original_stdout, original_stderr = sys.stdout, sys.stderr
+
+    with capture_output():
+        assert sys.stdout is not original_stdout
+
+    assert sys.stdout is original_stdout
+    assert sys.stderr is original_stderr
+
+def test_capture_output_keeps_stream_replaced_meanwhile():
+    original_stdout = sys.stdout
+    replacement = io.StringIO()
+
+    try:
+        with capture_output():
+            sys.stdout = replacement
+
+        assert sys.stdout is replacement
+    finally:
+        sys.stdout = original_stdout
@@ -0,0 +1,95 @@
+import sys
+
+import pytest
+from plugin_engine.plugin_bundle import MappedPluginBundle, build_bundle
+from plugin_engine.plugin_importer import PluginImporter
+
+def _write_plugins( plugin_package ):
+    plugin_package.write_plugin( "first.py", "First", body = "VALUE = 1" )
+    plugin_package.write( "group/__init__.py", "" )
+    plugin_package.write_plugin( "group/second.py", "Second" )
+
+def _unload( plugin_package ):
+    plugin_package.registry.clear()
+    for name in list( sys.modules ):
+        if name.startswith( f"{ plugin_package.name }." ):
+            del sys.modules[ name ]
+
+@pytest.fixture
+def bundle_importer( plugin_package ):
+    plugin_importers = []
+
+    def import_bundle( bundle_path, **kwargs ) -> PluginImporter:
+        plugin_importer = PluginImporter( plugin_package.import_package() )
+        plugin_importers.append( plugin_importer )
+        plugin_importer.import_modules( bundle = bundle_path, **kwargs )
+        return plugin_importer
+
+    yield import_bundle
+
+    for plugin_importer in plugin_importers:
+        plugin_importer.bundle.close()
+
+def test_bundle_imports_same_plugins( plugin_package, bundle_importer, tmp_path ):
+    _write_plugins( plugin_package )
+    PluginImporter( plugin_package.import_package() ).import_modules( recursive = True )
+    expected = { registration_id: registered.__module__ for registration_id, registered in plugin_package.registry.items() }
+    _unload( plugin_package )
+
+    assert build_bundle( plugin_package.name, tmp_path / "plugins.bundle", recursive = True ) == 2
+
+    plugin_importer = bundle_importer( tmp_path / "plugins.bundle" )
+
+    assert { registration_id: registered.__module__ for registration_id, registered in plugin_package.registry.items() } == expected
+    assert all( module.__spec__.origin.startswith( str( tmp_path / "plugins.bundle" ) ) for module in plugin_importer.loaded_modules )
+
+def test_unchecked_bundle_uses_stale_entries( plugin_package, bundle_importer, tmp_path ):
+    _write_plugins( plugin_package )
+    build_bundle( plugin_package.import_package(), tmp_path / "plugins.bundle", recursive = True )
+    plugin_package.write_plugin( "first.py", "First", body = "VALUE = 2" )
+    plugin_package.write_plugin( "group/third.py", "Third" )
+
+    bundle_importer( tmp_path / "plugins.bundle" )
+
+    assert plugin_package.registry[ "First" ].VALUE == 1
+    assert sorted( plugin_package.registry ) == [ "First", "Second" ]
+
+@pytest.mark.parametrize( "map_bundle", [ False, True ] )
+def test_stale_entry_falls_back_to_source( plugin_package, bundle_importer, tmp_path, map_bundle ):
+    _write_plugins( plugin_package )
+    build_bundle( plugin_package.import_package(), tmp_path / "plugins.bundle", recursive = True )
+    plugin_package.write_plugin( "first.py", "First", body = "VALUE = 2" )
+
+    bundle_importer( tmp_path / "plugins.bundle", recursive = True, map_bundle = map_bundle, check_bundle_sources = True )
+
+    assert plugin_package.registry[ "First" ].VALUE == 2
+    assert sys.modules[ f"{ plugin_package.name }.first" ].__spec__.origin == str( plugin_package.directory / "first.py" )
+    assert sys.modules[ f"{ plugin_package.name }.group.second" ].__spec__.origin.startswith( str( tmp_path / "plugins.bundle" ) )
+
+def test_missing_entry_falls_back_to_source( plugin_package, bundle_importer, tmp_path ):
+    _write_plugins( plugin_package )
+    build_bundle( plugin_package.import_package(), tmp_path / "plugins.bundle", recursive = True )
+    plugin_package.write_plugin( "group/third.py", "Third" )
+
+    bundle_importer( tmp_path / "plugins.bundle", recursive = True, check_bundle_sources = True )
+
+    assert sorted( plugin_package.registry ) == [ "First", "Second", "Third" ]
+    assert sys.modules[ f"{ plugin_package.name }.group.third" ].__spec__.origin == str( plugin_package.directory / "group" / "third.py" )
+    assert sys.modules[ f"{ plugin_package.name }.group" ].__spec__.origin.startswith( str( tmp_path / "plugins.bundle" ) )
+
+def test_mapped_bundle_touches_imported_entries( plugin_package, bundle_importer, tmp_path ):
+    _write_plugins( plugin_package )
+    build_bundle( plugin_package.import_package(), tmp_path / "plugins.bundle", recursive = True )
+
+    plugin_importer = bundle_importer( tmp_path / "plugins.bundle", map_bundle = True )
+    bundle = plugin_importer.bundle
+
+    assert isinstance( bundle, MappedPluginBundle )
+
+    assert sorted( plugin_package.registry ) == [ "First", "Second" ]
+    assert sorted( bundle.touched_entry_names ) == [ "__index__.json", "first.pyc", "group/__init__.pyc", "group/second.pyc" ]
+    assert 0 < bundle.touched_byte_count <= bundle.mapped_byte_count == ( tmp_path / "plugins.bundle" ).stat().st_size
+
+    bundle.close()
+
+    assert bundle.mapped_byte_count == 0
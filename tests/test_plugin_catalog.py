@@ -0,0 +1,98 @@
+import json
+import os
+import time
+
+import pytest
+from plugin_engine import plugin_catalog
+from plugin_engine.plugin_catalog import build_catalog
+
+@pytest.fixture
+def parsed_paths( monkeypatch ):
+    paths = []
+    parse_module = plugin_catalog.parse_module
+
+    def recording_parse_module( path ):
+        paths.append( os.path.basename( path ) )
+        return parse_module( path )
+
+    monkeypatch.setattr( plugin_catalog, "parse_module", recording_parse_module )
+    return paths
+
+def _write_plugin( plugin_package, relative_path: str, class_name: str, age: float = 60 ):
+    path = plugin_package.write( relative_path, f"""
+        @register_plugin( enabled = True )
+        class { class_name }( object ):
+            pass
+        """ )
+
+    if age > 0:
+        timestamp = time.time() - age
+        os.utime( path, ( timestamp, timestamp ) )
+
+    return path
+
+def _build( plugin_package, cache_path ):
+    return build_catalog( plugin_package.directory, ".py", relative_import_package = plugin_package.name, registration_decorators = [ "register_plugin" ],
+                          cache_path = cache_path )
+
+def _cached_files( cache_path ):
+    with open( cache_path, "r", encoding = "utf-8" ) as cache_file:
+        return sorted( os.path.basename( path ) for path in json.load( cache_file )[ "files" ] )
+
+def test_catalog_describes_registrations_without_importing( plugin_package, tmp_path ):
+    _write_plugin( plugin_package, "first.py", "First" )
+
+    ( entry, ) = _build( plugin_package, tmp_path / "catalog.json" )
+
+    assert entry.module_name == f"{ plugin_package.name }.first"
+    assert [ ( registration.qualname, registration.keywords ) for registration in entry.registrations ] == [ ( "First", { "enabled": True } ) ]
+    assert plugin_catalog.describe_registration( entry.registrations[ 0 ] ) == "register_plugin( enabled = True )"
+    assert plugin_package.registry is None
+
+def test_cache_is_reused_for_unchanged_files( plugin_package, tmp_path, parsed_paths ):
+    _write_plugin( plugin_package, "first.py", "First" )
+    _write_plugin( plugin_package, "second.py", "Second" )
+    entries = _build( plugin_package, tmp_path / "catalog.json" )
+
+    assert sorted( parsed_paths ) == [ "first.py", "second.py" ]
+    assert _build( plugin_package, tmp_path / "catalog.json" ) == entries
+    assert len( parsed_paths ) == 2
+
+def test_cache_is_rebuilt_for_edited_files( plugin_package, tmp_path, parsed_paths ):
+    _write_plugin( plugin_package, "first.py", "First" )
+    _write_plugin( plugin_package, "second.py", "Second" )
+    _build( plugin_package, tmp_path / "catalog.json" )
+    _write_plugin( plugin_package, "second.py", "Edited", age = 30 )
+
+    entries = _build( plugin_package, tmp_path / "catalog.json" )
+
+    assert parsed_paths[ 2: ] == [ "second.py" ]
+    assert [ entry.registrations[ 0 ].qualname for entry in entries ] == [ "First", "Edited" ]
+
+def test_recently_modified_files_are_not_cached( plugin_package, tmp_path, parsed_paths ):
+    _write_plugin( plugin_package, "first.py", "First" )
+    path = _write_plugin( plugin_package, "racy.py", "Racy", age = 0 )
+    _build( plugin_package, tmp_path / "catalog.json" )
+
+    assert _cached_files( tmp_path / "catalog.json" ) == [ "first.py" ]
+
+    # an edit within the same timestamp granule keeps the size and modification time.
+    state = path.stat()
+    _write_plugin( plugin_package, "racy.py", "Edit", age = 0 )
+    os.utime( path, ns = ( state.st_atime_ns, state.st_mtime_ns ) )
+
+    entries = _build( plugin_package, tmp_path / "catalog.json" )
+
+    assert parsed_paths[ 2: ] == [ "racy.py" ]
+    assert entries[ 1 ].registrations[ 0 ].qualname == "Edit"
+
+def test_entries_of_deleted_files_are_dropped( plugin_package, tmp_path ):
+    _write_plugin( plugin_package, "first.py", "First" )
+    _write_plugin( plugin_package, "second.py", "Second" )
+    _build( plugin_package, tmp_path / "catalog.json" )
+    ( plugin_package.directory / "second.py" ).unlink()
+
+    entries = _build( plugin_package, tmp_path / "catalog.json" )
+
+    assert [ entry.module_name for entry in entries ] == [ f"{ plugin_package.name }.first" ]
+    assert _cached_files( tmp_path / "catalog.json" ) == [ "first.py" ]
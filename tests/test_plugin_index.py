@@ -0,0 +1,88 @@
+import sys
+
+import pytest
+from plugin_engine.plugin_importer import PluginImporter
+from plugin_engine.plugin_index import build_plugin_index, package_source
+from .conftest import PluginPackage
+
+_REGISTRY_SOURCE = """
+    from plugin_engine.class_registration import register_class
+
+    registry = {}
+
+    def register_plugin( class_ ):
+        register_class( class_, registry )
+        return class_
+    """
+
+@pytest.fixture
+def override_package( plugin_package ) -> PluginPackage:
+    # a second package whose plugins register into the first package's registry, like an override package.
+    package = PluginPackage( plugin_package.directory.parent )
+
+    yield package
+
+    for name in list( sys.modules ):
+        if name == package.name or name.startswith( f"{ package.name }." ):
+            del sys.modules[ name ]
+
+def _write_plugin( package: PluginPackage, registry_package: PluginPackage, relative_path: str, *class_names: str ):
+    classes = "".join( f"\n@register_plugin\nclass { class_name }( object ):\n    pass\n" for class_name in class_names )
+    package.write( relative_path, f"from { registry_package.name } import register_plugin\n{ classes }" )
+
+def _build_index( plugin_package: PluginPackage, override_package: PluginPackage ):
+    return build_plugin_index( [ package_source( override_package.import_package(), priority = 1 ), package_source( plugin_package.import_package() ) ],
+                               registration_decorators = [ "register_plugin" ] )
+
+def test_import_modules_skips_shadowed_modules( plugin_package, override_package ):
+    plugin_package.write( "__init__.py", _REGISTRY_SOURCE )
+    _write_plugin( plugin_package, plugin_package, "shadowed.py", "Shared" )
+    _write_plugin( plugin_package, plugin_package, "kept.py", "Kept" )
+    plugin_package.write( "helper.py", "VALUE = 1\n" )
+    _write_plugin( override_package, plugin_package, "override.py", "Shared" )
+    index = _build_index( plugin_package, override_package )
+
+    PluginImporter( override_package.import_package() ).import_modules( plugin_index = index )
+    PluginImporter( plugin_package.import_package() ).import_modules( plugin_index = index )
+
+    assert plugin_package.registry[ "Shared" ].__module__ == f"{ override_package.name }.override"
+    assert sorted( plugin_package.registry ) == [ "Kept", "Shared" ]
+    assert f"{ plugin_package.name }.shadowed" not in sys.modules
+    assert f"{ plugin_package.name }.helper" in sys.modules
+
+def test_import_modules_without_index_registers_shadowed_plugin( plugin_package, override_package ):
+    plugin_package.write( "__init__.py", _REGISTRY_SOURCE )
+    _write_plugin( plugin_package, plugin_package, "shadowed.py", "Shared" )
+    _write_plugin( override_package, plugin_package, "override.py", "Shared" )
+
+    PluginImporter( override_package.import_package() ).import_modules()
+
+    with pytest.raises( ValueError ):
+        PluginImporter( plugin_package.import_package() ).import_modules()
+
+def test_import_modules_rejects_module_with_indexed_and_shadowed_plugins( plugin_package, override_package ):
+    plugin_package.write( "__init__.py", _REGISTRY_SOURCE )
+    _write_plugin( plugin_package, plugin_package, "mixed.py", "Shared", "Kept" )
+    _write_plugin( override_package, plugin_package, "override.py", "Shared" )
+    index = _build_index( plugin_package, override_package )
+
+    assert index.shadowed_module_names == ()
+
+    with pytest.raises( ValueError, match = "mixed" ):
+        PluginImporter( plugin_package.import_package() ).import_modules( plugin_index = index )
+
+def test_reload_changed_modules_does_not_import_shadowed_module( plugin_package, override_package ):
+    plugin_package.write( "__init__.py", _REGISTRY_SOURCE )
+    _write_plugin( plugin_package, plugin_package, "shadowed.py", "Shared" )
+    _write_plugin( override_package, plugin_package, "override.py", "Shared" )
+    index = _build_index( plugin_package, override_package )
+    PluginImporter( override_package.import_package() ).import_modules( plugin_index = index )
+    plugin_importer = PluginImporter( plugin_package.import_package() )
+    plugin_importer.import_modules( plugin_index = index )
+    _write_plugin( plugin_package, plugin_package, "added.py", "Added" )
+
+    result = plugin_importer.reload_changed_modules()
+
+    assert result.added == ( f"{ plugin_package.name }.added", )
+    assert f"{ plugin_package.name }.shadowed" not in sys.modules
+    assert sorted( plugin_package.registry ) == [ "Added", "Shared" ]
@@ -0,0 +1,100 @@
+import json
+import sys
+
+import pytest
+from plugin_engine.plugin_importer import PluginImporter, PluginLoadCost, write_load_cost_report
+from plugin_engine.plugin_policy import POLICY_REASON, STATIC_REASON, DisabledPluginFilter, PluginPolicy, read_plugin_policy
+
+_REGISTRY_SOURCE = """
+    from plugin_engine.class_registration import register_class
+
+    registry = {}
+
+    def register_plugin( enabled = True ):
+        def register( class_ ):
+            if enabled:
+                register_class( class_, registry )
+            return class_
+        return register
+    """
+
+def _write_plugin( plugin_package, relative_path: str, class_name: str, enabled: str = "True", preamble: str = "" ):
+    plugin_package.write( relative_path, f"from { plugin_package.name } import register_plugin\n{ preamble }\n"
+                                         f"@register_plugin( enabled = { enabled } )\nclass { class_name }( object ):\n    pass\n" )
+
+def _write_plugins( plugin_package ):
+    plugin_package.write( "__init__.py", _REGISTRY_SOURCE )
+    _write_plugin( plugin_package, "static_off.py", "StaticOff", enabled = "False" )
+    _write_plugin( plugin_package, "tenant_a.py", "TenantA" )
+    _write_plugin( plugin_package, "legacy.py", "LegacyPlugin" )
+    _write_plugin( plugin_package, "exempt.py", "LegacyKept" )
+    _write_plugin( plugin_package, "dynamic.py", "Dynamic", enabled = "FLAG", preamble = "FLAG = False" )
+    plugin_package.write( "helper.py", "VALUE = 1\n" )
+
+def _import( plugin_package, **kwargs ) -> DisabledPluginFilter:
+    disabled_filter = DisabledPluginFilter( registration_decorators = [ "register_plugin" ], **kwargs )
+    PluginImporter( plugin_package.import_package() ).import_modules( disabled_filter = disabled_filter )
+    return disabled_filter
+
+def _module_names( plugin_package, *names: str ):
+    return sorted( f"{ plugin_package.name }.{ name }" for name in names )
+
+def test_policy_patterns():
+    policy = PluginPolicy( disabled = [ "plugins.tenant_*", "Legacy*" ], enabled = [ "LegacyKept" ] )
+
+    assert policy.is_disabled( "plugins.tenant_a" )
+    assert policy.is_disabled( "LegacyPlugin" )
+    assert not policy.is_disabled( "LegacyKept" )
+    assert not policy.is_disabled( "plugins.other" )
+
+def test_statically_disabled_modules_are_skipped( plugin_package ):
+    _write_plugins( plugin_package )
+
+    disabled_filter = _import( plugin_package )
+
+    assert [ ( skipped.module_name, skipped.reason ) for skipped in disabled_filter.skipped ] == [ ( f"{ plugin_package.name }.static_off", STATIC_REASON ) ]
+    assert sorted( plugin_package.registry ) == [ "LegacyKept", "LegacyPlugin", "TenantA" ]
+
+def test_policy_disables_modules_and_registration_ids( plugin_package, tmp_path ):
+    _write_plugins( plugin_package )
+    ( tmp_path / "policy.json" ).write_text( json.dumps( { "disabled": [ f"{ plugin_package.name }.tenant_*", "Legacy*" ], "enabled": [ "LegacyKept" ] } ) )
+
+    disabled_filter = _import( plugin_package, policy = tmp_path / "policy.json" )
+
+    assert sorted( ( skipped.module_name, skipped.reason ) for skipped in disabled_filter.skipped ) == [
+        ( f"{ plugin_package.name }.legacy", POLICY_REASON ), ( f"{ plugin_package.name }.static_off", STATIC_REASON ), ( f"{ plugin_package.name }.tenant_a", POLICY_REASON ) ]
+    assert sorted( plugin_package.registry ) == [ "LegacyKept" ]
+    assert not any( name in sys.modules for name in _module_names( plugin_package, "legacy", "static_off", "tenant_a" ) )
+
+def test_modules_with_dynamic_enabled_values_are_imported( plugin_package ):
+    _write_plugins( plugin_package )
+
+    _import( plugin_package, policy = PluginPolicy( disabled = [ "LegacyPlugin", "TenantA" ] ) )
+
+    assert all( name in sys.modules for name in _module_names( plugin_package, "dynamic", "exempt", "helper" ) )
+    assert "Dynamic" not in plugin_package.registry
+
+def test_skip_report_estimates_avoided_time( plugin_package, tmp_path ):
+    _write_plugins( plugin_package )
+    write_load_cost_report( tmp_path / "costs.json", [ PluginLoadCost( f"{ plugin_package.name }.tenant_a", 0.5, 0.5, None, 1, 0.25, 0, 0.0 ),
+                                                       PluginLoadCost( f"{ plugin_package.name }.legacy", 1.0, 1.0, None, 0, 0.0, 0, 0.0 ),
+                                                       PluginLoadCost( f"{ plugin_package.name }.exempt", 2.0, 2.0, None, 0, 0.0, 0, 0.0 ) ] )
+    disabled_filter = _import( plugin_package, policy = PluginPolicy( disabled = [ "TenantA", "LegacyPlugin" ] ) )
+
+    report = disabled_filter.get_report( tmp_path / "costs.json" )
+
+    assert report.avoided_time == pytest.approx( 1.75 )
+    assert report.unmeasured == ( f"{ plugin_package.name }.static_off", )
+    assert report.imported_anyway == ()
+
+    __import__( f"{ plugin_package.name }.legacy" )
+    report = disabled_filter.get_report( { f"{ plugin_package.name }.tenant_a": 0.5 } )
+
+    assert report.avoided_time == pytest.approx( 0.5 )
+    assert report.imported_anyway == ( f"{ plugin_package.name }.legacy", )
+
+def test_invalid_policy_file_is_rejected( tmp_path ):
+    ( tmp_path / "policy.json" ).write_text( json.dumps( { "disabled": "Legacy*" } ) )
+
+    with pytest.raises( ValueError, match = "disabled" ):
+        read_plugin_policy( tmp_path / "policy.json" )
@@ -0,0 +1,103 @@
+import pytest
+from plugin_engine.class_registration import register_class
+from plugin_engine.plugin_importer import PluginImporter
+from plugin_engine.plugin_registry import PluginRegistry
+
+class _Plugin( object ):
+    pass
+
+class _First( _Plugin ):
+    pass
+
+class _Second( _Plugin ):
+    pass
+
+@pytest.fixture( params = [ False, True ], ids = [ "locked", "copy_on_write" ] )
+def registry( request ) -> PluginRegistry:
+    return PluginRegistry( copy_on_write = request.param )
+
+def test_indexed_lookups( registry ):
+    registry.register( "first", _First, [ "fast" ] )
+    registry[ "second" ] = _Second
+
+    assert registry.get_by_parent_class( _Plugin ) == { "first": _First, "second": _Second }
+    assert registry.get_by_module( __name__ ) == { "first": _First, "second": _Second }
+    assert registry.get_by_name( "_Second" ) == { "second": _Second }
+    assert registry.get_by_tag( "fast" ) == { "first": _First }
+
+    del registry[ "first" ]
+
+    assert registry.get_by_tag( "fast" ) == {}
+    assert registry.get_by_parent_class( _Plugin ) == { "second": _Second }
+
+def test_snapshot_is_not_affected_by_later_changes( registry ):
+    registry.register( "first", _First, [ "fast" ] )
+    snapshot = registry.snapshot()
+
+    registry.register( "second", _Second, [ "fast" ] )
+    registry.set_tags( "first", [] )
+
+    assert dict( snapshot ) == { "first": _First }
+    assert snapshot.get_by_tag( "fast" ) == { "first": _First }
+    assert registry.get_by_tag( "fast" ) == { "second": _Second }
+
+def test_copy_on_write_publishes_new_state_per_change():
+    registry = PluginRegistry( copy_on_write = True )
+    registry[ "first" ] = _First
+    state = registry._state
+
+    registry[ "second" ] = _Second
+
+    assert registry._state is not state
+    assert list( state.classes ) == [ "first" ]
+    # snapshots share the published state instead of copying it.
+    assert registry.snapshot()._state is registry._state
+
+def test_copy_on_write_failed_change_leaves_registry_unchanged():
+    registry = PluginRegistry( copy_on_write = True )
+    registry[ "first" ] = _First
+    state = registry._state
+
+    with pytest.raises( ValueError ):
+        registry.register_many( [ ( "second", _Second, None ), ( "third", None, None ) ] )
+
+    assert registry._state is state
+    assert list( registry ) == [ "first" ]
+
+def test_copy_on_write_iteration_is_stable_during_changes():
+    registry = PluginRegistry( { "first": _First }, copy_on_write = True )
+
+    for registration_id in registry:
+        registry[ f"{ registration_id }_copy" ] = _Second
+
+    assert list( registry ) == [ "first", "first_copy" ]
+
+def test_register_class_records_tags():
+    registry = PluginRegistry( copy_on_write = True )
+
+    register_class( _First, registry, _Plugin, tags = [ "fast" ] )
+
+    assert registry.get_tags( "_First" ) == frozenset( [ "fast" ] )
+
+def test_import_into_copy_on_write_registry_publishes_single_state( plugin_package ):
+    for index in range( 20 ):
+        plugin_package.write( f"plugin_{ index }.py", f"""
+            from plugin_engine.class_registration import register_class
+            from { plugin_package.name } import registry
+
+            class Plugin{ index }( object ):
+                pass
+
+            register_class( Plugin{ index }, registry )
+            """ )
+    plugin_package.write( "__init__.py", "from plugin_engine.plugin_registry import PluginRegistry\nregistry = PluginRegistry( copy_on_write = True )\n" )
+
+    registry = plugin_package.import_package().registry
+    published_states = []
+    update = registry._update
+    registry._update = lambda callback: ( published_states.append( callback ), update( callback ) )
+
+    PluginImporter( plugin_package.import_package() ).import_modules( registration_target = registry )
+
+    assert len( registry ) == 20
+    assert len( published_states ) == 1
@@ -0,0 +1,87 @@
+import threading
+
+from plugin_engine.plugin_importer import PluginImporter
+from plugin_engine.plugin_watcher import PluginWatcher
+
+def _watch( plugin_package, **kwargs ):
+    plugin_package.write_plugin( "first.py", "First" )
+    plugin_package.write( "group/nested/__init__.py", "" )
+    plugin_importer = PluginImporter( plugin_package.import_package() )
+    plugin_importer.import_modules( recursive = True )
+
+    return plugin_importer, PluginWatcher( plugin_importer, plugin_package.registry, **kwargs )
+
+def test_apply_changes_publishes_registry_snapshot( plugin_package ):
+    _, watcher = _watch( plugin_package )
+    previous_registry = watcher.registry
+
+    plugin_package.write_plugin( "second.py", "Second" )
+    result = watcher.apply_changes()
+
+    assert result.added == ( f"{ plugin_package.name }.second", )
+    assert sorted( watcher.registry ) == [ "First", "Second" ]
+    assert sorted( previous_registry ) == [ "First" ]
+
+def test_apply_changes_deregisters_removed_and_renamed_plugins( plugin_package ):
+    _, watcher = _watch( plugin_package )
+    plugin_package.write_plugin( "second.py", "Second" )
+    watcher.apply_changes()
+
+    plugin_package.write_plugin( "first.py", "Renamed" )
+    ( plugin_package.directory / "second.py" ).unlink()
+    result = watcher.apply_changes()
+
+    assert sorted( result.deregistered ) == [ "First", "Second" ]
+    assert sorted( watcher.registry ) == [ "Renamed" ]
+
+def test_apply_changes_does_not_hold_lock_while_importing( plugin_package ):
+    # the plugins register with the same non-reentrant lock as the watcher.
+    plugin_package.write( "__init__.py", """
+        import threading
+
+        registry = {}
+        registry_lock = threading.Lock()
+        """ )
+    package = plugin_package.import_package()
+    plugin_package.write_plugin( "first.py", "First" )
+    plugin_importer = PluginImporter( package )
+    plugin_importer.import_modules()
+    watcher = PluginWatcher( plugin_importer, package.registry, registration_target_lock = package.registry_lock )
+    plugin_package.write( "second.py", f"""
+        from plugin_engine.class_registration import register_class
+        from { plugin_package.name } import registry, registry_lock
+
+        class Second( object ):
+            pass
+
+        register_class( Second, registry, registration_target_lock = registry_lock )
+        """ )
+
+    thread = threading.Thread( target = watcher.apply_changes, daemon = True )
+    thread.start()
+    thread.join( 10 )
+
+    assert not thread.is_alive()
+    assert sorted( watcher.registry ) == [ "First", "Second" ]
+
+def test_polling_detects_module_added_under_directory_without_modules( plugin_package ):
+    reloaded = threading.Event()
+    results = []
+
+    def on_reload( result ):
+        results.append( result )
+        reloaded.set()
+
+    _, watcher = _watch( plugin_package, use_inotify = False, poll_interval = 0.05, debounce_interval = 0.05, reload_callback = on_reload )
+    watcher.start()
+    try:
+        # neither the package directory nor a directory with modules changes.
+        plugin_package.write_plugin( "group/nested/added.py", "Added" )
+
+        assert reloaded.wait( 10 )
+    finally:
+        watcher.stop()
+
+    assert not watcher.uses_inotify
+    assert results[ 0 ].added == ( f"{ plugin_package.name }.group.nested.added", )
+    assert "Added" in watcher.registry
@@ -0,0 +1,41 @@
+import multiprocessing
+import os
+import time
+
+import pytest
+from plugin_engine.process_pool import PluginProcessPool
+
+class _ProcessId( object ):
+    def execute( self, delay ):
+        time.sleep( delay )
+        print( "ran" )
+        return os.getpid()
+
+class _Failing( object ):
+    def execute( self ):
+        raise RuntimeError( "failed" )
+
+def _load_registry():
+    return { "process_id": _ProcessId, "failing": _Failing }
+
+@pytest.fixture
+def pool():
+    with PluginProcessPool( _load_registry, worker_count = 2, mp_context = multiprocessing.get_context( "fork" ) ) as pool:
+        yield pool
+
+def test_execute_many_runs_calls_in_parallel_by_default( pool ):
+    results = list( pool.execute_many( [ ( "process_id", [ 0.5 ] ), ( "process_id", [ 0.5 ] ) ] ) )
+
+    assert all( result.succeeded and result.output == "ran\n" for result in results )
+    assert results[ 0 ].value != results[ 1 ].value
+
+def test_execute_many_runs_batch_in_one_worker( pool ):
+    results = list( pool.execute_many( [ ( "process_id", [ 0 ] ) ] * 4, batch_size = 4 ) )
+
+    assert len( set( result.value for result in results ) ) == 1
+
+def test_submit_reports_failure( pool ):
+    result = pool.submit( "failing" ).result()
+
+    assert not result.succeeded
+    assert "RuntimeError" in result.error
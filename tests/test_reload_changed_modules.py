@@ -0,0 +1,83 @@
+import os
+import sys
+
+import pytest
+from plugin_engine.plugin_importer import PluginImporter
+
+def _import( plugin_package ) -> PluginImporter:
+    plugin_package.write_plugin( "base.py", "Base", body = "VALUE = 1" )
+    plugin_package.write_plugin( "derived.py", "Derived", imports = f"from { plugin_package.name }.base import Base" )
+    plugin_package.write_plugin( "standalone.py", "Standalone" )
+    plugin_importer = PluginImporter( plugin_package.import_package() )
+    plugin_importer.import_modules()
+    return plugin_importer
+
+def test_unchanged_modules_are_not_reloaded( plugin_package ):
+    plugin_importer = _import( plugin_package )
+
+    result = plugin_importer.reload_changed_modules()
+
+    assert result.reloaded == ()
+    assert result.unchanged_count == 3
+
+def test_changed_module_is_reloaded_with_its_dependents( plugin_package ):
+    plugin_importer = _import( plugin_package )
+    standalone_module = sys.modules[ f"{ plugin_package.name }.standalone" ]
+    plugin_package.write_plugin( "base.py", "Base", body = "VALUE = 2" )
+
+    result = plugin_importer.reload_changed_modules()
+
+    assert result.changed == ( f"{ plugin_package.name }.base", )
+    assert result.dependents == ( f"{ plugin_package.name }.derived", )
+    assert result.unchanged_count == 1
+    assert plugin_package.registry[ "Base" ].VALUE == 2
+    assert sys.modules[ f"{ plugin_package.name }.derived" ].Base is plugin_package.registry[ "Base" ]
+    assert sys.modules[ f"{ plugin_package.name }.standalone" ] is standalone_module
+
+def test_touched_module_with_same_content_is_not_reloaded( plugin_package ):
+    plugin_importer = _import( plugin_package )
+    path = plugin_package.directory / "standalone.py"
+    os.utime( path, ( 0, 0 ) )
+
+    result = plugin_importer.reload_changed_modules()
+
+    assert result.reloaded == ()
+
+def test_added_and_removed_modules( plugin_package ):
+    plugin_importer = _import( plugin_package )
+    plugin_package.write_plugin( "added.py", "Added" )
+    ( plugin_package.directory / "standalone.py" ).unlink()
+
+    result = plugin_importer.reload_changed_modules( registration_targets = [ plugin_package.registry ] )
+
+    assert result.added == ( f"{ plugin_package.name }.added", )
+    assert result.removed == ( f"{ plugin_package.name }.standalone", )
+    assert result.deregistered == ( "Standalone", )
+    assert sorted( plugin_package.registry ) == [ "Added", "Base", "Derived" ]
+    assert f"{ plugin_package.name }.standalone" not in sys.modules
+    assert sorted( module.__name__ for module in plugin_importer.loaded_modules ) == sorted( f"{ plugin_package.name }.{ name }" for name in ( "added", "base", "derived" ) )
+
+def test_classes_no_longer_registered_are_deregistered( plugin_package ):
+    plugin_importer = _import( plugin_package )
+    plugin_package.write_plugin( "standalone.py", "Renamed" )
+    ( plugin_package.directory / "derived.py" ).unlink()
+
+    result = plugin_importer.reload_changed_modules( registration_targets = [ plugin_package.registry ] )
+
+    assert sorted( result.deregistered ) == [ "Derived", "Standalone" ]
+    assert sorted( plugin_package.registry ) == [ "Base", "Renamed" ]
+
+def test_reloaded_classes_stay_registered( plugin_package ):
+    plugin_importer = _import( plugin_package )
+    plugin_package.write_plugin( "base.py", "Base", body = "VALUE = 2" )
+
+    result = plugin_importer.reload_changed_modules( registration_targets = [ plugin_package.registry ] )
+
+    assert result.deregistered == ()
+    assert sorted( plugin_package.registry ) == [ "Base", "Derived", "Standalone" ]
+
+def test_reload_requires_loaded_modules( plugin_package ):
+    plugin_importer = PluginImporter( plugin_package.import_package() )
+
+    with pytest.raises( Exception, match = "not loaded" ):
+        plugin_importer.reload_changed_modules()
@@ -0,0 +1,121 @@
+import sys
+import threading
+
+import pytest
+from plugin_engine.plugin_importer import PluginImporter
+from plugin_engine.plugin_registry import PluginRegistry
+from plugin_engine.result_cache import CACHEABLE_TAG, ResultCache
+
+class _Adder( object ):
+    executions = 0
+
+    def execute( self, *args ):
+        type( self ).executions += 1
+        print( f"sum { sum( args ) }" )
+        print( "warning", file = sys.stderr )
+        return sum( args )
+
+class _Failing( object ):
+    def execute( self, *args ):
+        print( "partial" )
+        raise RuntimeError( "failed" )
+
+class _Waiting( object ):
+    def __init__( self, **kwargs ):
+        self.started = kwargs[ "started" ]
+        self.printed = kwargs[ "printed" ]
+
+    def execute( self ):
+        self.started.set()
+        self.printed.wait()
+        print( "own" )
+        return True
+
+def _create_registry( **classes ) -> PluginRegistry:
+    registry = PluginRegistry()
+    for registration_id, class_ in classes.items():
+        registry.register( registration_id, class_, [ CACHEABLE_TAG ] )
+
+    return registry
+
+def test_execute_replays_stdout_and_stderr_on_hit( capsys ):
+    _Adder.executions = 0
+    registry = _create_registry( adder = _Adder )
+    cache = ResultCache()
+
+    assert cache.execute( registry, "adder", 1, 2 ) == 3
+    first = capsys.readouterr()
+    assert cache.execute( registry, "adder", 1, 2 ) == 3
+    second = capsys.readouterr()
+
+    assert _Adder.executions == 1
+    assert first.out == second.out == "sum 3\n"
+    assert first.err == second.err == "warning\n"
+    assert cache.statistics.hits == 1
+
+def test_execute_writes_partial_output_of_failed_execution( capsys ):
+    registry = _create_registry( failing = _Failing )
+    cache = ResultCache()
+
+    with pytest.raises( RuntimeError ):
+        cache.execute( registry, "failing" )
+
+    assert capsys.readouterr().out == "partial\n"
+    assert cache.statistics.entry_count == 0
+
+def test_execute_does_not_capture_other_threads( capsys ):
+    registry = _create_registry( waiting = _Waiting )
+    cache = ResultCache()
+    started, printed = threading.Event(), threading.Event()
+
+    def print_concurrently():
+        started.wait()
+        print( "other thread" )
+        printed.set()
+
+    thread = threading.Thread( target = print_concurrently )
+    thread.start()
+    # events cannot be normalized into a key, so a fixed key is used.
+    cache.get_key = lambda *args: "waiting"
+    cache.execute( registry, "waiting", instance_kwargs = { "started": started, "printed": printed } )
+    thread.join()
+    capsys.readouterr()
+
+    found, result = cache.get( "waiting" )
+    assert found
+    assert result.output == "own\n"
+
+def test_spilled_results_are_reused( tmp_path ):
+    cache = ResultCache( max_entries = 1, spill_directory = tmp_path )
+    cache.put( "first", 1 )
+    cache.put( "second", 2 )
+
+    assert cache.statistics.spills == 1
+    assert ResultCache( spill_directory = tmp_path ).get( "first" ) == ( True, 1 )
+
+class _Unpicklable( object ):
+    def execute( self ):
+        return lambda: None
+
+def test_execute_does_not_cache_unpicklable_value():
+    registry = _create_registry( unpicklable = _Unpicklable )
+    cache = ResultCache()
+
+    assert callable( cache.execute( registry, "unpicklable" ) )
+    assert cache.statistics.entry_count == 0
+
+def test_results_are_keyed_by_executed_source( plugin_package ):
+    plugin_package.write_plugin( "value.py", "Value", body = "def execute( self ):\n        return 1" )
+    plugin_importer = PluginImporter( plugin_package.import_package() )
+    plugin_importer.import_modules()
+    cache = ResultCache()
+
+    assert cache.execute( _create_registry( value = plugin_package.registry[ "Value" ] ), "value" ) == 1
+
+    # edited but not reloaded: the old code still runs, and its result must not be stored under the new source's hash.
+    plugin_package.write_plugin( "value.py", "Value", body = "def execute( self ):\n        return 20" )
+    assert cache.execute( _create_registry( value = plugin_package.registry[ "Value" ] ), "value" ) == 1
+
+    plugin_importer.reload_changed_modules()
+
+    assert cache.execute( _create_registry( value = plugin_package.registry[ "Value" ] ), "value" ) == 20
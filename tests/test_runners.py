@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+from plugin_engine import async_runner, thread_runner
+
+class _Printer( object ):
+    def __init__( self, **kwargs ):
+        self.prefix = kwargs.get( "prefix", "" )
+
+    def execute( self, *args ):
+        print( f"{ self.prefix }{ type( self ).__name__ }{ args }" )
+        return True
+
+    async def execute_async( self, *args ):
+        await asyncio.sleep( 0 )
+        return sum( args )
+
+class _First( _Printer ):
+    pass
+
+class _Stopper( _Printer ):
+    def execute( self, *args ):
+        super().execute( *args )
+        return False
+
+class _Last( _Printer ):
+    pass
+
+class _Failing( _Printer ):
+    def execute( self, *args ):
+        print( "before failure" )
+        raise RuntimeError( "failed" )
+
+def test_thread_runner_writes_output_in_registration_order( capsys ):
+    results = thread_runner.execute_concurrently( { "first": _First, "last": _Last }, [ 1, 2 ], instance_kwargs = { "prefix": "> " } )
+
+    assert results == [ ( "first", True ), ( "last", True ) ]
+    assert capsys.readouterr().out == "> _First(1, 2)\n> _Last(1, 2)\n"
+
+def test_thread_runner_short_circuits( capsys ):
+    results = thread_runner.execute_concurrently( { "first": _First, "stopper": _Stopper, "last": _Last }, [], worker_count = 1 )
+
+    assert results == [ ( "first", True ), ( "stopper", False ), ( "last", None ) ]
+    assert capsys.readouterr().out == "_First()\n_Stopper()\n"
+
+def test_thread_runner_raises_first_error_after_previous_output( capsys ):
+    with pytest.raises( RuntimeError ):
+        thread_runner.execute_concurrently( { "first": _First, "failing": _Failing, "last": _Last }, [] )
+
+    assert capsys.readouterr().out == "_First()\nbefore failure\n"
+
+def test_async_runner_executes_every_argument_set():
+    results = asyncio.run( async_runner.execute_concurrently( { "first": _First, "last": _Last }, [ [ 1, 2 ], [ 3 ] ], max_concurrency_per_class = 2 ) )
+
+    assert results == [ ( "first", ( 1, 2 ), 3 ), ( "first", ( 3, ), 3 ), ( "last", ( 1, 2 ), 3 ), ( "last", ( 3, ), 3 ) ]
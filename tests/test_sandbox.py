@@ -0,0 +1,51 @@
+import sys
+
+import pytest
+from plugin_engine.dynamic_import import discover_modules
+from plugin_engine.plugin_importer import PluginImporter
+from plugin_engine.sandbox import ImportSandbox
+
+def _candidates( plugin_package ):
+    return discover_modules( plugin_package.directory, ".py" )
+
+@pytest.mark.skipif( sys.platform == "win32", reason = "CPU time and memory limits require the resource module" )
+def test_modules_exceeding_limits_are_quarantined( plugin_package ):
+    plugin_package.write_plugin( "spinning.py", "Spinning", imports = "while True:\n    pass" )
+    plugin_package.write_plugin( "allocating.py", "Allocating", imports = "DATA = bytearray( 512 * 1024 * 1024 )" )
+    plugin_package.write_plugin( "behaved.py", "Behaved" )
+    sandbox = ImportSandbox( cpu_time_limit = 1, memory_limit = 256 * 1024 * 1024, timeout = 20, workers = 3 )
+
+    PluginImporter( plugin_package.import_package() ).import_modules( sandbox = sandbox )
+
+    assert sorted( plugin_package.registry ) == [ "Behaved" ]
+    assert sorted( result.module_name for result in sandbox.quarantined ) == [ f"{ plugin_package.name }.allocating", f"{ plugin_package.name }.spinning" ]
+    assert "memory limit" in sandbox.results[ f"{ plugin_package.name }.allocating" ].error
+    assert sandbox.results[ f"{ plugin_package.name }.behaved" ].registrations == ( "Behaved", )
+
+def test_results_are_cached_by_content_hash( plugin_package, tmp_path ):
+    plugin_package.write_plugin( "first.py", "First" )
+    plugin_package.write_plugin( "second.py", "Second" )
+    cache_path = tmp_path / "sandbox.json"
+
+    sandbox = ImportSandbox( cache_path = cache_path )
+    assert all( result.passed for result in sandbox.check( _candidates( plugin_package ), plugin_package.name ) )
+    assert sandbox.sandboxed_count == 2
+
+    sandbox = ImportSandbox( cache_path = cache_path )
+    sandbox.check( _candidates( plugin_package ), plugin_package.name )
+    assert sandbox.sandboxed_count == 0
+
+    plugin_package.write_plugin( "second.py", "Renamed" )
+    results = sandbox.check( _candidates( plugin_package ), plugin_package.name )
+    assert sandbox.sandboxed_count == 1
+    assert [ result.registrations for result in results ] == [ ( "First", ), ( "Renamed", ) ]
+
+def test_cached_results_with_other_limits_are_not_reused( plugin_package, tmp_path ):
+    plugin_package.write_plugin( "first.py", "First" )
+    cache_path = tmp_path / "sandbox.json"
+    ImportSandbox( cache_path = cache_path ).check( _candidates( plugin_package ), plugin_package.name )
+
+    sandbox = ImportSandbox( cache_path = cache_path, cpu_time_limit = 5 )
+    sandbox.check( _candidates( plugin_package ), plugin_package.name )
+
+    assert sandbox.sandboxed_count == 1
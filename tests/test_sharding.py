@@ -0,0 +1,85 @@
+import sys
+
+import pytest
+from plugin_engine.plugin_catalog import CatalogEntry
+from plugin_engine.plugin_importer import PluginImporter
+from plugin_engine.sharding import PluginShard, ShardSpec
+from plugin_engine.static_analysis import StaticRegistration
+
+_MODULE_NAMES = [ f"plugins.module_{ index }" for index in range( 2000 ) ]
+
+def _entry( module_name: str, *qualnames: str ) -> CatalogEntry:
+    registrations = tuple( StaticRegistration( qualname, "register_plugin", {}, (), (), 1 ) for qualname in qualnames )
+    return CatalogEntry( module_name, f"{ module_name.replace( '.', '/' ) }.py", 0, 0, "", registrations, True )
+
+def _assign( spec: ShardSpec ):
+    return { module_name: spec.get_shard( _entry( module_name ) ) for module_name in _MODULE_NAMES }
+
+def test_assignment_is_deterministic():
+    assert _assign( ShardSpec( 4 ) ) == _assign( ShardSpec( 4 ) )
+
+def test_every_module_is_in_one_valid_shard():
+    assignment = _assign( ShardSpec( 4 ) )
+
+    assert set( assignment.values() ) == { 0, 1, 2, 3 }
+    # 64 virtual nodes per shard keep every shard within about a third of an even share.
+    assert all( len( _MODULE_NAMES ) / 4 * 0.65 < list( assignment.values() ).count( shard_index ) < len( _MODULE_NAMES ) / 4 * 1.35 for shard_index in range( 4 ) )
+
+def test_adding_a_shard_moves_few_modules():
+    before = _assign( ShardSpec( 4 ) )
+    after = _assign( ShardSpec( 5 ) )
+
+    moved = [ module_name for module_name in _MODULE_NAMES if before[ module_name ] != after[ module_name ] ]
+
+    # consistent hashing only moves the modules the new shard takes over, about a fifth of them.
+    assert all( after[ module_name ] == 4 for module_name in moved )
+    assert len( moved ) < len( _MODULE_NAMES ) * 0.3
+
+def test_groups_override_hashing():
+    spec = ShardSpec( 4, groups = { 0: [ "plugins.module_1*", "Pinned" ] } )
+
+    assert all( shard_index == 0 for module_name, shard_index in _assign( spec ).items() if module_name.startswith( "plugins.module_1" ) )
+    assert spec.get_shard( _entry( "plugins.other", "Pinned" ) ) == 0 != ShardSpec( 4 ).get_shard( _entry( "plugins.other", "Pinned" ) )
+
+def test_registration_id_key_hashes_first_registration():
+    spec = ShardSpec( 8, key = "registration_id" )
+
+    assert spec.get_shard( _entry( "plugins.a", "Same" ) ) == spec.get_shard( _entry( "plugins.b", "Same", "Other" ) ) == spec.get_hashed_shard( "Same" )
+    assert spec.get_shard( _entry( "plugins.a" ) ) == spec.get_hashed_shard( "plugins.a" )
+
+@pytest.mark.parametrize( "arguments, keywords", [ ( ( 0, ), {} ), ( ( 2, ), { "key": "path" } ), ( ( 2, ), { "groups": { 2: "*" } } ), ( ( 2, ), { "virtual_nodes": 0 } ) ] )
+def test_invalid_spec_is_rejected( arguments, keywords ):
+    with pytest.raises( ValueError ):
+        ShardSpec( *arguments, **keywords )
+
+def test_shards_import_every_module_once( plugin_package ):
+    for index in range( 12 ):
+        plugin_package.write( f"module_{ index }.py", f"""
+            from plugin_engine.class_registration import register_class
+            from { plugin_package.name } import registry
+
+            def register_plugin( class_ ):
+                register_class( class_, registry )
+                return class_
+
+            @register_plugin
+            class Plugin{ index }( object ):
+                pass
+            """ )
+
+    spec = ShardSpec( 3 )
+    package = plugin_package.import_package()
+    registered = []
+
+    for shard_index in range( spec.shard_count ):
+        shard = PluginShard( spec, shard_index, registration_decorators = [ "register_plugin" ] )
+        PluginImporter( package ).import_modules( shard = shard )
+        registered.extend( plugin_package.registry )
+        assert all( shard.router.get_shard( registration_id ) == shard_index for registration_id in plugin_package.registry )
+
+        plugin_package.registry.clear()
+        for name in list( sys.modules ):
+            if name.startswith( f"{ plugin_package.name }." ):
+                del sys.modules[ name ]
+
+    assert sorted( registered ) == sorted( f"Plugin{ index }" for index in range( 12 ) )
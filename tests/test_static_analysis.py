@@ -0,0 +1,55 @@
+import ast
+import textwrap
+
+import pytest
+from plugin_engine.dynamic_import import ModuleCandidate
+from plugin_engine.static_analysis import ImportCycleError, get_module_imports, sort_by_dependencies
+
+def _write_modules( directory, **sources ):
+    candidates = []
+    for name, source in sources.items():
+        ( directory / f"{ name }.py" ).write_text( textwrap.dedent( source ), encoding = "utf-8" )
+        candidates.append( ModuleCandidate( f".{ name }", f"{ name }.py", str( directory ) ) )
+
+    return candidates
+
+def test_sort_by_dependencies_orders_imported_modules_first( tmp_path ):
+    candidates = _write_modules( tmp_path, first = "from . import second\n", second = "from . import third\n", third = "" )
+
+    assert [ candidate.module_name for candidate in sort_by_dependencies( candidates, "package" ) ] == [ ".third", ".second", ".first" ]
+
+def test_sort_by_dependencies_raises_for_cycle( tmp_path ):
+    candidates = _write_modules( tmp_path, first = "from . import second\n", second = "from . import first\n" )
+
+    with pytest.raises( ImportCycleError ):
+        sort_by_dependencies( candidates, "package" )
+
+def test_type_checking_imports_are_ignored( tmp_path ):
+    candidates = _write_modules( tmp_path,
+        first = """
+            from typing import TYPE_CHECKING
+            if TYPE_CHECKING:
+                from .second import Second
+            """,
+        second = """
+            import typing
+            from . import first
+            if typing.TYPE_CHECKING:
+                from . import first as typed_first
+            """,
+    )
+
+    assert [ candidate.module_name for candidate in sort_by_dependencies( candidates, "package" ) ] == [ ".first", ".second" ]
+
+def test_type_checking_else_branch_is_imported():
+    module_tree = ast.parse( textwrap.dedent( """
+        if TYPE_CHECKING:
+            from . import typed
+        else:
+            from . import runtime
+        """ ) )
+
+    imports = get_module_imports( module_tree, "package.module" )
+
+    assert "package.runtime" in imports
+    assert "package.typed" not in imports
@@ -0,0 +1,59 @@
+import gc
+import sys
+
+import pytest
+from plugin_engine.plugin_importer import PluginImporter
+
+@pytest.fixture
+def unfrozen_gc():
+    yield
+
+    if hasattr( gc, "unfreeze" ):
+        gc.unfreeze()
+
+def _import( plugin_package ) -> PluginImporter:
+    plugin_package.write_plugin( "first.py", "First" )
+    plugin_package.write_plugin( "group/second.py", "Second", imports = "import json" )
+    plugin_importer = PluginImporter( plugin_package.import_package() )
+    plugin_importer.import_modules( recursive = True )
+    return plugin_importer
+
+def test_unload_modules_removes_modules_and_registrations( plugin_package ):
+    plugin_importer = _import( plugin_package )
+    registry = plugin_package.registry
+
+    result = plugin_importer.unload_modules( registration_targets = [ registry ] )
+
+    assert result.modules == ( f"{ plugin_package.name }.first", f"{ plugin_package.name }.group", f"{ plugin_package.name }.group.second" )
+    assert sorted( result.registration_ids ) == [ "First", "Second" ]
+    assert result.is_clean, result.leaked
+    assert registry == {}
+    assert f"{ plugin_package.name }.first" not in sys.modules
+    assert not plugin_importer.has_loaded_modules
+
+def test_unload_modules_reports_leaked_class( plugin_package ):
+    plugin_importer = _import( plugin_package )
+    kept_class = plugin_package.registry[ "First" ]
+
+    result = plugin_importer.unload_modules( registration_targets = [ plugin_package.registry ] )
+
+    assert [ leaked.name for leaked in result.leaked ] == [ f"{ plugin_package.name }.first.First" ]
+    del kept_class
+
+def test_unload_modules_can_import_again( plugin_package ):
+    plugin_importer = _import( plugin_package )
+    plugin_importer.unload_modules( registration_targets = [ plugin_package.registry ] )
+
+    plugin_importer.import_modules( recursive = True )
+
+    assert sorted( plugin_package.registry ) == [ "First", "Second" ]
+
+@pytest.mark.skipif( not hasattr( gc, "freeze" ), reason = "gc.freeze requires Python 3.7" )
+def test_unload_modules_after_prepare_for_fork_is_clean( plugin_package, unfrozen_gc ):
+    plugin_importer = _import( plugin_package )
+    plugin_importer.prepare_for_fork( registration_target = plugin_package.registry )
+
+    result = plugin_importer.unload_modules( registration_targets = [ plugin_package.registry ] )
+
+    assert result.is_clean, result.leaked
+    assert gc.get_freeze_count() == 0
@@ -0,0 +1,103 @@
+import os
+import time
+
+from plugin_engine.file_state import FileState
+from plugin_engine.lazy_registration import LazyClass
+from plugin_engine.plugin_importer import PluginImporter
+from plugin_engine.warm_start import SnapshotRegistration, WarmStartSnapshot, count_untrusted_entries, read_warm_start_snapshot, write_warm_start_snapshot
+
+def _age( plugin_package, seconds: float = 60 ):
+    # backdates every file and directory of the package, so the snapshot trusts their modification times.
+    timestamp = time.time() - seconds
+    for root, directory_names, file_names in os.walk( plugin_package.directory ):
+        for name in file_names:
+            os.utime( os.path.join( root, name ), ( timestamp, timestamp ) )
+        os.utime( root, ( timestamp, timestamp ) )
+
+def _write_plugins( plugin_package ):
+    plugin_package.write_plugin( "first.py", "First" )
+    plugin_package.write_plugin( "group/second.py", "Second" )
+
+def _cold_start( plugin_package, snapshot_path ) -> PluginImporter:
+    plugin_importer = PluginImporter( plugin_package.import_package() )
+    plugin_importer.import_modules( recursive = True, registry_snapshot = snapshot_path, registration_target = plugin_package.registry )
+    return plugin_importer
+
+def _warm_start( plugin_package, snapshot_path ):
+    registry = {}
+    plugin_importer = PluginImporter( plugin_package.import_package() )
+    plugin_importer.import_modules( recursive = True, registry_snapshot = snapshot_path, registration_target = registry )
+    return plugin_importer, registry
+
+def test_snapshot_round_trip( tmp_path ):
+    old_ns = int( ( time.time() - 60 ) * 1e9 )
+    snapshot = WarmStartSnapshot( { "package": "plugins" }, { "plugins": ( old_ns, 1 ) }, ( FileState( "plugins/first.py", old_ns, 10, "hash" ), ),
+                                  ( SnapshotRegistration( "First", "plugins.first", "First", ( "tag", 1 ) ), SnapshotRegistration( 2, "plugins.first", "Outer.Inner" ) ) )
+
+    write_warm_start_snapshot( tmp_path / "snapshot.json", snapshot )
+
+    assert read_warm_start_snapshot( tmp_path / "snapshot.json" ) == snapshot
+    assert count_untrusted_entries( snapshot ) == 0
+
+def test_snapshot_records_recent_entries_as_untrusted( tmp_path ):
+    now_ns = int( time.time() * 1e9 )
+    snapshot = WarmStartSnapshot( {}, { "plugins": ( now_ns, 1 ) }, ( FileState( "plugins/first.py", now_ns, 10, "hash" ), ), () )
+
+    write_warm_start_snapshot( tmp_path / "snapshot.json", snapshot )
+    read_snapshot = read_warm_start_snapshot( tmp_path / "snapshot.json" )
+
+    assert read_snapshot.directories == { "plugins": None }
+    assert read_snapshot.files[ 0 ].mtime_ns == -1
+    assert count_untrusted_entries( read_snapshot ) == 2
+
+def test_warm_start_registers_snapshot_stand_ins( plugin_package, tmp_path ):
+    _write_plugins( plugin_package )
+    _age( plugin_package )
+    snapshot_path = tmp_path / "snapshot.json"
+    _cold_start( plugin_package, snapshot_path )
+
+    plugin_importer, registry = _warm_start( plugin_package, snapshot_path )
+
+    assert plugin_importer.is_warm_started
+    assert sorted( registry ) == [ "First", "Second" ]
+    assert all( isinstance( registered, LazyClass ) for registered in registry.values() )
+    assert registry[ "Second" ].module_name == f"{ plugin_package.name }.group.second"
+
+def test_warm_start_is_invalidated_by_changed_module( plugin_package, tmp_path ):
+    _write_plugins( plugin_package )
+    _age( plugin_package )
+    snapshot_path = tmp_path / "snapshot.json"
+    _cold_start( plugin_package, snapshot_path )
+    plugin_package.write_plugin( "first.py", "Renamed" )
+
+    plugin_importer, registry = _warm_start( plugin_package, snapshot_path )
+
+    assert not plugin_importer.is_warm_started
+    assert registry == {}
+
+def test_warm_start_is_invalidated_by_added_module( plugin_package, tmp_path ):
+    _write_plugins( plugin_package )
+    _age( plugin_package )
+    snapshot_path = tmp_path / "snapshot.json"
+    _cold_start( plugin_package, snapshot_path )
+    plugin_package.write_plugin( "group/third.py", "Third" )
+
+    plugin_importer, registry = _warm_start( plugin_package, snapshot_path )
+
+    assert not plugin_importer.is_warm_started
+
+def test_warm_start_rewrites_snapshot_with_untrusted_entries( plugin_package, tmp_path ):
+    _write_plugins( plugin_package )
+    snapshot_path = tmp_path / "snapshot.json"
+    _cold_start( plugin_package, snapshot_path )
+
+    assert count_untrusted_entries( read_warm_start_snapshot( snapshot_path ) ) > 0
+
+    _age( plugin_package )
+    plugin_importer, registry = _warm_start( plugin_package, snapshot_path )
+    snapshot = read_warm_start_snapshot( snapshot_path )
+
+    assert plugin_importer.is_warm_started
+    assert count_untrusted_entries( snapshot ) == 0
+    assert sorted( registration.registration_id for registration in snapshot.registrations ) == [ "First", "Second" ]
+    assert _warm_start( plugin_package, snapshot_path )[ 0 ].is_warm_started